@@ -30,6 +30,7 @@ from firebase_init import initialize_firebase
 # Custom utils imports
 from utils.RAG import rag_manager
 from utils.store import WeaviateStore
+from utils.context_packer import pack_context
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR)
@@ -173,7 +174,7 @@ def get_rag_information(place_name: str, text: str = None, lat: float = None, ln
 #         return {"wikipedia": [], "attractions": []}
 
 #method to mix prompt with rag context
-def create_chat_messages(prompt: str, context: Dict[str, List[str]], is_image: bool = False, image_data: str = None) -> List[dict]:
+def create_chat_messages(prompt: str, context: Dict[str, List[str]], is_image: bool = False, image_data: str = None, model: str = "gpt-3.5-turbo", query: str = None) -> List[dict]:
     messages = []
     
     # System message
@@ -185,6 +186,14 @@ def create_chat_messages(prompt: str, context: Dict[str, List[str]], is_image: b
     
     # Add context as a separate message if available
     if context:
+        # Keep the retrieved context within the model's token budget, favouring
+        # snippets that mention what was searched for (the prompt if not given)
+        context, report = pack_context(context, model=model, query=query or prompt)
+        logging.info(
+            f"Packed context to {report['packed_tokens']}/{report['budget']} tokens "
+            f"for {model}, saved {report['tokens_saved']} tokens"
+        )
+
         context_msg = []
         
         # Add Wikipedia information
@@ -304,7 +313,7 @@ async def chat(request: ChatRequest):
 
             print(prompt)
             # Create messages with context
-            messages = create_chat_messages(prompt, context, is_image=True)
+            messages = create_chat_messages(prompt, context, is_image=True, model="gpt-4o-mini", query=address)
                 
             try:
                 # create USER msg data for firestore
@@ -424,10 +433,12 @@ async def chat(request: ChatRequest):
 
                 # Initialize place and number of repeats variable
                 selected_place = None
+                selected_place_info = None
 
                 if places_result.get('results'):
                     for place in places_result['results']:
                         selected_place = place['name']
+                        selected_place_info = place
                         print("SELECTED PLACE: " , selected_place)
                         break
 
@@ -437,7 +448,10 @@ async def chat(request: ChatRequest):
             except Exception as e:
                 print(f"Geocoding error: {str(e)}")
             search_term = selected_place if selected_place else address
-            context = get_rag_information(search_term, text=text_data, lat=lat, lng=lng)
+            # Known landmarks get their context from the fact card, skipping semantic search
+            context = rag_manager.query_fact_card([selected_place_info] if selected_place_info else [])
+            if not any(context.values()):
+                context = get_rag_information(search_term, text=text_data, lat=lat, lng=lng)
             print("ADDED CONTEXT", context)
 
             # Initialise prompt
@@ -471,7 +485,7 @@ async def chat(request: ChatRequest):
                 """
 
             print(prompt)
-            messages = create_chat_messages(prompt, context)
+            messages = create_chat_messages(prompt, context, query=search_term)
                 
             try:
                 # create USER msg data for firestore
@@ -575,7 +589,7 @@ async def chat(request: ChatRequest):
                 Include only what is given in the photo and describe in detail regarding history or context."""
 
 
-            messages = create_chat_messages(prompt, context, is_image=True, image_data=image_data)
+            messages = create_chat_messages(prompt, context, is_image=True, image_data=image_data, model="gpt-4o-mini", query=search_term)
 
             try:
                 # Check if it already has the prefix
@@ -706,6 +720,7 @@ async def chat(request: ChatRequest):
 
                 # Initialize place and number of repeats variable
                 selected_place = None
+                selected_place_info = None
                 repeat = 0
                 past_messages = []
 
@@ -716,6 +731,7 @@ async def chat(request: ChatRequest):
                         else :
                             landmarks.append(place['name'])
                             selected_place = place['name']
+                            selected_place_info = place
                             print("SELECTED PLACE: " , selected_place)
                             break
                             
@@ -761,7 +777,13 @@ async def chat(request: ChatRequest):
             except Exception as e:
                 print(f"Geocoding error: {str(e)}")
 
-            context = get_rag_information(selected_place)
+            # Known landmarks get their context from the fact card, then nearby documents
+            # from the spatial index; neither needs an embedding call
+            context = rag_manager.query_fact_card([selected_place_info] if selected_place_info else [])
+            if not any(context.values()):
+                context = rag_manager.query_by_location(lat, lng, radius=200)
+            if not any(context.values()):
+                context = get_rag_information(selected_place)
             print("ADDED CONTEXT", context)
 
             # Add address to prompt
@@ -801,7 +823,7 @@ async def chat(request: ChatRequest):
             
             print("PROMPT", prompt)
 
-            messages = create_chat_messages(prompt, context)
+            messages = create_chat_messages(prompt, context, query=selected_place)
 
             # Call OpenAI API
             response = openai.chat.completions.create(
@@ -942,7 +964,7 @@ async def chat2(request: ChatRequest):
 
             print("PROMPT", prompt)
 
-            messages = create_chat_messages(prompt, context, is_image=True)
+            messages = create_chat_messages(prompt, context, is_image=True, model="gpt-4o-mini", query=selected_place)
 
             # Call OpenAI API
             response = openai.chat.completions.create(
@@ -1039,7 +1061,7 @@ async def chat2(request: ChatRequest):
 
             print("PROMPT", prompt)
 
-            messages = create_chat_messages(prompt, context)
+            messages = create_chat_messages(prompt, context, query=selected_place)
 
             # Call OpenAI API
             response = openai.chat.completions.create(
@@ -1135,7 +1157,7 @@ async def chat2(request: ChatRequest):
 
             print("PROMPT", prompt)
 
-            messages = create_chat_messages(prompt, context, is_image=True)
+            messages = create_chat_messages(prompt, context, is_image=True, model="gpt-4o-mini", query=selected_place)
 
             # Call OpenAI API
             response = openai.chat.completions.create(
@@ -1245,7 +1267,7 @@ async def chat2(request: ChatRequest):
 
             print("PROMPT", prompt)
 
-            messages = create_chat_messages(prompt, context)
+            messages = create_chat_messages(prompt, context, query=selected_place)
 
             # Call OpenAI API
             response = openai.chat.completions.create(
@@ -40,6 +40,9 @@ load_dotenv()
 
 CHROMA_LOCAL_PATH = os.path.join(os.path.dirname(__file__), 'utils', 'chroma_db')
 FIREBASE_BUCKET = "ggdotcom-254aa.firebasestorage.app"
+INGEST_CACHE_PATH = os.getenv('INGEST_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'utils', 'cache'))
+LOCAL_INDEX_PATH = os.getenv('LOCAL_INDEX_PATH', os.path.join(os.path.dirname(__file__), 'utils', 'local_index'))
+HNSW_CONFIG_PATH = os.getenv('HNSW_CONFIG_PATH', os.path.join(os.path.dirname(__file__), 'utils', 'hnsw_config.json'))
 
 def get_chroma_settings():
     return {
@@ -51,5 +54,38 @@ def get_chroma_settings():
 def get_firebase_backup():
     return {
         "bucket_name": FIREBASE_BUCKET,
-        "base_path": "ggdotcom/chromadb"
-    }
\ No newline at end of file
+        "base_path": "ggdotcom/chromadb",
+        # Raw Chroma directory copies restored by firebase_backup.py
+        "restore_path": "ggdotcom/chroma_db"
+    }
+
+def get_local_index_settings():
+    return {
+        "index_dir": LOCAL_INDEX_PATH,
+        "fact_cards": os.path.join(LOCAL_INDEX_PATH, 'fact_cards.json'),
+        "dtype": os.getenv('LOCAL_INDEX_DTYPE', 'float32')
+    }
+
+def get_ingestion_settings():
+    return {
+        "cache_dir": INGEST_CACHE_PATH,
+        "wiki_api_url": os.getenv('WIKI_API_URL', 'https://en.wikipedia.org/w/api.php')
+    }
+
+def get_embedding_settings():
+    return {
+        # "openai" embeds queries with text-embedding-ada-002; "local" uses the
+        # MiniLM ONNX model in-process against the re-indexed *Local collections
+        "backend": os.getenv('EMBEDDING_BACKEND', 'openai').lower(),
+        "local_collection_suffix": "Local",
+        "local_workers": int(os.getenv('LOCAL_EMBEDDING_WORKERS', os.cpu_count() or 1)),
+        "local_threads": int(os.getenv('LOCAL_EMBEDDING_THREADS', 1)),
+        "local_batch_size": int(os.getenv('LOCAL_EMBEDDING_BATCH_SIZE', 256))
+    }
+
+def get_hnsw_settings():
+    return {
+        # Written by utils/hnsw_sweep.py; when absent, collections keep Chroma's defaults
+        "config_path": HNSW_CONFIG_PATH,
+        "target_recall": float(os.getenv('HNSW_TARGET_RECALL', 0.95))
+    }
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import modules the way the utils scripts do: backend/ for config and
+# utils.*, backend/utils/ for the script-relative imports
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'utils'))
+sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,57 @@
+import numpy as np
+
+from utils.bm25 import BM25Index, hybrid_search, tokenize
+
+
+def test_tokenize_handles_stopwords_possessives_abbreviations_and_chinese():
+    assert tokenize("The temple's history lah") == ["temple", "history"]
+    assert tokenize("Jln Besar") == ["jalan", "besar"]
+    assert tokenize("牛车水") == ["牛", "车", "水", "牛车", "车水"]
+    assert tokenize("") == []
+
+
+def test_search_ranks_matching_documents_first():
+    index = BM25Index([
+        "Buddha Tooth Relic Temple in Chinatown",
+        "Sri Mariamman Temple, the oldest Hindu temple",
+        "Maxwell Food Centre hawker stalls"
+    ])
+
+    results = index.search("hindu temple")
+    assert [doc_id for doc_id, _ in results] == [1, 0]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search("durian") == []
+
+
+def test_abbreviated_query_matches_long_form():
+    index = BM25Index(["Shophouses along Jalan Besar", "Temple Street"])
+    assert index.search("jln besar")[0][0] == 0
+
+
+def test_search_limit_and_empty_index():
+    index = BM25Index(["temple one", "temple two", "temple three"])
+    assert len(index.search("temple", limit=2)) == 2
+    assert BM25Index([]).search("temple") == []
+
+
+class FakeVectorIndex:
+    def __init__(self, vector_scores):
+        self.vector_scores = np.asarray([vector_scores], dtype=np.float32)
+
+    def scores(self, query_vector):
+        return self.vector_scores
+
+    def row(self, index):
+        return {"uuid": str(index)}
+
+
+def test_hybrid_search_fuses_normalised_scores():
+    bm25 = BM25Index(["sri mariamman temple", "chinatown market", "thian hock keng"])
+    vectors = FakeVectorIndex([0.1, 0.9, 0.2])
+
+    keyword_only = hybrid_search(vectors, bm25, "mariamman", [0.0], alpha=0.0, limit=1)
+    vector_only = hybrid_search(vectors, bm25, "mariamman", [0.0], alpha=1.0, limit=1)
+
+    assert keyword_only[0]["uuid"] == "0"
+    assert vector_only[0]["uuid"] == "1"
+    assert keyword_only[0]["keyword_score"] > 0
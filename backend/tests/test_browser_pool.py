@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pyppeteer")
+
+from utils import browser_pool
+from utils.browser_pool import BrowserPool, is_blocked
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.handlers = {}
+        self.closed = False
+
+    async def setRequestInterception(self, enabled):
+        self.intercepting = enabled
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def goto(self, url, options):
+        self.url = url
+        await asyncio.sleep(0.01)
+        if "broken" in url:
+            raise RuntimeError("Navigation failed")
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    async def newPage(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resourceType = resource_type
+        self.url = url
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+@pytest.fixture
+def launched(monkeypatch):
+    browsers = []
+
+    async def launch(**kwargs):
+        browsers.append(FakeBrowser())
+        return browsers[-1]
+
+    monkeypatch.setattr(browser_pool, "launch", launch)
+    return browsers
+
+
+def test_is_blocked():
+    assert is_blocked("image", "https://example.com/a.png")
+    assert is_blocked("script", "https://www.google-analytics.com/analytics.js")
+    assert not is_blocked("script", "https://notdoubleclick.net/app.js")
+    assert not is_blocked("document", "https://chinatown.sg/visit/")
+
+
+def test_pages_are_reused_and_broken_ones_replaced(launched):
+    async def run():
+        pool = BrowserPool(browsers=2, pages_per_browser=2)
+        urls = [f"https://site{i}.test/" for i in range(8)] + ["https://site0.test/broken"]
+        results = await asyncio.gather(*(pool.fetch_html(url) for url in urls), return_exceptions=True)
+        await pool.close()
+        return pool, results
+
+    pool, results = asyncio.run(run())
+    assert results[0] == "<html>https://site0.test/</html>"
+    assert isinstance(results[-1], RuntimeError)
+    assert len(launched) == 2 and all(browser.closed for browser in launched)
+    # Four pages at start, plus one replacing the page that failed
+    pages = [page for browser in launched for page in browser.pages]
+    assert len(pages) == 5 and sum(page.closed for page in pages) == 1
+    assert pool.pages_served == 9
+
+
+def test_per_host_cap_limits_concurrent_pages(launched):
+    active, peak = {}, {}
+
+    async def run():
+        pool = BrowserPool(browsers=1, pages_per_browser=4, per_host=2)
+
+        async def visit(url):
+            host = url.split("/")[2]
+            async with pool.page(url):
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+
+        await asyncio.gather(*(visit(f"https://{host}/{i}") for host in ["a.test", "b.test"] for i in range(5)))
+
+    asyncio.run(run())
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
+def test_requests_are_intercepted(launched):
+    async def run():
+        pool = BrowserPool(browsers=1, pages_per_browser=1)
+        await pool.start()
+        requests = [FakeRequest("image", "https://a.test/x.png"), FakeRequest("document", "https://a.test/")]
+        for request in requests:
+            await pool._intercept(request)
+        return pool, requests
+
+    pool, requests = asyncio.run(run())
+    assert [request.outcome for request in requests] == ["abort", "continue"]
+    assert pool.requests_blocked == 1
@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+from utils.chroma import ChromaDBManager
+
+
+class FakeCollection:
+    def __init__(self, count):
+        self.ids = [f"id{i}" for i in range(count)]
+        self.pages = []
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, limit, offset, include):
+        self.pages.append((offset, limit))
+        ids = self.ids[offset:offset + limit]
+        result = {"ids": ids, "documents": None, "metadatas": None, "embeddings": None}
+        if "documents" in include:
+            result["documents"] = [f"text of {i}" for i in ids]
+        if "metadatas" in include:
+            result["metadatas"] = [{"n": int(i[2:])} for i in ids]
+        if "embeddings" in include:
+            result["embeddings"] = np.asarray([[int(i[2:]), 0.5] for i in ids], dtype=np.float32)
+        return result
+
+
+@pytest.fixture
+def manager():
+    manager = ChromaDBManager.__new__(ChromaDBManager)
+    collection = FakeCollection(25)
+    manager.chroma_client = type("Client", (), {"get_collection": lambda self, name: collection})()
+    manager.collection = collection
+    return manager
+
+
+def test_iter_collection_pages_through_everything(manager):
+    docs = list(manager.iter_collection("c", page_size=10))
+    assert [doc["id"] for doc in docs] == [f"id{i}" for i in range(25)]
+    assert manager.collection.pages == [(0, 10), (10, 10), (20, 10)]
+    assert docs[3] == {"id": "id3", "document": "text of id3", "metadata": {"n": 3}, "embedding": None}
+
+
+def test_iter_collection_honours_offset_limit_and_include(manager):
+    docs = list(manager.iter_collection("c", page_size=4, include=["embeddings"], offset=5, limit=6))
+    assert [doc["id"] for doc in docs] == [f"id{i}" for i in range(5, 11)]
+    assert manager.collection.pages == [(5, 4), (9, 2)]
+    assert docs[0]["embedding"] == [5.0, 0.5] and isinstance(docs[0]["embedding"][0], float)
+    assert docs[0]["document"] is None and docs[0]["metadata"] is None
+
+
+def test_export_jsonl(manager, tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    assert manager.export_collection("c", path, page_size=7) == 25
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 25 and rows[-1]["metadata"] == {"n": 24}
+
+
+def test_export_parquet(manager, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "c.parquet")
+    assert manager.export_collection("c", path, include=["documents", "metadatas", "embeddings"], page_size=10) == 25
+    table = pq.read_table(path).to_pylist()
+    assert len(table) == 25
+    assert json.loads(table[2]["metadata"]) == {"n": 2}
+    assert table[2]["embedding"] == [2.0, 0.5]
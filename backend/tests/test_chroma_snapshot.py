@@ -0,0 +1,118 @@
+import os
+import zlib
+import sqlite3
+
+import pytest
+
+from utils.chroma_snapshot import SQLITE_FILE, ChromaSnapshotter, LocalFSBackend
+
+CHUNK_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def chroma_dir(tmp_path):
+    directory = tmp_path / "chroma_db"
+    (directory / "segment").mkdir(parents=True)
+    conn = sqlite3.connect(directory / SQLITE_FILE)
+    conn.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, text TEXT)")
+    conn.executemany("INSERT INTO docs (text) VALUES (?)", [(f"doc {i} " * 20,) for i in range(500)])
+    conn.commit()
+    conn.close()
+    (directory / "segment" / "data_level0.bin").write_bytes(os.urandom(5 * CHUNK_SIZE + 123))
+    return directory
+
+
+@pytest.fixture
+def snapshotter(chroma_dir, tmp_path):
+    return ChromaSnapshotter(LocalFSBackend(str(tmp_path / "store")), str(chroma_dir), chunk_size=CHUNK_SIZE)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def row_count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_uploads_only_changed_chunks(snapshotter, chroma_dir):
+    first = snapshotter.backup()
+    assert first["uploaded_chunks"] == first["chunks"]
+
+    assert snapshotter.backup()["uploaded_chunks"] == 0
+
+    with open(chroma_dir / "segment" / "data_level0.bin", "r+b") as f:
+        f.seek(2 * CHUNK_SIZE + 10)
+        f.write(b"changed")
+    assert snapshotter.backup()["uploaded_chunks"] == 1
+    assert len(snapshotter.list_snapshots()) == 3
+
+
+def test_restore_rebuilds_directory_and_fetches_only_differences(snapshotter, chroma_dir, tmp_path):
+    snapshotter.backup()
+    dest = tmp_path / "restored"
+
+    report = snapshotter.restore(dest_dir=str(dest))
+    assert report["reused_chunks"] == 0
+    assert read(dest / "segment" / "data_level0.bin") == read(chroma_dir / "segment" / "data_level0.bin")
+    assert row_count(dest / SQLITE_FILE) == 500
+
+    assert snapshotter.restore(dest_dir=str(dest))["fetched_chunks"] == 0
+
+
+def test_point_in_time_restore_and_prune_of_stray_files(snapshotter, chroma_dir, tmp_path):
+    original = read(chroma_dir / "segment" / "data_level0.bin")
+    snapshotter.backup()
+    first_id = snapshotter.list_snapshots()[0]
+
+    conn = sqlite3.connect(chroma_dir / SQLITE_FILE)
+    conn.execute("DELETE FROM docs WHERE id > 100")
+    conn.commit()
+    conn.close()
+    (chroma_dir / "segment" / "data_level0.bin").write_bytes(os.urandom(CHUNK_SIZE))
+    snapshotter.backup()
+
+    dest = tmp_path / "restored"
+    snapshotter.restore(dest_dir=str(dest))
+    assert row_count(dest / SQLITE_FILE) == 100
+    (dest / "stale.bin").write_bytes(b"x")
+
+    report = snapshotter.restore(first_id, dest_dir=str(dest))
+    assert report["removed_files"] == 1
+    assert read(dest / "segment" / "data_level0.bin") == original
+    assert row_count(dest / SQLITE_FILE) == 500
+
+
+def test_corrupt_chunk_is_rejected(snapshotter, tmp_path):
+    snapshotter.backup()
+    store = tmp_path / "store" / "chunks"
+    chunk = next(os.path.join(root, name) for root, _, names in os.walk(store) for name in names)
+    with open(chunk, "wb") as f:
+        f.write(zlib.compress(b"tampered"))
+
+    with pytest.raises(ValueError, match="corrupt"):
+        snapshotter.restore(dest_dir=str(tmp_path / "restored"))
+
+
+def test_prune_keeps_chunks_of_remaining_snapshots(snapshotter, chroma_dir, tmp_path):
+    snapshotter.backup()
+    (chroma_dir / "segment" / "data_level0.bin").write_bytes(os.urandom(CHUNK_SIZE))
+    snapshotter.backup()
+
+    pruned = snapshotter.prune(keep=1)
+    assert pruned["snapshots"] == 1 and pruned["chunks"] > 0
+    assert len(snapshotter.list_snapshots()) == 1
+
+    dest = tmp_path / "restored"
+    snapshotter.restore(dest_dir=str(dest))
+    assert read(dest / "segment" / "data_level0.bin") == read(chroma_dir / "segment" / "data_level0.bin")
+
+
+def test_restore_without_snapshots_fails(snapshotter):
+    with pytest.raises(ValueError):
+        snapshotter.restore()
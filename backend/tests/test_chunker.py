@@ -0,0 +1,59 @@
+import pytest
+
+from utils.chunker import chunk_document, chunk_documents, chunk_id, split_text
+
+
+def sentences(count, words=10):
+    return " ".join(f"Sentence {i} " + " ".join(["word"] * (words - 3)) + "." for i in range(count))
+
+
+def test_split_text_respects_chunk_size_and_overlap():
+    chunks = split_text(sentences(10), chunk_size=30, overlap=10)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.split()) <= 30 for chunk in chunks)
+    # The last sentence of each chunk is carried into the next
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.split(". ")[-1]
+        assert current.startswith(last_sentence.rstrip("."))
+
+
+def test_split_text_keeps_long_sentence_whole():
+    long_sentence = " ".join(["word"] * 50) + "."
+    assert split_text(long_sentence, chunk_size=20, overlap=5) == [long_sentence]
+
+
+def test_split_text_rejects_overlap_not_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        split_text("Some text.", chunk_size=10, overlap=10)
+
+
+def test_chunk_document_is_section_aware_with_stable_ids():
+    document = {
+        "text": "Summary:\nA temple in Chinatown.\n\nHistory:\nBuilt in 1827. Rebuilt later.\n\nDescription:\n",
+        "metadata": {"place_id": "p1", "name": "Sri Mariamman Temple"}
+    }
+    chunks = chunk_document(document, chunk_size=50, overlap=10)
+
+    assert [chunk["metadata"]["section"] for chunk in chunks] == ["Summary", "History"]
+    assert chunks[0]["text"] == "Sri Mariamman Temple (Summary): A temple in Chinatown."
+    assert chunks[1]["id"] == chunk_id("p1", "History", "Built in 1827. Rebuilt later.")
+    for index, chunk in enumerate(chunks):
+        assert chunk["metadata"]["parent_id"] == "p1"
+        assert chunk["metadata"]["name"] == "Sri Mariamman Temple"
+        assert chunk["metadata"]["chunk_index"] == index
+        assert chunk["metadata"]["chunk_count"] == 2
+
+    assert [chunk["id"] for chunk in chunk_document(document, 50, 10)] == [chunk["id"] for chunk in chunks]
+
+
+def test_chunk_documents_without_place_id_uses_text_hash_and_keeps_order():
+    documents = [
+        {"text": "First document.", "metadata": {}},
+        {"text": "Second document.", "metadata": {"place_id": "p2"}}
+    ]
+    chunks = chunk_documents(documents)
+
+    assert [chunk["text"] for chunk in chunks] == ["First document.", "Second document."]
+    assert len(chunks[0]["metadata"]["parent_id"]) == 16
+    assert chunks[1]["metadata"]["parent_id"] == "p2"
@@ -0,0 +1,64 @@
+from utils.context_packer import MODEL_CONTEXT_BUDGETS, count_tokens, pack_context
+
+TEMPLE = (
+    "The Sri Mariamman Temple is Singapore's oldest Hindu temple.\n\n"
+    "It was founded in 1827 by Naraina Pillai.\n\n"
+    "Its gopuram rises above South Bridge Road."
+)
+MARKET = "Lau Pa Sat is a Victorian market now used as a hawker centre."
+
+
+def test_everything_fits_under_a_generous_budget():
+    packed, report = pack_context({"wikipedia": [TEMPLE], "attractions": [MARKET]}, budget=10000)
+    assert packed == {"wikipedia": TEMPLE.split("\n\n"), "attractions": [MARKET]}
+    assert report["snippets_dropped"] == 0 and report["tokens_saved"] == 0
+
+
+def test_packed_tokens_never_exceed_the_budget():
+    context = {"wikipedia": [TEMPLE * 5, MARKET * 5], "attractions": [MARKET, TEMPLE]}
+    for budget in [10, 40, 80]:
+        packed, report = pack_context(context, budget=budget)
+        assert report["packed_tokens"] <= budget
+        assert sum(count_tokens(s) for snippets in packed.values() for s in snippets) == report["packed_tokens"]
+
+
+def test_budget_defaults_per_model():
+    _, report = pack_context({"wikipedia": [TEMPLE]}, model="gpt-4o-mini")
+    assert report["budget"] == MODEL_CONTEXT_BUDGETS["gpt-4o-mini"]
+    _, report = pack_context({"wikipedia": [TEMPLE]}, model="unknown-model")
+    assert report["budget"] == 1200
+
+
+def test_tight_budget_keeps_the_best_ranked_snippet():
+    first, second = "The first result is about Chinatown.", "The second result is about Sentosa."
+    packed, _ = pack_context({"wikipedia": [first, second]}, budget=count_tokens(first))
+    assert packed["wikipedia"] == [first]
+
+    scored = [{"text": first, "score": 0.1}, {"text": second, "score": 0.9}]
+    packed, _ = pack_context({"wikipedia": scored}, budget=count_tokens(second))
+    assert packed["wikipedia"] == [second]
+
+
+def test_query_overlap_boosts_a_snippet():
+    first, second = "Hawker stalls sell chicken rice.", "Buddha Tooth Relic Temple houses a relic."
+    context = {"wikipedia": [{"text": first, "score": 0.6}, {"text": second, "score": 0.5}]}
+    budget = max(count_tokens(first), count_tokens(second))
+    packed, _ = pack_context(context, budget=budget)
+    assert packed["wikipedia"] == [first]
+    packed, _ = pack_context(context, budget=budget, query="Buddha Tooth Relic Temple")
+    assert packed["wikipedia"] == [second]
+
+
+def test_duplicates_and_contained_snippets_are_dropped():
+    sentence = "It was founded in 1827 by Naraina Pillai."
+    packed, report = pack_context({"wikipedia": [TEMPLE], "attractions": [sentence, "", sentence.upper()]},
+                                  budget=10000)
+    kept = [s for snippets in packed.values() for s in snippets]
+    assert sum(s.lower() == sentence.lower() for s in kept) == 1
+    assert len(kept) == 3 and report["duplicates"] == 2
+
+
+def test_empty_context():
+    packed, report = pack_context({}, budget=100)
+    assert packed == {} and report["packed_tokens"] == 0
+    assert pack_context(None)[0] == {}
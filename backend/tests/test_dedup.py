@@ -0,0 +1,59 @@
+from utils.dedup import NearDuplicateIndex, collapse_near_duplicates, shingles
+
+BASE = (
+    "The Sri Mariamman Temple is the oldest Hindu temple in Singapore. It was founded in 1827 "
+    "by Naraina Pillai and is known for its ornate gopuram facing South Bridge Road in Chinatown."
+)
+
+
+def doc(doc_id, text, **metadata):
+    return {"id": doc_id, "text": text, "metadata": metadata}
+
+
+def test_shingles_fall_back_to_whole_short_text():
+    assert shingles("Hello, World!") == {"hello world"}
+    assert len(shingles("one two three four five six", k=5)) == 2
+
+
+def test_index_finds_near_duplicates_but_not_unrelated_text():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("a", index.signature(BASE))
+
+    match = index.find(index.signature(BASE + " Visitors are welcome."))
+    assert match is not None and match[0] == "a" and match[1] >= 0.8
+    assert index.find(index.signature("Maxwell Food Centre is a hawker centre known for chicken rice.")) is None
+
+
+def test_collapse_keeps_first_and_merges_metadata():
+    documents = [
+        doc("a", BASE, name="Sri Mariamman Temple", place_id="p1"),
+        doc("b", BASE + " Visitors are welcome.", name="Sri Mariamman", place_id="p2"),
+        doc("c", "Thian Hock Keng is a Hokkien temple on Telok Ayer Street built in 1839.", name="Thian Hock Keng")
+    ]
+    canonical, report = collapse_near_duplicates(documents, threshold=0.8)
+
+    assert [d["id"] for d in canonical] == ["a", "c"]
+    metadata = canonical[0]["metadata"]
+    assert metadata["duplicate_ids"] == "b"
+    assert metadata["duplicate_count"] == 1
+    assert metadata["alt_names"] == "Sri Mariamman"
+    assert metadata["alt_place_ids"] == "p2"
+    assert report == {"input": 3, "canonical": 2, "collapsed": 1, "groups": {"a": ["b"]}}
+    # The input documents are left untouched
+    assert "duplicate_ids" not in documents[0]["metadata"]
+
+
+def test_shared_index_drops_duplicates_of_earlier_batches():
+    index = NearDuplicateIndex(threshold=0.8)
+    collapse_near_duplicates([doc("a", BASE)], index=index)
+
+    canonical, report = collapse_near_duplicates([doc("b", BASE + " Visitors are welcome.")], index=index)
+    assert canonical == []
+    assert report["groups"] == {"a": ["b"]}
+
+
+def test_reprocessing_the_same_id_is_not_a_duplicate():
+    index = NearDuplicateIndex()
+    collapse_near_duplicates([doc("a", BASE)], index=index)
+    canonical, _ = collapse_near_duplicates([doc("a", BASE)], index=index)
+    assert [d["id"] for d in canonical] == ["a"]
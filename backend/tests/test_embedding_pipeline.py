@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils.context_packer import count_tokens, truncate_tokens
+from utils.embedding_cache import EmbeddingCache
+from utils.embedding_pipeline import MAX_INPUT_TOKENS, EmbeddingPipeline
+
+
+class FakeEmbeddings:
+    """Rejects oversized inputs the way the API does: by failing the whole request"""
+
+    def __init__(self, model):
+        self.model = model
+        self.requests = []
+
+    async def create(self, model, input):
+        self.requests.append(list(input))
+        for text in input:
+            if count_tokens(text, self.model) > MAX_INPUT_TOKENS:
+                raise ValueError("maximum context length is 8191 tokens")
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)
+        ])
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    pipeline = EmbeddingPipeline(max_batch_size=2, cache=EmbeddingCache(str(tmp_path / "embeddings.sqlite3")))
+    pipeline.client = SimpleNamespace(embeddings=FakeEmbeddings(pipeline.model))
+    return pipeline
+
+
+def test_truncate_tokens_caps_long_text_and_keeps_short_text():
+    long_text = "Chinatown heritage walk. " * 4000
+    truncated = truncate_tokens(long_text, 100)
+    assert long_text.startswith(truncated)
+    assert count_tokens(truncated) <= 100
+    assert truncate_tokens("short text", 100) == "short text"
+    assert truncate_tokens("", 100) == ""
+
+
+def test_oversized_input_is_truncated_instead_of_failing_the_run(pipeline):
+    huge = "The temple was rebuilt many times. " * 5000
+    texts = ["Sri Mariamman Temple", huge, "Thian Hock Keng", "Sri Mariamman Temple"]
+
+    vectors = asyncio.run(pipeline.embed_texts(texts))
+
+    assert len(vectors) == 4 and vectors[0] == vectors[3]
+    sent = [text for request in pipeline.client.embeddings.requests for text in request]
+    assert len(sent) == 3
+    assert all(count_tokens(text, pipeline.model) <= MAX_INPUT_TOKENS for text in sent)
+    assert pipeline.stats["batches"] == 2
+
+
+def test_vectors_are_cached_under_the_full_text(pipeline):
+    huge = "Pagoda Street shophouses. " * 5000
+    first = asyncio.run(pipeline.embed_texts([huge]))
+    requests = len(pipeline.client.embeddings.requests)
+
+    assert asyncio.run(pipeline.embed_texts([huge])) == first
+    assert len(pipeline.client.embeddings.requests) == requests
+    assert pipeline.stats["cached"] == 1
+
+
+def test_max_retries_must_allow_an_attempt(tmp_path):
+    with pytest.raises(ValueError):
+        EmbeddingPipeline(max_retries=0, cache=EmbeddingCache(str(tmp_path / "embeddings.sqlite3")))
@@ -0,0 +1,77 @@
+from utils.chunker import chunk_document
+from utils.fact_cards import FactCardStore, build_fact_card, build_fact_cards, documents_from_chroma, save_fact_cards
+
+TEXT = (
+    "Summary:\nThe Sri Mariamman Temple is Singapore's oldest Hindu temple. It is in Chinatown. "
+    "It is a national monument. It draws many visitors.\n\n"
+    "History:\nIt was founded in 1827 by Naraina Pillai. The first structure was made of wood. "
+    "The present building dates from 1843.\n\n"
+    "Description:\nA six-tier gopuram rises over the entrance. It is covered in sculptures."
+)
+
+
+def document(source="wikipedia", place_id="p1", text=TEXT, name="Sri Mariamman Temple"):
+    return {"text": text, "metadata": {"place_id": place_id, "name": name, "source": source}}
+
+
+def test_card_keeps_leading_sentences_of_each_section():
+    card = build_fact_card(document())
+    assert card["place_id"] == "p1"
+    assert card["text"].startswith("Sri Mariamman Temple: The Sri Mariamman Temple is Singapore's oldest")
+    assert "founded in 1827" in card["text"] and "gopuram" in card["text"]
+    # Summary keeps 3 sentences, so the fourth is dropped
+    assert "many visitors" not in card["text"]
+    assert len(build_fact_card(document(), max_chars=120)["text"]) <= 120 + len("Sri Mariamman Temple: ")
+
+
+def test_documents_without_place_id_or_content_get_no_card():
+    assert build_fact_card(document(place_id="")) is None
+    assert build_fact_card(document(text="No Wikipedia content available")) is None
+
+
+def test_chunks_are_merged_back_into_one_card_per_place():
+    chunks = chunk_document(document(), chunk_size=12, overlap=0)
+    assert len(chunks) > 3
+
+    cards = build_fact_cards(list(reversed(chunks)))
+    assert list(cards) == ["p1"]
+    # Built from the first chunk of each section, in section order
+    text = cards["p1"]["text"]
+    assert "(Summary)" not in text
+    assert text.index("oldest Hindu temple") < text.index("1827") < text.index("gopuram")
+
+
+def test_wikipedia_cards_win_over_scraped_ones():
+    cards = build_fact_cards([
+        document(source="web_scrape", text="Summary:\nA scraped description of the temple."),
+        document(source="wikipedia")
+    ])
+    assert cards["p1"]["source"] == "wikipedia"
+
+
+def test_store_round_trip_and_lookup(tmp_path):
+    path = str(tmp_path / "cards" / "fact_cards.json")
+    save_fact_cards(build_fact_cards([document(), document(place_id="p2", name="Thian Hock Keng")]), path)
+
+    store = FactCardStore(path)
+    assert len(store) == 2
+    assert store.get("p2")["name"] == "Thian Hock Keng"
+    assert store.get(None) is None
+    assert store.lookup_places([{"place_id": "unknown"}, {"place_id": "p2"}])["place_id"] == "p2"
+    assert len(FactCardStore(str(tmp_path / "missing.json"))) == 0
+
+
+def test_documents_from_chroma_reads_chunks_with_their_metadata():
+    chunks = chunk_document(document(), chunk_size=12, overlap=0)
+
+    class FakeManager:
+        def iter_collection(self, name, page_size):
+            if name != "wikipedia_collection":
+                raise ValueError(f"Collection {name} does not exist")
+            for chunk in chunks:
+                yield {"id": chunk["id"], "document": chunk["text"], "metadata": chunk["metadata"]}
+            yield {"id": "old", "document": "stale", "metadata": {"place_id": "p9", "tombstoned": True}}
+
+    documents = documents_from_chroma(FakeManager())
+    assert len(documents) == len(chunks)
+    assert list(build_fact_cards(documents)) == ["p1"]
@@ -0,0 +1,86 @@
+import base64
+import hashlib
+import os
+
+import pytest
+
+pytest.importorskip("firebase_admin")
+pytest.importorskip("chromadb")
+
+from utils import firebase_backup
+
+PREFIX = "ggdotcom/chroma_db"
+
+
+class FakeBlob:
+    def __init__(self, name, data, generation=1, md5_hash=None):
+        self.name = name
+        self.data = data
+        self.size = len(data)
+        self.generation = generation
+        self.md5_hash = md5_hash or base64.b64encode(hashlib.md5(data).digest()).decode()
+        self.crc32c = None
+        self.downloads = 0
+
+    def download_to_file(self, f, checksum=None):
+        self.downloads += 1
+        f.write(self.data)
+
+
+class FakeBucket:
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def list_blobs(self, prefix):
+        return [blob for blob in self.blobs if blob.name.startswith(prefix)]
+
+
+@pytest.fixture
+def backup(tmp_path, monkeypatch):
+    bucket = FakeBucket([
+        FakeBlob(f"{PREFIX}/chroma.sqlite3", b"sqlite"),
+        FakeBlob(f"{PREFIX}/seg-1/header.bin", b"header"),
+        FakeBlob(f"{PREFIX}/seg-1/data_level0.bin", b"vectors" * 100),
+        FakeBlob("ggdotcom/chromadb/snapshots/chunks/abc", b"snapshot chunk"),
+    ])
+    settings = {
+        "persist_directory": str(tmp_path / "chroma"),
+        "firebase_backup": {"bucket_name": "test", "base_path": "ggdotcom/chromadb", "restore_path": PREFIX}
+    }
+    monkeypatch.setattr(firebase_backup.storage, "bucket", lambda name: bucket)
+    monkeypatch.setattr(firebase_backup, "get_chroma_settings", lambda: settings)
+    return firebase_backup.FirebaseBackup("test")
+
+
+def test_restore_all_reads_the_raw_chroma_prefix(backup):
+    report = backup.restore_all(max_workers=2)
+    assert report["files"] == 3 and report["downloaded"] == 3 and not report["failed"]
+
+    with open(os.path.join(backup.persist_directory, "seg-1", "header.bin"), "rb") as f:
+        assert f.read() == b"header"
+    assert not os.path.exists(os.path.join(backup.persist_directory, "snapshots"))
+    assert backup.list_firebase_collections() == ["seg-1"]
+
+
+def test_unchanged_blobs_are_skipped_and_new_generations_downloaded(backup):
+    backup.restore_all()
+    header = backup.bucket.blobs[1]
+    header.generation = 2
+
+    report = backup.restore_all()
+    assert report["skipped"] == 2 and report["downloaded"] == 1
+    assert header.downloads == 2
+
+
+def test_corrupt_download_is_reported_and_not_kept(backup):
+    blob = backup.bucket.blobs[0]
+    blob.md5_hash = base64.b64encode(b"0" * 16).decode()
+
+    report = backup.restore_all()
+    assert report["failed"] == {blob.name: "MD5 mismatch"}
+    assert not os.path.exists(os.path.join(backup.persist_directory, "chroma.sqlite3"))
+    assert not os.path.exists(os.path.join(backup.persist_directory, "chroma.sqlite3.part"))
+
+    # The bad blob isn't in the manifest, so the next run tries it again
+    blob.md5_hash = base64.b64encode(hashlib.md5(blob.data).digest()).decode()
+    assert backup.restore_all()["downloaded"] == 1
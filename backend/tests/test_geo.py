@@ -0,0 +1,53 @@
+import pytest
+
+from utils.geo import GeoIndex, haversine
+
+# Sri Mariamman Temple, and points roughly 100 m, 400 m and 2 km away
+ORIGIN = (1.2827, 103.8454)
+
+
+def test_haversine_matches_known_distances():
+    assert haversine(*ORIGIN, *ORIGIN) == 0
+    # One thousandth of a degree of latitude is about 111 m anywhere
+    assert haversine(0.0, 103.8, 0.001, 103.8) == pytest.approx(111.2, abs=0.5)
+
+
+def test_query_returns_points_within_radius_nearest_first():
+    index = GeoIndex()
+    index.add_documents([
+        {"name": "far", "lat": ORIGIN[0] + 0.018, "lng": ORIGIN[1]},
+        {"name": "mid", "lat": ORIGIN[0], "lng": ORIGIN[1] + 0.0036},
+        {"name": "near", "lat": ORIGIN[0] + 0.0009, "lng": ORIGIN[1]},
+    ])
+
+    hits = index.query(*ORIGIN, radius=500)
+    assert [hit["name"] for hit in hits] == ["near", "mid"]
+    assert hits[0]["distance"] == pytest.approx(100, abs=2)
+    assert [hit["name"] for hit in index.query(*ORIGIN, radius=500, limit=1)] == ["near"]
+    assert [hit["name"] for hit in index.query(*ORIGIN, radius=3000)] == ["near", "mid", "far"]
+
+
+def test_query_crosses_bucket_boundaries():
+    index = GeoIndex(cell_deg=0.001)
+    # Just either side of a cell edge, with the radius spanning several cells
+    index.add(1.2999, 103.8, {"name": "below"})
+    index.add(1.3001, 103.8, {"name": "above"})
+    assert sorted(hit["name"] for hit in index.query(1.3, 103.8, radius=50)) == ["above", "below"]
+
+
+def test_documents_without_usable_coordinates_are_skipped():
+    index = GeoIndex()
+    added = index.add_documents([
+        {"name": "ok", "lat": "1.28", "lng": "103.84"},
+        {"name": "missing"},
+        {"name": "blank", "lat": "", "lng": None},
+    ])
+    assert added == 1 and index.size == 1
+
+
+def test_from_columns_reads_a_sidecar_and_tolerates_no_coordinates():
+    columns = {"name": ["a", "b"], "lat": [1.28, None], "lng": [103.84, None]}
+    index = GeoIndex.from_columns(columns)
+    assert index.size == 1
+    assert index.query(1.28, 103.84, radius=10)[0]["name"] == "a"
+    assert GeoIndex.from_columns({"name": ["a"]}).size == 0
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+from utils import hnsw_sweep
+from utils.hnsw_sweep import exact_neighbours, load_hnsw_metadata, recommend, sample_queries, write_config
+
+
+@pytest.fixture
+def corpus():
+    return np.random.RandomState(0).randn(400, 16).astype(np.float32)
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "hnsw_config.json")
+    monkeypatch.setattr(hnsw_sweep, "get_hnsw_settings", lambda: {"config_path": path, "target_recall": 0.95})
+    return path
+
+
+def test_exact_neighbours_in_each_space(corpus):
+    queries = corpus[:3] + 0.001
+    for space in ["l2", "cosine", "ip"]:
+        top = exact_neighbours(corpus, queries, k=4, space=space)
+        assert top.shape == (3, 4)
+        if space != "ip":
+            assert list(top[:, 0]) == [0, 1, 2]
+
+    distances = np.linalg.norm(corpus - queries[0], axis=1)
+    assert list(exact_neighbours(corpus, queries[:1], k=5)[0]) == list(np.argsort(distances)[:5])
+
+
+def test_sample_queries_are_near_but_not_equal_to_corpus_rows(corpus):
+    queries = sample_queries(corpus, 50, seed=1)
+    assert queries.shape == (50, 16)
+    nearest = exact_neighbours(corpus, queries, k=1)[:, 0]
+    assert not any(np.array_equal(query, corpus[row]) for query, row in zip(queries, nearest))
+    assert len(sample_queries(corpus, 1000)) == len(corpus)
+
+
+def test_recommend_prefers_the_fastest_passing_config():
+    results = [
+        {"M": 8, "recall": 0.90, "p95_ms": 0.1, "index_mb": 1, "build_seconds": 1},
+        {"M": 16, "recall": 0.96, "p95_ms": 0.3, "index_mb": 2, "build_seconds": 1},
+        {"M": 32, "recall": 0.99, "p95_ms": 0.5, "index_mb": 3, "build_seconds": 2},
+    ]
+    assert recommend(results, 0.95)["M"] == 16
+    # Nothing passes: fall back to the most accurate
+    assert recommend(results, 0.999)["M"] == 32
+
+
+def test_config_round_trip(config_path):
+    assert load_hnsw_metadata() == {}
+    best = {"M": 16, "ef_construction": 200, "ef_search": 40, "recall": 0.97}
+    config = write_config(best, "cosine", 400, 0.95)
+    assert config["collection_metadata"] == {
+        "hnsw:space": "cosine", "hnsw:M": 16, "hnsw:construction_ef": 200, "hnsw:search_ef": 40
+    }
+    assert load_hnsw_metadata() == config["collection_metadata"]
+    with open(config_path, encoding="utf-8") as f:
+        assert json.load(f)["measured"] == best
+
+
+def test_sweep_measures_every_combination(corpus):
+    pytest.importorskip("hnswlib")
+    sweep = hnsw_sweep.HNSWSweep(corpus, sample_queries(corpus, 20), k=5, num_threads=1)
+    results = sweep.run(m_values=[4, 16], ef_construction_values=[50], ef_search_values=[5, 100])
+
+    assert [(r["M"], r["ef_search"]) for r in results] == [(4, 5), (4, 100), (16, 5), (16, 100)]
+    assert all(0 <= r["recall"] <= 1 and r["index_mb"] > 0 for r in results)
+    # A wide search over a small graph is exact
+    assert results[-1]["recall"] == 1.0
+    assert results[0]["recall"] <= results[1]["recall"]
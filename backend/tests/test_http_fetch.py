@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+
+from utils.http_fetch import HttpFetcher
+
+PAGE = "<html><body>" + "Chinatown heritage " * 30 + "</body></html>"
+
+
+class FakeSite:
+    """MockTransport handler serving one page with an ETag"""
+
+    def __init__(self, body=PAGE, content_type="text/html; charset=utf-8"):
+        self.body = body
+        self.content_type = content_type
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=self.body, headers={"content-type": self.content_type, "etag": '"v1"'})
+
+
+def fetcher_for(site, tmp_path, **kwargs):
+    fetcher = HttpFetcher(cache_dir=str(tmp_path), **kwargs)
+    fetcher.client = httpx.AsyncClient(transport=httpx.MockTransport(site))
+    return fetcher
+
+
+async def extract(html):
+    return html.replace("<html><body>", "").replace("</body></html>", "")
+
+
+async def no_browser(url):
+    raise AssertionError("browser should not be used")
+
+
+def test_refetch_is_conditional_and_served_from_cache(tmp_path):
+    site = FakeSite()
+
+    async def run():
+        fetcher = fetcher_for(site, tmp_path)
+        first = await fetcher.fetch("https://example.com/a")
+        second = await fetcher.fetch("https://example.com/a")
+        await fetcher.close()
+        return fetcher, first, second
+
+    fetcher, first, second = asyncio.run(run())
+    assert first == second == PAGE
+    assert "if-none-match" not in site.requests[0].headers
+    assert site.requests[1].headers["if-none-match"] == '"v1"'
+    assert fetcher.stats["not_modified"] == 1
+
+
+def test_non_html_response_is_skipped(tmp_path):
+    site = FakeSite(body="{}", content_type="application/json")
+
+    async def run():
+        fetcher = fetcher_for(site, tmp_path)
+        try:
+            return await fetcher.fetch("https://example.com/data")
+        finally:
+            await fetcher.close()
+
+    assert asyncio.run(run()) is None
+
+
+def test_fetch_content_uses_http_when_text_is_long_enough(tmp_path):
+    async def run():
+        fetcher = fetcher_for(FakeSite(), tmp_path)
+        try:
+            return await fetcher.fetch_content("https://example.com/a", extract, no_browser)
+        finally:
+            await fetcher.close()
+
+    text, tier = asyncio.run(run())
+    assert tier == "http"
+    assert text.startswith("Chinatown heritage")
+
+
+def test_fetch_content_falls_back_to_browser_for_thin_pages(tmp_path):
+    rendered = "<html><body>" + "Rendered mural details " * 20 + "</body></html>"
+
+    async def browser(url):
+        return rendered
+
+    async def run():
+        fetcher = fetcher_for(FakeSite(body="<html><body>Loading...</body></html>"), tmp_path)
+        try:
+            return await fetcher.fetch_content("https://example.com/spa", extract, browser), fetcher.stats
+        finally:
+            await fetcher.close()
+
+    (text, tier), stats = asyncio.run(run())
+    assert tier == "browser"
+    assert text.startswith("Rendered mural details")
+    assert stats["browser"] == 1
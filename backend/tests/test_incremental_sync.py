@@ -0,0 +1,106 @@
+from utils.chunker import chunk_document
+from utils.incremental_sync import apply_sync, content_hash, plan_sync
+
+
+class FakeCollection:
+    """In-memory stand-in for the parts of a Chroma collection sync uses"""
+
+    name = "fake"
+
+    def __init__(self):
+        self.rows = {}
+
+    @staticmethod
+    def _matches(metadata, where):
+        for key, condition in (where or {}).items():
+            value = metadata.get(key)
+            if isinstance(condition, dict):
+                if "$in" in condition and value not in condition["$in"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def get(self, include=None, where=None, limit=None, offset=0):
+        ids = sorted(i for i, row in self.rows.items() if self._matches(row["metadata"], where))
+        ids = ids[offset:offset + limit] if limit else ids[offset:]
+        return {"ids": ids, "metadatas": [self.rows[i]["metadata"] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        for item_id, text, metadata in zip(ids, documents, metadatas):
+            merged = {**self.rows.get(item_id, {}).get("metadata", {}), **metadata}
+            self.rows[item_id] = {"text": text, "metadata": merged}
+
+    def delete(self, ids):
+        for item_id in ids:
+            self.rows.pop(item_id, None)
+
+
+def page(place_id, text):
+    return {"text": text, "metadata": {"place_id": place_id, "name": place_id}}
+
+
+def chunks(*documents):
+    return [chunk for document in documents for chunk in chunk_document(document, chunk_size=20, overlap=0)]
+
+
+def sync(collection, documents, parent_ids):
+    plan = plan_sync(collection, documents, where={"parent_id": {"$in": sorted(parent_ids)}})
+    apply_sync(collection, plan)
+    return plan
+
+
+def test_content_hash_ignores_volatile_metadata():
+    assert content_hash("x", {"name": "a", "last_verified": "2024-01-01"}) == content_hash("x", {"name": "a"})
+    assert content_hash("x", {"name": "a"}) != content_hash("x", {"name": "b"})
+
+
+def test_plan_sorts_documents_into_added_changed_unchanged_and_removed():
+    collection = FakeCollection()
+    documents = [{"id": i, "text": i, "metadata": {"parent_id": "p"}} for i in ["a", "b", "c"]]
+    sync(collection, documents, {"p"})
+
+    documents = [documents[0], {"id": "b", "text": "b2", "metadata": {"parent_id": "p"}},
+                 {"id": "d", "text": "d", "metadata": {"parent_id": "p"}}]
+    plan = plan_sync(collection, documents, where={"parent_id": {"$in": ["p"]}})
+    assert [doc["id"] for doc in plan["added"]] == ["d"]
+    assert [doc["id"] for doc in plan["changed"]] == ["b"]
+    assert plan["unchanged"] == ["a"]
+    assert plan["removed"] == ["c"]
+
+    assert apply_sync(collection, plan, dry_run=True) == {"added": 1, "changed": 1, "unchanged": 1, "removed": 1}
+    assert "c" in collection.rows
+
+
+def test_edited_page_leaves_no_stale_chunks():
+    collection = FakeCollection()
+    sync(collection, chunks(page("p1", "Summary: The temple was founded in 1827.")), {"p1"})
+    old_ids = set(collection.rows)
+
+    sync(collection, chunks(page("p1", "Summary: The temple was founded in 1827 by Naraina Pillai.")), {"p1"})
+    assert len(collection.rows) == 1
+    assert not old_ids & set(collection.rows)
+    assert "Naraina Pillai" in next(iter(collection.rows.values()))["text"]
+
+
+def test_partial_run_only_removes_its_own_parents():
+    collection = FakeCollection()
+    sync(collection, chunks(page("p1", "Summary: First place."), page("p2", "Summary: Second place.")), {"p1", "p2"})
+
+    plan = sync(collection, chunks(page("p1", "Summary: First place, revised.")), {"p1"})
+    assert len(plan["removed"]) == 1
+    assert sorted(row["metadata"]["parent_id"] for row in collection.rows.values()) == ["p1", "p2"]
+
+
+def test_rows_tombstoned_by_earlier_versions_are_deleted_or_revived():
+    collection = FakeCollection()
+    documents = [{"id": i, "text": i, "metadata": {"parent_id": "p"}} for i in ["a", "b"]]
+    sync(collection, documents, {"p"})
+    for row in collection.rows.values():
+        row["metadata"]["tombstoned"] = True
+
+    plan = sync(collection, documents[:1], {"p"})
+    assert [doc["id"] for doc in plan["changed"]] == ["a"]
+    assert plan["removed"] == ["b"]
+    assert list(collection.rows) == ["a"]
+    assert collection.rows["a"]["metadata"]["tombstoned"] is False
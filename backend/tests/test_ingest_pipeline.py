@@ -0,0 +1,105 @@
+import asyncio
+
+from utils.ingest_pipeline import IngestPipeline, Stage
+from utils.job_ledger import JobLedger
+
+
+def run(pipeline, items):
+    return asyncio.run(pipeline.run(items))
+
+
+def test_items_flow_through_plain_and_batch_stages():
+    async def double(x):
+        return x * 2
+
+    async def drop_odd_halves(x):
+        return None if x % 4 else x
+
+    async def total(batch):
+        return [sum(batch)]
+
+    pipeline = IngestPipeline([
+        Stage("double", double, workers=3, queue_size=2),
+        Stage("filter", drop_odd_halves, workers=2),
+        Stage("sum", total, batch_size=100, batch_timeout=0.05)
+    ])
+    results = run(pipeline, list(range(10)))
+
+    assert sum(results) == sum(x * 2 for x in range(10) if x % 2 == 0)
+    assert pipeline.metrics["double"]["processed"] == 10
+    assert pipeline.metrics["filter"]["dropped"] == 5
+    assert pipeline.metrics["total"]["items"] == 10
+
+
+def test_batches_are_capped_at_batch_size():
+    sizes = []
+
+    async def record(batch):
+        sizes.append(len(batch))
+        return batch
+
+    results = run(IngestPipeline([Stage("batch", record, batch_size=4)]), list(range(10)))
+    assert sorted(results) == list(range(10))
+    assert max(sizes) <= 4
+
+
+def test_on_error_sees_every_failed_item():
+    errors = []
+
+    async def fetch(item):
+        if item == "bad":
+            raise ValueError("boom")
+        return item
+
+    async def store(batch):
+        if "poison" in batch:
+            raise RuntimeError("write failed")
+        return batch
+
+    pipeline = IngestPipeline([
+        Stage("fetch", fetch, on_error=lambda item, e: errors.append(("fetch", item, str(e)))),
+        Stage("store", store, batch_size=10, batch_timeout=0.05,
+              on_error=lambda item, e: errors.append(("store", item, str(e))))
+    ])
+    results = run(pipeline, ["ok", "bad", "poison"])
+
+    assert results == []
+    assert ("fetch", "bad", "boom") in errors
+    assert sorted(item for stage, item, _ in errors if stage == "store") == ["ok", "poison"]
+    assert pipeline.metrics["fetch"]["failed"] == 1 and pipeline.metrics["store"]["failed"] == 2
+
+
+def test_a_failing_error_handler_does_not_stop_the_stage():
+    async def fail(item):
+        raise ValueError(item)
+
+    def broken_handler(item, e):
+        raise KeyError("handler")
+
+    pipeline = IngestPipeline([Stage("fail", fail, on_error=broken_handler)])
+    assert run(pipeline, [1, 2, 3]) == []
+    assert pipeline.metrics["fail"]["failed"] == 3
+
+
+def test_stage_failures_recorded_in_the_ledger_are_retryable():
+    ledger = JobLedger("web_urls", path=":memory:")
+    ledger.open_run({url: {"url": url} for url in ["a", "b"]}, final_stage="stored")
+    claimed = ledger.claim(10)
+
+    async def fetch(item):
+        if item["url"] == "b":
+            raise ConnectionError("timed out")
+        return item
+
+    async def store(item):
+        ledger.complete(item["url"], "stored")
+        return item
+
+    run(IngestPipeline([
+        Stage("fetch", fetch, on_error=lambda item, e: ledger.fail(item["url"], f"fetch: {e}")),
+        Stage("store", store)
+    ]), [item for _, item in claimed])
+
+    assert ledger.failures() == {"b": "fetch: timed out"}
+    assert ledger.retry_failed() == 1
+    assert [item_id for item_id, _ in ledger.claim(10)] == ["b"]
@@ -0,0 +1,90 @@
+import pytest
+
+from utils.job_ledger import CLAIMED, DONE, FAILED, PENDING, JobLedger
+
+ITEMS = {"a": {"url": "a"}, "b": {"url": "b"}, "c": {"url": "c"}}
+
+
+@pytest.fixture
+def ledger_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def claimed_ids(ledger, limit=10):
+    return sorted(item_id for item_id, _ in ledger.claim(limit))
+
+
+def test_claim_returns_payloads_once(ledger_path):
+    ledger = JobLedger("web", ledger_path)
+    ledger.open_run(ITEMS, final_stage="stored")
+
+    first = ledger.claim(2)
+    assert [payload for _, payload in first] == [{"url": "a"}, {"url": "b"}]
+    assert claimed_ids(ledger) == ["c"]
+    assert ledger.claim(10) == []
+    assert ledger.summary() == {PENDING: 0, CLAIMED: 3, DONE: 0, FAILED: 0}
+
+
+def test_interrupted_run_resumes_unfinished_items(ledger_path):
+    ledger = JobLedger("web", ledger_path)
+    ledger.open_run(ITEMS, final_stage="stored")
+    ledger.claim(10)
+    ledger.complete("a", "stored", {"doc": 1})
+    ledger.close()
+
+    # b and c are still claimed under a live lease; a new worker waits for it to expire
+    resumed = JobLedger("web", ledger_path, lease_seconds=0)
+    resumed.open_run(ITEMS, final_stage="stored")
+    assert claimed_ids(resumed) == ["b", "c"]
+    assert resumed.results() == {"a": {"doc": 1}}
+
+
+def test_failed_item_does_not_block_later_runs(ledger_path):
+    for _ in range(3):
+        ledger = JobLedger("web", ledger_path)
+        ledger.open_run(ITEMS, final_stage="stored")
+        assert claimed_ids(ledger) == ["a", "b", "c"]
+        ledger.complete("a", "stored")
+        ledger.complete("b", "stored")
+        ledger.fail("c", "fetch failed")
+        ledger.close()
+
+
+def test_done_items_short_of_final_stage_keep_the_run_open(ledger_path):
+    ledger = JobLedger("wiki", ledger_path)
+    ledger.open_run({"a": {}}, final_stage="stored")
+    ledger.claim(1)
+    ledger.complete("a", "fetched", {"text": "x"})
+    ledger.close()
+
+    resumed = JobLedger("wiki", ledger_path)
+    resumed.open_run({"a": {}}, final_stage="stored")
+    assert resumed.claim(1) == []
+    assert resumed.results() == {"a": {"text": "x"}}
+
+    resumed.set_stage("stored")
+    resumed.open_run({"a": {}}, final_stage="stored")
+    assert claimed_ids(resumed) == ["a"]
+
+
+def test_retry_failed_requeues_only_failed_items(ledger_path):
+    ledger = JobLedger("web", ledger_path)
+    ledger.open_run(ITEMS, final_stage="stored")
+    ledger.claim(10)
+    ledger.fail("a", "boom")
+    ledger.fail("b", "boom")
+
+    assert ledger.failures() == {"a": "boom", "b": "boom"}
+    assert ledger.retry_failed(["a"]) == 1
+    assert claimed_ids(ledger) == ["a"]
+    assert ledger.failures() == {"b": "boom"}
+
+
+def test_jobs_are_isolated_and_reset():
+    ledger = JobLedger("web", ":memory:")
+    ledger.open_run({"a": {}}, final_stage="stored")
+    other = JobLedger("wiki", ":memory:")
+    assert other.summary()[PENDING] == 0
+
+    ledger.reset()
+    assert ledger.summary() == {PENDING: 0, CLAIMED: 0, DONE: 0, FAILED: 0}
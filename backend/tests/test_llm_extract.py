@@ -0,0 +1,97 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from utils.llm_extract import LLMExtractor, merge_attractions, validate_extraction
+
+
+def attraction(name, text, **metadata):
+    return {"text": text, "metadata": {"name": name, **metadata}}
+
+
+def test_validate_extraction_normalizes_fields():
+    result = validate_extraction({"attractions": [
+        {"text": " A temple. ", "metadata": {"name": " Jamae Mosque ", "location": None, "extra": "x"}}
+    ]})
+    assert result == [{"text": "A temple.", "metadata": {"name": "Jamae Mosque", "location": "", "attraction_type": ""}}]
+    assert validate_extraction({"attractions": []}) == []
+
+
+@pytest.mark.parametrize("bad", [
+    [],
+    {"items": []},
+    {"attractions": ["text"]},
+    {"attractions": [{"text": 1, "metadata": {"name": "a"}}]},
+    {"attractions": [{"text": "t", "metadata": {"name": "  "}}]},
+    {"attractions": [{"text": "t"}]},
+])
+def test_validate_extraction_rejects_schema_violations(bad):
+    with pytest.raises(ValueError):
+        validate_extraction(bad)
+
+
+def test_merge_groups_by_cleaned_name_and_drops_repeated_sentences():
+    merged = merge_attractions([
+        attraction("Bruce Lee Mural", "A mural on Upper Cross Street. It was painted in 2020.", location="", attraction_type="mural"),
+        attraction("Jamae Mosque", "One of the oldest mosques.", location="South Bridge Road", attraction_type=""),
+        attraction("bruce lee mural!", "It was painted in 2020. It shows the actor mid-kick.", location="Chinatown", attraction_type=""),
+    ])
+    assert [item["metadata"]["name"] for item in merged] == ["Bruce Lee Mural", "Jamae Mosque"]
+    assert merged[0]["text"] == "A mural on Upper Cross Street. It was painted in 2020. It shows the actor mid-kick."
+    # Empty fields are filled from later chunks, set ones are kept
+    assert merged[0]["metadata"]["location"] == "Chinatown"
+    assert merged[0]["metadata"]["attraction_type"] == "mural"
+
+
+class FakeCompletions:
+    """Answers each chunk with the attraction named at its start; fails listed chunks once"""
+
+    def __init__(self, fail_once=(), truncate=()):
+        self.fail_once = set(fail_once)
+        self.truncate = set(truncate)
+        self.calls = []
+
+    async def create(self, model, messages, **kwargs):
+        excerpt = messages[0]["content"].split("Excerpt: ", 1)[1]
+        name = excerpt.split(" ", 1)[0]
+        self.calls.append(name)
+        if name in self.fail_once:
+            self.fail_once.discard(name)
+            content = "not json"
+        else:
+            content = json.dumps({"attractions": [{"text": f"{name} is a place.", "metadata": {"name": name}}]})
+        finish_reason = "length" if name in self.truncate else "stop"
+        return SimpleNamespace(choices=[SimpleNamespace(finish_reason=finish_reason, message=SimpleNamespace(content=content))])
+
+
+def extractor(completions, **kwargs):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return LLMExtractor(client=client, chunk_tokens=20, overlap_tokens=0, **kwargs)
+
+
+PAGE = " ".join(f"{name} is described here with enough words to fill a chunk on its own." for name in ["Alpha", "Beta", "Gamma"])
+
+
+def test_extract_maps_chunks_and_retries_only_failed_ones():
+    completions = FakeCompletions(fail_once={"Beta"})
+    result = asyncio.run(extractor(completions).extract(PAGE, "https://example.com"))
+    assert [item["metadata"]["name"] for item in result] == ["Alpha", "Beta", "Gamma"]
+    assert sorted(completions.calls) == ["Alpha", "Beta", "Beta", "Gamma"]
+
+
+def test_chunks_that_keep_failing_are_left_out():
+    completions = FakeCompletions(truncate={"Gamma"})
+    result = asyncio.run(extractor(completions, max_retries=1).extract(PAGE))
+    assert [item["metadata"]["name"] for item in result] == ["Alpha", "Beta"]
+    assert completions.calls.count("Gamma") == 2
+
+
+def test_to_documents_uses_the_stored_document_format():
+    documents = extractor(FakeCompletions()).to_documents(
+        [attraction("Jamae Mosque", "A mosque.", location="Chinatown", attraction_type="mosque")], "https://example.com"
+    )
+    metadata = documents[0]["metadata"]
+    assert metadata["source"] == "web_scrape" and metadata["source_url"] == "https://example.com"
+    assert metadata["location"] == "Chinatown" and metadata["has_scrape_content"] is True
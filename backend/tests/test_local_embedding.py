@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from utils import local_embedding
+
+
+class CountingModel:
+    created = 0
+
+    def __init__(self, intra_op_threads=1):
+        CountingModel.created += 1
+        self.model = object()
+
+    def __call__(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+def test_query_model_is_created_once_per_process(monkeypatch):
+    monkeypatch.setattr(local_embedding, "ThreadedONNXMiniLM", CountingModel)
+    monkeypatch.setattr(local_embedding, "_query_model", None)
+    CountingModel.created = 0
+
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(local_embedding.get_query_model())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert CountingModel.created == 1
+    assert all(model is models[0] for model in models)
+    assert local_embedding.get_query_model()(["abc"]) == [[3.0]]
+
+
+class FakeMiniLM(CountingModel):
+    """Deterministic stand-in for the ONNX model"""
+
+    batches = []
+
+    def __call__(self, texts):
+        FakeMiniLM.batches.append(len(texts))
+        return [[float(len(text)), float(text.count("a"))] for text in texts]
+
+    def _download_model_if_not_exists(self):
+        pass
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_embedding, "ThreadedONNXMiniLM", FakeMiniLM)
+    FakeMiniLM.batches = []
+    engine = local_embedding.LocalEmbeddingEngine(
+        workers=2, intra_op_threads=1, batch_size=3,
+        cache=local_embedding.EmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    )
+    yield engine
+    engine.close()
+
+
+def test_small_inputs_are_embedded_in_process_and_cached(engine):
+    vectors = engine.embed(["banana", "kaya", "banana"])
+    assert vectors == [[6.0, 3.0], [4.0, 2.0], [6.0, 3.0]]
+    assert FakeMiniLM.batches == [2]
+
+    assert engine.embed(["kaya"]) == [[4.0, 2.0]]
+    assert FakeMiniLM.batches == [2]
+
+
+def test_large_inputs_are_spread_over_the_pool_in_order(engine):
+    texts = [f"text {'a' * i}" for i in range(10)]
+    vectors = engine.embed(texts)
+    assert vectors == [[float(len(text)), float(text.count("a"))] for text in texts]
+    # Worker processes embed these, not the in-process model
+    assert FakeMiniLM.batches == []
+
+
+def test_embed_documents_keeps_existing_embeddings(engine):
+    documents = [{"text": "laksa"}, {"text": "satay", "embedding": [0.0, 0.0]}]
+    engine.embed_documents(documents)
+    assert documents[0]["embedding"] == [5.0, 2.0]
+    assert documents[1]["embedding"] == [0.0, 0.0]
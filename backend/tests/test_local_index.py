@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils import local_index
+from utils.local_index import LocalVectorIndex, export_collection, index_paths, load_metadata
+
+
+def write_index(tmp_path, vectors, normalized=True, name="Corpus"):
+    paths = index_paths(str(tmp_path), name)
+    np.save(paths["vectors"], vectors)
+    columns = {"uuid": [f"u{i}" for i in range(len(vectors))], "name": [f"place {i}" for i in range(len(vectors))]}
+    with open(paths["metadata"], "w", encoding="utf-8") as f:
+        json.dump({"count": len(vectors), "normalized": normalized, "columns": columns}, f)
+    return LocalVectorIndex(name, str(tmp_path))
+
+
+def brute_force(vectors, query, k):
+    vectors = vectors.astype(np.float64)
+    scores = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    return [f"u{i}" for i in np.argsort(-scores)[:k]]
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.RandomState(0)
+    return rng.randn(3000, 32).astype(np.float32)
+
+
+def test_search_returns_exact_top_k_in_score_order(tmp_path, corpus):
+    normalized = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    index = write_index(tmp_path, normalized)
+    query = corpus[7] + 0.01
+
+    hits = index.search(query, limit=5)
+    assert [hit["uuid"] for hit in hits] == brute_force(corpus, query, 5)
+    assert hits[0]["name"] == "place 7"
+    assert all(a["score"] >= b["score"] for a, b in zip(hits, hits[1:]))
+
+    assert len(index.search(query, limit=10000)) == len(corpus)
+    assert index.search(query, limit=0) == []
+
+
+def test_search_batch_matches_single_searches(tmp_path, corpus):
+    index = write_index(tmp_path, corpus / np.linalg.norm(corpus, axis=1, keepdims=True))
+    queries = corpus[[1, 2, 3]]
+    batch = index.search_batch(queries, limit=3)
+    assert [[hit["uuid"] for hit in hits] for hits in batch] == [
+        [hit["uuid"] for hit in index.search(query, limit=3)] for query in queries
+    ]
+
+
+def test_float16_index_is_scored_in_blocks(tmp_path, corpus, monkeypatch):
+    # Several blocks, the last one partial
+    monkeypatch.setattr(local_index, "SCORE_BLOCK_ROWS", 700)
+    normalized = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    index = write_index(tmp_path, normalized.astype(np.float16))
+    query = corpus[42]
+
+    scores = index.scores(query)
+    assert scores.dtype == np.float32 and scores.shape == (1, len(corpus))
+    np.testing.assert_allclose(scores[0], normalized @ (query / np.linalg.norm(query)), atol=2e-3)
+    assert index.search(query, limit=1)[0]["uuid"] == "u42"
+
+
+def test_unnormalized_index_still_scores_cosine(tmp_path, corpus, monkeypatch):
+    monkeypatch.setattr(local_index, "SCORE_BLOCK_ROWS", 1000)
+    scaled = corpus * np.random.RandomState(1).uniform(0.1, 10, (len(corpus), 1)).astype(np.float32)
+    index = write_index(tmp_path, scaled, normalized=False)
+    query = corpus[5]
+    assert [hit["uuid"] for hit in index.search(query, limit=5)] == brute_force(scaled, query, 5)
+
+
+def test_wrong_query_dimension_is_rejected(tmp_path, corpus):
+    index = write_index(tmp_path, corpus / np.linalg.norm(corpus, axis=1, keepdims=True))
+    with pytest.raises(ValueError):
+        index.search([1.0, 2.0])
+
+
+def test_export_writes_normalized_vectors_and_columns(tmp_path):
+    objects = [
+        SimpleNamespace(uuid="a", vector={"default": [3.0, 4.0]},
+                        properties={"name": "Jamae Mosque", "last_verified": datetime(2024, 5, 1), "lat": 1.28}),
+        SimpleNamespace(uuid="b", vector=None, properties={"name": "no vector"}),
+        SimpleNamespace(uuid="c", vector=[0.0, 2.0], properties={"name": "Club Street"}),
+    ]
+    collection = SimpleNamespace(iterator=lambda include_vector: iter(objects))
+    store = SimpleNamespace(client=SimpleNamespace(collections=SimpleNamespace(get=lambda name: collection)))
+
+    assert export_collection(store, "Corpus", str(tmp_path), dtype="float16") == 2
+
+    index = LocalVectorIndex("Corpus", str(tmp_path))
+    assert index.vectors.dtype == np.float16
+    np.testing.assert_allclose(np.asarray(index.vectors, dtype=np.float32), [[0.6, 0.8], [0.0, 1.0]], atol=1e-3)
+    columns = load_metadata(str(tmp_path), "Corpus")["columns"]
+    assert columns["uuid"] == ["a", "c"]
+    assert columns["last_verified"][0].startswith("2024-05-01")
+    assert columns["lat"] == [1.28, None] and columns["source"] == ["", ""]
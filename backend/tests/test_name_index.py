@@ -0,0 +1,53 @@
+from utils.name_index import AttractionNameIndex, clean_name, ngrams
+
+ATTRACTIONS = {
+    "One": [
+        {"name": "Sri Mariamman Temple", "url": "https://en.wikipedia.org/wiki/Sri_Mariamman_Temple,_Singapore"},
+        {"name": "Buddha Tooth Relic Temple | 佛牙寺", "url": "https://en.wikipedia.org/wiki/Buddha_Tooth_Relic_Temple"},
+    ],
+    "Two": [
+        {"name": "Thian Hock Keng", "url": "https://en.wikipedia.org/wiki/Thian_Hock_Keng"},
+        {"name": "Jamae Mosque", "url": "https://en.wikipedia.org/wiki/Jamae_Mosque"},
+    ],
+    "Three": [
+        {"name": "Mural: Lanterns", "url": "N/A"},
+    ],
+    "Ignored": [
+        {"name": "Not a curated category", "url": "N/A"},
+    ]
+}
+
+
+def test_clean_name_and_ngrams():
+    assert clean_name("  Buddha Tooth Relic Temple | 佛牙寺 ") == "buddha tooth relic temple"
+    assert clean_name("Mural: Lanterns!") == "mural lanterns"
+    assert ngrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_exact_and_near_names_match_their_entry():
+    index = AttractionNameIndex(ATTRACTIONS)
+    entry, ratio = index.match("Sri Mariamman Temple")
+    assert entry["category"] == "One" and ratio == 1.0
+    entry, ratio = index.match("Sri Mariaman Temple")
+    assert entry["name"] == "Sri Mariamman Temple" and 0.8 < ratio < 1.0
+    assert index.match("Thian Hock Keng Temple")[0]["name"] == "Thian Hock Keng"
+
+
+def test_contained_names_match_below_the_threshold():
+    index = AttractionNameIndex(ATTRACTIONS)
+    entry, ratio = index.match("Mural")
+    assert entry["name"] == "Mural: Lanterns"
+    assert 0.5 < ratio < 0.8
+
+
+def test_unrelated_names_do_not_match():
+    index = AttractionNameIndex(ATTRACTIONS)
+    assert index.match("Marina Bay Sands") == (None, 0.8)
+    assert index.match("Not a curated category")[0] is None
+
+
+def test_candidates_are_narrowed_by_shared_ngrams():
+    index = AttractionNameIndex(ATTRACTIONS)
+    assert len(index.entries) == 5
+    assert [index.entries[i]["name"] for i in index.candidates(clean_name("Jamae Mosque"))] == ["Jamae Mosque"]
+    assert index.candidates(clean_name("zzzz")) == []
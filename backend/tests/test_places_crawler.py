@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+from utils.places_crawler import MAX_RESULTS_PER_SEARCH, PlacesCrawler, point_in_polygon, split_cell, tile_area
+from utils.geo import haversine
+
+CHINATOWN = (1.278, 103.840, 1.288, 103.850)
+
+
+class FakeGmaps:
+    """places_nearby that returns one place per cell, named after its centre"""
+
+    def __init__(self, fail_at=None, full_at=None):
+        self.calls = []
+        self.fail_at = fail_at or set()
+        self.full_at = full_at or set()
+
+    def places_nearby(self, location, radius, type, language):
+        self.calls.append(location)
+        if location in self.fail_at:
+            raise RuntimeError("quota exceeded")
+        count = MAX_RESULTS_PER_SEARCH if location in self.full_at else 1
+        key = f"{location[0]},{location[1]}"
+        return {"results": [{"place_id": f"{key}#{i}", "name": key} for i in range(count)]}
+
+
+def crawler(tmp_path, gmaps, **kwargs):
+    return PlacesCrawler(gmaps, checkpoint_path=str(tmp_path / "checkpoint.json"),
+                         requests_per_second=1000, **kwargs)
+
+
+def test_tile_area_covers_the_bbox_without_gaps():
+    cells = tile_area(CHINATOWN, cell_radius=300)
+    assert len({cell["id"] for cell in cells}) == len(cells)
+
+    # Every point of a fine grid over the bbox falls inside some circle
+    for i in range(11):
+        for j in range(11):
+            lat = CHINATOWN[0] + (CHINATOWN[2] - CHINATOWN[0]) * i / 10
+            lng = CHINATOWN[1] + (CHINATOWN[3] - CHINATOWN[1]) * j / 10
+            assert any(haversine(lat, lng, cell["lat"], cell["lng"]) <= cell["radius"] for cell in cells)
+
+
+def test_tile_area_keeps_only_cells_touching_the_polygon():
+    south, west, north, east = CHINATOWN
+    triangle = [(south, west), (south, east), (north, west)]
+    all_cells = tile_area(CHINATOWN, cell_radius=300)
+    kept = tile_area(CHINATOWN, cell_radius=300, polygon=triangle)
+    assert 0 < len(kept) < len(all_cells)
+    assert point_in_polygon(south + 0.001, west + 0.001, triangle)
+    assert not point_in_polygon(north - 0.001, east - 0.001, triangle)
+
+
+def test_split_cell_gives_four_smaller_cells_covering_the_parent():
+    cell = {"id": "2:3", "lat": 1.283, "lng": 103.845, "radius": 400}
+    subs = split_cell(cell)
+    assert [sub["id"] for sub in subs] == ["2:3/0", "2:3/1", "2:3/2", "2:3/3"]
+    assert all(sub["radius"] < cell["radius"] for sub in subs)
+    # Corners of the parent's inscribed square are covered by a sub-cell
+    for sub in subs:
+        corner_lat = cell["lat"] + (sub["lat"] - cell["lat"]) * 2 ** 0.5
+        corner_lng = cell["lng"] + (sub["lng"] - cell["lng"]) * 2 ** 0.5
+        assert haversine(corner_lat, corner_lng, sub["lat"], sub["lng"]) <= sub["radius"]
+
+
+def test_crawl_dedups_places_and_clears_the_checkpoint_when_done(tmp_path):
+    cells = tile_area(CHINATOWN, cell_radius=500)
+    places = crawler(tmp_path, FakeGmaps()).crawl_sync(cells + cells[:1])
+    assert len(places) == len(cells)
+    assert not os.path.exists(tmp_path / "checkpoint.json")
+
+
+def test_saturated_cells_are_split(tmp_path):
+    cells = tile_area(CHINATOWN, cell_radius=500)
+    first = (cells[0]["lat"], cells[0]["lng"])
+    gmaps = FakeGmaps(full_at={first})
+    places = crawler(tmp_path, gmaps).crawl_sync(cells)
+    assert len(gmaps.calls) == len(cells) + 4
+    assert len(places) == MAX_RESULTS_PER_SEARCH + len(cells) - 1 + 4
+
+
+def test_failed_cells_keep_the_checkpoint_and_are_retried(tmp_path):
+    cells = tile_area(CHINATOWN, cell_radius=500)
+    failing = (cells[1]["lat"], cells[1]["lng"])
+    crawler(tmp_path, FakeGmaps(fail_at={failing})).crawl_sync(cells)
+    with open(tmp_path / "checkpoint.json", encoding="utf-8") as f:
+        assert len(json.load(f)["completed_cells"]) == len(cells) - 1
+
+    gmaps = FakeGmaps()
+    places = crawler(tmp_path, gmaps).crawl_sync(cells)
+    assert gmaps.calls == [failing]
+    assert len(places) == len(cells)
+    assert not os.path.exists(tmp_path / "checkpoint.json")
+
+
+@pytest.mark.parametrize("change", ["bbox", "radius", "place_type"])
+def test_checkpoint_of_a_different_crawl_is_ignored(tmp_path, change):
+    cells = tile_area(CHINATOWN, cell_radius=500)
+    crawler(tmp_path, FakeGmaps(fail_at={(cells[0]["lat"], cells[0]["lng"])})).crawl_sync(cells)
+
+    kwargs = {}
+    if change == "bbox":
+        # Same grid shape, so the same "row:col" ids, shifted across the island
+        south, west, north, east = CHINATOWN
+        cells = tile_area((south + 0.05, west + 0.05, north + 0.05, east + 0.05), cell_radius=500)
+    elif change == "radius":
+        cells = tile_area(CHINATOWN, cell_radius=400)
+    else:
+        kwargs["place_type"] = "museum"
+
+    gmaps = FakeGmaps()
+    places = crawler(tmp_path, gmaps, **kwargs).crawl_sync(cells)
+    assert len(gmaps.calls) == len(cells)
+    assert {place["name"] for place in places} == {f"{cell['lat']},{cell['lng']}" for cell in cells}
@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+import pytest
+
+from utils.local_index import LocalVectorIndex, index_paths
+from utils.retrieval_benchmark import (
+    FakeLatencyBackend, LocalExactBackend, recall_at_k, run_benchmark, sample_query_vectors
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    rng = np.random.RandomState(0)
+    vectors = rng.randn(500, 16).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    paths = index_paths(str(tmp_path), "Corpus")
+    np.save(paths["vectors"], vectors)
+    with open(paths["metadata"], "w", encoding="utf-8") as f:
+        json.dump({"count": 500, "normalized": True, "columns": {"uuid": [f"u{i}" for i in range(500)]}}, f)
+    return LocalVectorIndex("Corpus", str(tmp_path))
+
+
+class DropLastBackend:
+    """Approximate backend that misses the k-th neighbour"""
+
+    name = "drop-last"
+
+    def __init__(self, index):
+        self.exact = LocalExactBackend(index)
+
+    def search(self, vector, k):
+        return self.exact.search(vector, k)[:-1] + ["missing"]
+
+
+def test_recall_at_k():
+    assert recall_at_k([["a", "b"], ["c", "x"]], [["a", "b"], ["c", "d"]], 2) == 0.75
+    assert recall_at_k([], [], 5) == 0.0
+
+
+def test_sampled_queries_are_near_their_source_rows(index):
+    queries = sample_query_vectors(index, 10)
+    assert queries.shape == (10, 16)
+    assert np.allclose(np.linalg.norm(queries, axis=1), 1.0, atol=1e-5)
+    top_scores = index.scores(queries).max(axis=1)
+    assert (top_scores > 0.99).all()
+
+
+def test_run_benchmark_reports_latency_qps_and_recall(index):
+    queries = sample_query_vectors(index, 20)
+    backends = [FakeLatencyBackend(LocalExactBackend(index), latency_ms=2, jitter_ms=0), DropLastBackend(index)]
+
+    reports = {report["backend"]: report for report in run_benchmark(index, backends, queries, k=5, concurrency=4, rounds=2)}
+
+    exact = reports["local-exact"]
+    assert exact["recall@5"] == 1.0
+    assert exact["queries"] == 20
+    assert exact["p50_ms"] <= exact["p95_ms"] <= exact["p99_ms"]
+
+    fake = reports["fake(local-exact, 2ms)"]
+    assert fake["recall@5"] == 1.0
+    assert fake["p50_ms"] >= 2
+    # Concurrent replay overlaps the simulated round trips
+    assert fake["qps"] > 1000 / fake["p50_ms"]
+
+    assert reports["drop-last"]["recall@5"] == pytest.approx(0.8)
+
+
+def test_failing_backend_is_reported_not_raised(index):
+    class Broken:
+        name = "broken"
+
+        def search(self, vector, k):
+            raise ConnectionError("service down")
+
+    reports = run_benchmark(index, [Broken()], sample_query_vectors(index, 5), k=3)
+    assert reports[-1] == {"backend": "broken", "error": "service down"}
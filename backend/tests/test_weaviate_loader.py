@@ -0,0 +1,112 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("weaviate")
+
+from utils import weaviate_loader
+from utils.local_index import METADATA_COLUMNS, index_paths
+from utils.weaviate_loader import BulkLoader, iter_export
+
+
+class FakeData:
+    def __init__(self, reject=(), fail_calls=0):
+        self.objects = {}
+        self.reject = set(reject)
+        self.fail_calls = fail_calls
+        self.batch_sizes = []
+
+    def insert_many(self, objects):
+        if self.fail_calls:
+            self.fail_calls -= 1
+            raise ConnectionError("connection reset")
+        self.batch_sizes.append(len(objects))
+        errors = {}
+        for index, obj in enumerate(objects):
+            if obj.uuid in self.reject:
+                errors[index] = SimpleNamespace(message="invalid property")
+            else:
+                self.objects[obj.uuid] = obj
+        return SimpleNamespace(errors=errors)
+
+
+def fake_store(data):
+    collection = SimpleNamespace(
+        data=data,
+        aggregate=SimpleNamespace(over_all=lambda total_count: SimpleNamespace(total_count=len(data.objects)))
+    )
+    return SimpleNamespace(client=SimpleNamespace(collections=SimpleNamespace(get=lambda name: collection)))
+
+
+def rows(count):
+    return [(f"u{i}", {"name": f"place {i}"}, [float(i), 1.0]) for i in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(weaviate_loader.time, "sleep", lambda seconds: None)
+
+
+def loader(tmp_path, data, **kwargs):
+    return BulkLoader(fake_store(data), "Corpus", checkpoint_path=str(tmp_path / "checkpoint"), **kwargs)
+
+
+def test_iter_export_converts_rows_to_weaviate_properties(tmp_path):
+    paths = index_paths(str(tmp_path), "Corpus")
+    np.save(paths["vectors"], np.asarray([[0.6, 0.8], [1.0, 0.0]], dtype=np.float16))
+    columns = {name: ["", ""] for name in METADATA_COLUMNS}
+    columns.update(uuid=["a", "b"], name=["Jamae Mosque", "Club Street"], lat=[1.28, ""], lng=[103.84, None],
+                   last_verified=["2024-05-01", "not a date"])
+    with open(paths["metadata"], "w", encoding="utf-8") as f:
+        json.dump({"count": 2, "columns": columns}, f)
+
+    (uuid_a, props_a, vector_a), (uuid_b, props_b, _) = list(iter_export(str(tmp_path), "Corpus"))
+    assert uuid_a == "a" and props_a["lat"] == 1.28
+    assert props_a["last_verified"].isoformat() == "2024-05-01T00:00:00+00:00"
+    assert vector_a == pytest.approx([0.6, 0.8], abs=1e-3)
+    assert "lat" not in props_b and "lng" not in props_b and "last_verified" not in props_b
+    assert props_b["source"] == ""
+
+
+def test_per_object_errors_are_collected_and_not_checkpointed(tmp_path):
+    data = FakeData(reject={"u3"})
+    report = loader(tmp_path, data, initial_batch=4).load(rows(10))
+    assert report["written"] == 9 and report["failed"] == 1
+    assert "u3" not in data.objects
+
+    resumed = loader(tmp_path, data)
+    assert "u3" not in resumed.loaded and len(resumed.loaded) == 9
+    data.reject.clear()
+    report = resumed.load(rows(10))
+    assert (report["written"], report["skipped"], report["failed"]) == (1, 9, 0)
+    assert resumed.verify(10)
+
+
+def test_transport_errors_are_retried_with_smaller_batches(tmp_path):
+    data = FakeData(fail_calls=1)
+    bulk = loader(tmp_path, data, initial_batch=40, min_batch=10)
+    report = bulk.load(rows(40))
+    assert report["written"] == 40
+    assert bulk.batch_size < 40
+
+
+def test_batch_that_keeps_failing_is_reported(tmp_path):
+    data = FakeData(fail_calls=10)
+    bulk = loader(tmp_path, data, initial_batch=5, max_retries=2)
+    report = bulk.load(rows(5))
+    assert report["written"] == 0 and report["failed"] == 5
+    assert not bulk.verify(5)
+
+
+def test_batch_size_adapts_to_latency(tmp_path):
+    bulk = loader(tmp_path, FakeData(), initial_batch=100, min_batch=10, max_batch=120, target_latency=1.0)
+    bulk._adapt(0.1)
+    assert bulk.batch_size == 120
+    bulk._adapt(5.0)
+    bulk._adapt(5.0)
+    bulk._adapt(5.0)
+    assert bulk.batch_size == 15
+    bulk._adapt(5.0)
+    assert bulk.batch_size == 10
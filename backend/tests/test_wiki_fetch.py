@@ -0,0 +1,115 @@
+import httpx
+
+from utils.wiki_fetch import WikiFetcher, build_wiki_content, title_from_url
+
+ARTICLES = {
+    "Sri Mariamman Temple, Singapore": {
+        "summary": "Singapore's oldest Hindu temple.",
+        "text": "Intro.\n\nHistory: founded in 1827.\n\nArchitecture: a six-tier gopuram."
+    },
+    "Thian Hock Keng": {
+        "summary": "A Hokkien temple on Telok Ayer Street.",
+        "text": "Intro.\n\nThe temple was established in 1839."
+    }
+}
+REDIRECTS = {"Sri Mariamman Temple": "Sri Mariamman Temple, Singapore"}
+SEARCH = {"Thian Hock Keng Temple": "Thian Hock Keng"}
+
+
+class FakeWiki:
+    """Just enough of the MediaWiki query API for WikiFetcher"""
+
+    def __init__(self):
+        self.requests = []
+
+    def page(self, title, intro):
+        article = ARTICLES[title]
+        page = {"title": title, "extract": article["summary"] if intro else article["text"]}
+        if intro:
+            page["fullurl"] = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+        return page
+
+    def __call__(self, request):
+        params = dict(request.url.params)
+        self.requests.append(params)
+        if params.get("list") == "search":
+            hit = SEARCH.get(params["srsearch"])
+            return httpx.Response(200, json={"query": {"search": [{"title": hit}] if hit else []}})
+
+        titles = params["titles"].split("|")
+        redirects = [{"from": t, "to": REDIRECTS[t]} for t in titles if t in REDIRECTS]
+        pages = []
+        for title in titles:
+            final = REDIRECTS.get(title, title)
+            if final in ARTICLES:
+                pages.append(self.page(final, intro="exintro" in params))
+            else:
+                pages.append({"title": final, "missing": True})
+        return httpx.Response(200, json={"query": {"redirects": redirects, "pages": pages}})
+
+
+def fetcher(tmp_path, wiki):
+    return WikiFetcher(api_url="https://wiki.test/w/api.php", cache_dir=str(tmp_path),
+                       requests_per_second=1000, transport=httpx.MockTransport(wiki))
+
+
+URLS = [
+    "https://en.wikipedia.org/wiki/Sri_Mariamman_Temple",
+    "https://en.wikipedia.org/wiki/Thian_Hock_Keng_Temple",
+    "https://en.wikipedia.org/wiki/No_Such_Place",
+    "N/A"
+]
+
+
+def test_title_from_url_and_sections():
+    assert title_from_url("https://en.wikipedia.org/wiki/Telok_Ayer_Street") == "Telok Ayer Street"
+    content = build_wiki_content("Summary.", "Intro.\n\nHistory: old.\n\nArchitecture: tall.", "u")
+    assert content == {"summary": "Summary.", "history": "History: old.\n", "description": "Architecture: tall.\n", "url": "u"}
+
+
+def test_fetch_pages_follows_redirects_and_search_in_batched_requests(tmp_path):
+    wiki = FakeWiki()
+    results = fetcher(tmp_path, wiki).fetch_pages_sync(URLS)
+
+    mariamman = results[URLS[0]]
+    assert mariamman["summary"] == "Singapore's oldest Hindu temple."
+    assert mariamman["history"] == "History: founded in 1827.\n"
+    assert mariamman["description"] == "Architecture: a six-tier gopuram.\n"
+    assert mariamman["url"] == URLS[0]
+    assert results[URLS[1]]["summary"] == "A Hokkien temple on Telok Ayer Street."
+    assert results[URLS[2]] is None and results["N/A"] is None
+
+    # One batched resolve, two searches, one resolve of the search hit, two full texts
+    resolves = [r for r in wiki.requests if "exintro" in r]
+    assert resolves[0]["titles"] == "Sri Mariamman Temple|Thian Hock Keng Temple|No Such Place"
+    assert len(wiki.requests) == 6
+
+
+def test_second_run_is_served_from_the_disk_cache(tmp_path):
+    fetcher(tmp_path, FakeWiki()).fetch_pages_sync(URLS)
+
+    wiki = FakeWiki()
+    cached = fetcher(tmp_path, wiki)
+    results = cached.fetch_pages_sync(URLS)
+    assert wiki.requests == []
+    assert cached.cache_hits == 6
+    assert results[URLS[0]]["summary"] == "Singapore's oldest Hindu temple."
+
+
+def test_retryable_errors_are_retried(tmp_path, monkeypatch):
+    wiki = FakeWiki()
+    failures = {"left": 1}
+
+    def flaky(request):
+        if failures["left"]:
+            failures["left"] -= 1
+            return httpx.Response(503)
+        return wiki(request)
+
+    async def no_sleep(seconds):
+        return None
+
+    monkeypatch.setattr("utils.wiki_fetch.asyncio.sleep", no_sleep)
+    results = WikiFetcher(api_url="https://wiki.test/w/api.php", cache_dir=str(tmp_path), requests_per_second=1000,
+                          transport=httpx.MockTransport(flaky)).fetch_pages_sync(URLS[:1])
+    assert results[URLS[0]]["summary"] == "Singapore's oldest Hindu temple."
@@ -5,6 +5,10 @@ from typing import Dict, List
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from utils.store import WeaviateStore
+from utils.geo import GeoIndex
+from utils.fact_cards import FactCardStore
+from utils.local_index import index_paths, load_metadata
+from config import get_chroma_settings, get_local_index_settings
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -13,13 +17,98 @@ class RAGManager:
     #     self.store = WeaviateStore()
     #     logging.basicConfig(level=logging.INFO)
 
+    # Weaviate collection name -> key in the combined results
+    COLLECTIONS = {
+        "WikipediaCollection": "wikipedia",
+        "SingaporeAttraction": "attractions"
+    }
+
+    # Local Chroma collection -> key in the combined results. wikipedia_data.py
+    # is the only ingest path that records lat/lng, and it writes them here
+    GEO_COLLECTIONS = {
+        "wikipedia_collection": "wikipedia"
+    }
+
     def __init__(self):
         self.store = None
+        self.geo_indexes = None
+        self.geo_version = None
+        self.chroma_manager = None
+        self.fact_cards = None
         
     def _ensure_store(self):
         if not self.store:
             self.store = WeaviateStore()
 
+    def _ensure_chroma(self):
+        if self.chroma_manager is None:
+            from utils.chroma import ChromaDBManager
+            self.chroma_manager = ChromaDBManager()
+        return self.chroma_manager
+
+    def _geo_sources_version(self) -> tuple:
+        """
+        Cheap fingerprint of everything the geo indexes are built from:
+        sidecar mtimes, Chroma row counts, and the mtime of Chroma's SQLite
+        file, which also moves when a sync replaces chunks one for one
+        """
+        index_dir = get_local_index_settings()["index_dir"]
+        version = []
+        for collection_name in self.COLLECTIONS:
+            path = index_paths(index_dir, collection_name)["metadata"]
+            version.append(os.path.getmtime(path) if os.path.exists(path) else None)
+
+        try:
+            manager = self._ensure_chroma()
+            for collection_name in self.GEO_COLLECTIONS:
+                version.append(manager.chroma_client.get_collection(name=collection_name).count())
+            sqlite_path = os.path.join(get_chroma_settings()["persist_directory"], "chroma.sqlite3")
+            version.append(os.path.getmtime(sqlite_path) if os.path.exists(sqlite_path) else None)
+        except Exception as e:
+            logging.warning(f"Could not read ChromaDB collection counts: {str(e)}")
+        return tuple(version)
+
+    def _ensure_geo_indexes(self):
+        """
+        Build the spatial indexes from the Chroma collections that hold
+        coordinates, plus any lat/lng found in the exported local index
+        metadata (Weaviate objects only have them if ingested with them).
+        They are rebuilt whenever a sync or re-export changes the sources.
+        """
+        version = self._geo_sources_version()
+        if self.geo_indexes is not None and version == self.geo_version:
+            return
+
+        index_dir = get_local_index_settings()["index_dir"]
+        geo_indexes = {}
+        for collection_name, key in self.COLLECTIONS.items():
+            try:
+                sidecar = load_metadata(index_dir, collection_name)
+                geo_indexes[key] = GeoIndex.from_columns(sidecar["columns"])
+            except FileNotFoundError:
+                geo_indexes[key] = GeoIndex()
+
+        try:
+            manager = self._ensure_chroma()
+            for collection_name, key in self.GEO_COLLECTIONS.items():
+                rows = (
+                    {**(doc["metadata"] or {}), "text": doc["document"]}
+                    for doc in manager.iter_collection(collection_name, page_size=500)
+                    # Left behind by syncs from before removed chunks were deleted
+                    if not (doc["metadata"] or {}).get("tombstoned")
+                )
+                geo_indexes[key].add_documents(rows)
+        except Exception as e:
+            logging.warning(f"Could not read coordinates from ChromaDB: {str(e)}")
+
+        for key, index in geo_indexes.items():
+            if index.size:
+                logging.info(f"Loaded geo index for {key} with {index.size} documents")
+            else:
+                logging.warning(f"No documents with coordinates for {key}, location queries will be empty")
+        self.geo_indexes = geo_indexes
+        self.geo_version = version
+
     def query_place(self, place_name: str, limit: int = 5) -> Dict[str, List[str]]:
         """Query both collections for a place"""
         try:
@@ -111,21 +200,55 @@ class RAGManager:
     #             return {"wikipedia": [], "attractions": []}
 
         
-    def query_by_location(self, lat: float, lng: float, radius: float = 500) -> Dict[str, List[str]]:
+    def query_fact_card(self, places: List[Dict]) -> Dict[str, List[str]]:
+        """Look up the precomputed fact card of the first known place in places_nearby results"""
+        try:
+            if self.fact_cards is None:
+                self.fact_cards = FactCardStore()
+
+            card = self.fact_cards.lookup_places(places)
+            if card:
+                return {"wikipedia": [card["text"]], "attractions": []}
+
+        except Exception as e:
+            logging.error(f"Error looking up fact cards: {str(e)}")
+
+        return {"wikipedia": [], "attractions": []}
+
+    def query_by_location(self, lat: float, lng: float, radius: float = 500, limit: int = 5) -> Dict[str, List[str]]:
         """
-        Query attractions near a specific location
+        Query attractions near a specific location. Only documents stored
+        with lat/lng are found: run wikipedia_data.py so the local Chroma
+        collection has coordinates before relying on this.
         
         Args:
             lat: Latitude
             lng: Longitude
             radius: Search radius in meters
+            limit: Maximum number of documents per collection
             
         Returns:
-            Dict containing nearby attractions information
+            Dict containing nearby attractions information, nearest first
         """
-        # This would require geospatial search capabilities
-        # For now, we'll return empty results
-        return {"wikipedia": [], "attractions": []}
+        combined_results = {
+            "wikipedia": [],
+            "attractions": []
+        }
+
+        try:
+            self._ensure_geo_indexes()
+
+            for key, index in self.geo_indexes.items():
+                for hit in index.query(lat, lng, radius, limit=limit):
+                    text = (hit.get("text") or "").strip()
+                    if text and text not in combined_results[key]:
+                        combined_results[key].append(text)
+
+            return combined_results
+
+        except Exception as e:
+            logging.error(f"Error querying location {lat},{lng}: {str(e)}")
+            return {"wikipedia": [], "attractions": []}
     
     def close(self):
         """Clean up resources"""
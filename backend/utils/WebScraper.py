@@ -1,36 +1,40 @@
 import asyncio
-from pyppeteer import launch
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from bs4 import BeautifulSoup
-from openai import OpenAI
+from openai import AsyncOpenAI
 import json
 from typing import Dict, Any
 import time
 import logging
 import os
 from dotenv import load_dotenv
+from browser_pool import BrowserPool
+from http_fetch import HttpFetcher, HTML_PARSER
+from llm_extract import LLMExtractor
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
 
 
 class WebScraper:
-    def __init__(self):
+    def __init__(self, pool: BrowserPool = None):
+        # Pyppeteer pages come from a shared pool; Selenium is only the fallback
+        self.pool = pool or BrowserPool()
+        # Most pages are server-rendered, so plain HTTP is tried before a browser
+        self.http = HttpFetcher()
         self.browser = None
+        self._selenium_lock = asyncio.Lock()
 
         self.api_key = os.getenv('OPENAI_API_KEY2')
-        self.client = OpenAI(api_key=self.api_key)  # Initialize OpenAI client
+        # Long pages are extracted in concurrent chunks and merged by attraction name
+        self.extractor = LLMExtractor(AsyncOpenAI(api_key=self.api_key))
         
     async def initialize_pyppeteer(self):
-        """Initialize Pyppeteer browser instance"""
+        """Initialize the Pyppeteer browser pool"""
         try:
-            self.browser = await launch(
-                headless=True,
-                args=['--no-sandbox', '--disable-setuid-sandbox'],
-                ignoreHTTPSErrors=True
-            )
-            logging.info("Initialized Pyppeteer browser")
+            await self.pool.start()
+            logging.info("Initialized Pyppeteer browser pool")
         except Exception as e:
             logging.error(f"Failed to initialize Pyppeteer: {e}")
             raise e
@@ -55,18 +59,17 @@ class WebScraper:
 
     async def cleanup(self):
         """Clean up resources"""
+        await self.http.close()
+        await self.pool.close()
         if self.browser:
-            if isinstance(self.browser, webdriver.Chrome):
-                self.browser.quit()
-            else:
-                await self.browser.close()
+            self.browser.quit()
+            self.browser = None
         logging.info("Cleanup complete")
 
-    async def extract_main_content(self, page) -> str:
+    async def extract_main_content(self, content: str) -> str:
         """Extract the entire body content, remove CSS and tags, and clean the text."""
         try:
-            content = await page.content()  # Get the full HTML content of the page
-            soup = BeautifulSoup(content, 'html.parser')  # Parse the HTML with BeautifulSoup
+            soup = BeautifulSoup(content, HTML_PARSER)  # Parse the HTML with BeautifulSoup
             
             # Remove unwanted tags like style, script, and other non-content elements
             for element in soup.find_all(['style', 'script', 'header', 'footer', 'nav', 'aside']):
@@ -88,73 +91,20 @@ class WebScraper:
             logging.error(f"Content extraction error: {e}")
             return ""
     async def process_with_llm(self, text: str, url: str) -> Dict[str, Any]:
-        """Process maritime article text with GPT-3.5 to extract and format content for multiple attractions."""
-        
-        prompt = f"""
-        Analyze the following text about tourist attractions. Extract and format the following details for each attraction:
-        1. Title or name of the attraction
-        2. Main description and summary
-        3. Historical background or significance
-        4. Key features or points of interest
-        5. Location details and accessibility
-        6. Type of attraction (e.g., temple, museum, park, etc.)
-        7. Any cultural or local significance
-
-        Text: {text}
-
-        Format the response as a JSON array, where each element corresponds to an attraction, and contains the following structure:
-        [
-            {{
-                "text": "<complete cleaned description including summary, history, and key features>",
-                "metadata": {{
-                    "place_id": "",  # Leave empty, will be filled by the system
-                    "name": "<attraction name>",
-                    "category": "tourist_attraction",
-                    "source": "web_scrape",
-                    "fact_type": "historical",
-                    "last_verified": "<current date>",
-                    "source_url": "{url}",
-                    "has_scrape_content": true,
-                    "location": "<specific location details>",
-                    "attraction_type": "<type of attraction>"
-                }}
-            }},
-            ...
-        ]
-
-        Make sure each attraction has its own entry with the same structure. 
-        Ensure the text field for each attraction is well-structured with sections for Summary, History, and Description.
-        Remove any advertisements, navigation elements, or irrelevant content.
-        """
-
+        """Extract and format content for multiple attractions with chunked map-reduce extraction."""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1500,
-                temperature=0,
-                top_p=1.0
-            )
-
-            result = response.choices[0].message.content.strip()
-
-            try:
-                result_json = json.loads(result)
-                # Check if the result is a list of attractions
-                if isinstance(result_json, list):
-                    return result_json
-            except json.JSONDecodeError:
-                logging.warning("Failed to parse LLM response as JSON")
-
-            return {
-                "error": "Unexpected response format"
-            }
+            attractions = await self.extractor.extract(text, url)
+            if not attractions:
+                return {"error": "No attractions extracted"}
+            return self.extractor.to_documents(attractions, url)
 
         except Exception as e:
             logging.error(f"LLM processing error: {e}")
             return {"error": str(e)}
 
-
+    def _selenium_page_source(self, url: str) -> str:
+        self.browser.get(url)
+        return self.browser.page_source
 
     async def scrape_url(self, url: str) -> Dict[str, Any]:
         """Main scraping function"""
@@ -163,27 +113,18 @@ class WebScraper:
             attempt = 0
             while attempt < retry_count:
                 try:
-                    if not self.browser:
-                        if attempt == 0:
-                            await self.initialize_pyppeteer()
-                        else:
-                            self.initialize_selenium()
-                    
-                    if isinstance(self.browser, webdriver.Chrome):  # Using Selenium
-                        self.browser.get(url)
-                        content = self.browser.page_source
-                        soup = BeautifulSoup(content, 'html.parser')
-                        # Extract text here as per your needs (not implemented for simplicity)
-                        text = soup.get_text(separator=' ', strip=True)
-                        if len(text) < 200:
-                            return {"error": "No content extracted"}
-                    else:  # Using Pyppeteer
-                        page = await self.browser.newPage()
-                        await page.goto(url, {'waitUntil': 'networkidle0', 'timeout': 30000})
-                        content = await self.extract_main_content(page)
-                        if not content:
-                            return {"error": "No content extracted"}
-                        await page.close()
+                    if attempt == 0:  # Plain HTTP, then a pooled Pyppeteer page
+                        content, tier = await self.http.fetch_content(url, self.extract_main_content, self.pool.fetch_html)
+                        logging.info(f"Extracted content for {url} via {tier}")
+                    else:  # Using Selenium, one driver reused across fallbacks
+                        async with self._selenium_lock:
+                            if not self.browser:
+                                self.initialize_selenium()
+                            html = await asyncio.to_thread(self._selenium_page_source, url)
+                        content = await self.extract_main_content(html)
+
+                    if not content:
+                        return {"error": "No content extracted"}
 
                     # Process the content using LLM
                     result = await self.process_with_llm(content, url)
@@ -192,8 +133,6 @@ class WebScraper:
                 except Exception as e:
                     logging.error(f"Attempt {attempt + 1} failed with error: {e}")
                     attempt += 1
-                    if isinstance(self.browser, webdriver.Chrome):
-                        self.browser.quit()  # Clean up Selenium browser
 
                     if attempt == retry_count:
                         return {"error": str(e)}
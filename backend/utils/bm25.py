@@ -0,0 +1,216 @@
+import os
+import sys
+import re
+import math
+import time
+import logging
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Any
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "with",
+    # Singlish discourse particles carry no search meaning
+    "lah", "leh", "meh", "sia", "hor", "liao"
+}
+
+# Common Singapore street and place abbreviations, mapped to their long form
+# so "Jln Besar" and "Jalan Besar" hit the same postings
+ABBREVIATIONS = {
+    "jln": "jalan",
+    "lor": "lorong",
+    "bt": "bukit",
+    "kg": "kampong",
+    "kampung": "kampong",
+    "tg": "tanjong",
+    "tanjung": "tanjong",
+    "rd": "road",
+    "ave": "avenue",
+    "mt": "mount"
+}
+
+_LATIN_TOKEN = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?")
+_CJK_RUN = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize English, Malay-derived Singlish and Chinese text.
+    Latin words are lower-cased with possessives stripped and abbreviations
+    expanded. Runs of Chinese characters are indexed as single characters
+    plus bigrams, so "牛车水" matches on "牛车" and "车水" as well.
+    """
+    if not text:
+        return []
+
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = []
+
+    for run in _CJK_RUN.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+    for word in _LATIN_TOKEN.findall(_CJK_RUN.sub(" ", text)):
+        word = re.sub(r"['’]s?$", "", word)
+        word = ABBREVIATIONS.get(word, word)
+        if word and word not in STOPWORDS:
+            tokens.append(word)
+
+    return tokens
+
+
+class BM25Index:
+    """In-process BM25 inverted index with precomputed IDF and array postings"""
+
+    def __init__(self, texts: List[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(texts)
+
+        postings: Dict[str, List[tuple]] = {}
+        doc_lengths = np.zeros(self.doc_count, dtype=np.float32)
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = float(doc_lengths.mean()) if self.doc_count else 0.0
+
+        # term -> (doc ids, term frequencies), stored as compact numpy arrays
+        self.vocabulary: Dict[str, int] = {}
+        self.postings_docs: List[np.ndarray] = []
+        self.postings_tfs: List[np.ndarray] = []
+        idf = []
+
+        for term_id, (term, entries) in enumerate(postings.items()):
+            self.vocabulary[term] = term_id
+            self.postings_docs.append(np.fromiter((d for d, _ in entries), dtype=np.int32, count=len(entries)))
+            self.postings_tfs.append(np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries)))
+            df = len(entries)
+            # Lucene-style IDF, always positive
+            idf.append(math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5)))
+
+        self.idf = np.asarray(idf, dtype=np.float32)
+
+        # Per-document length normalisation is query independent, so precompute it
+        if self.avg_doc_length:
+            self._norm = k1 * (1 - b + b * doc_lengths / self.avg_doc_length)
+        else:
+            self._norm = np.full(self.doc_count, k1, dtype=np.float32)
+
+        logging.info(f"Built BM25 index over {self.doc_count} documents, {len(self.vocabulary)} terms")
+
+    @classmethod
+    def from_local_index(cls, index, **kwargs) -> "BM25Index":
+        """Build an index whose rows line up with a LocalVectorIndex"""
+        texts = [
+            f"{name} {text}" for name, text in zip(index.columns["name"], index.columns["text"])
+        ]
+        return cls(texts, **kwargs)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query"""
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        for term in tokenize(query):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            docs = self.postings_docs[term_id]
+            tfs = self.postings_tfs[term_id]
+            scores[docs] += self.idf[term_id] * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+        return scores
+
+    def search(self, query: str, limit: int = 5) -> List[tuple]:
+        """Return (doc_id, score) pairs for the best matching documents"""
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores)
+        if matched.size == 0:
+            return []
+        limit = min(limit, matched.size)
+        top = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top]
+
+
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    low, high = float(scores.min()), float(scores.max())
+    if high - low <= 0:
+        return np.zeros_like(scores)
+    return (scores - low) / (high - low)
+
+
+def hybrid_search(vector_index, bm25_index: BM25Index, query: str, query_vector: List[float],
+                  alpha: float = 0.5, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Fuse local vector and BM25 scores the same way Weaviate's relative score
+    fusion does: min-max normalise each, then alpha * vector + (1 - alpha) * keyword.
+    """
+    vector_scores = vector_index.scores(query_vector)[0]
+    keyword_scores = bm25_index.scores(query)
+    fused = alpha * _min_max(vector_scores) + (1 - alpha) * _min_max(keyword_scores)
+
+    limit = min(limit, fused.size)
+    if limit <= 0:
+        return []
+    top = np.argpartition(-fused, limit - 1)[:limit]
+    top = top[np.argsort(-fused[top])]
+
+    results = []
+    for doc_id in top:
+        hit = vector_index.row(int(doc_id))
+        hit["score"] = float(fused[doc_id])
+        hit["vector_score"] = float(vector_scores[doc_id])
+        hit["keyword_score"] = float(keyword_scores[doc_id])
+        results.append(hit)
+    return results
+
+
+if __name__ == "__main__":
+    import openai
+    from store import WeaviateStore
+    from local_index import LocalVectorIndex
+
+    queries = sys.argv[1:] or ["Buddha Tooth Relic Temple", "Sri Mariamman Temple", "Lau Pa Sat", "牛车水"]
+    store = WeaviateStore()
+
+    try:
+        for collection_name in ["WikipediaCollection", "SingaporeAttraction"]:
+            vector_index = LocalVectorIndex(collection_name)
+            bm25_index = BM25Index.from_local_index(vector_index)
+            print(f"\n=== {collection_name} ({len(vector_index)} documents) ===")
+
+            for query in queries:
+                query_vector = openai.embeddings.create(
+                    model="text-embedding-ada-002",
+                    input=query
+                ).data[0].embedding
+
+                start = time.perf_counter()
+                local_results = hybrid_search(vector_index, bm25_index, query, query_vector)
+                local_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                collection = store.client.collections.get(collection_name)
+                remote = collection.query.hybrid(query=query, vector=query_vector, alpha=0.5, limit=5)
+                remote_ms = (time.perf_counter() - start) * 1000
+
+                local_names = [r["name"] for r in local_results]
+                remote_names = [obj.properties.get("name", "") for obj in remote.objects]
+                overlap = len(set(local_names) & set(remote_names))
+
+                print(f"\nQuery: {query}")
+                print(f"Local:  {local_ms:8.2f} ms  {local_names}")
+                print(f"Remote: {remote_ms:8.2f} ms  {remote_names}")
+                print(f"Overlap: {overlap}/{max(len(remote_names), 1)}")
+    finally:
+        store.close()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from pyppeteer import launch
+
+logging.basicConfig(level=logging.INFO)
+
+# Nothing we extract needs these, and they are most of a page's bytes
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "hotjar.com",
+    "scorecardresearch.com",
+    "taboola.com",
+    "outbrain.com"
+)
+
+LAUNCH_ARGS = ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
+
+
+def is_blocked(resource_type: str, url: str) -> bool:
+    """Whether a subresource request should be aborted"""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == blocked or host.endswith("." + blocked) for blocked in BLOCKED_HOSTS)
+
+
+class BrowserPool:
+    """
+    N headless browsers with M reusable pages each. Pages block images,
+    fonts, stylesheets and trackers, and a per-host cap keeps a long URL
+    list on one site from hammering it. Broken pages are replaced.
+    """
+
+    def __init__(self, browsers: int = 2, pages_per_browser: int = 4, per_host: int = 2,
+                 block_resources: bool = True):
+        self.browser_count = browsers
+        self.pages_per_browser = pages_per_browser
+        self.per_host = per_host
+        self.block_resources = block_resources
+
+        self.browsers = []
+        self._pages: Optional[asyncio.Queue] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.pages_served = 0
+        self.requests_blocked = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.browser_count * self.pages_per_browser
+
+    async def start(self):
+        """Launch the browsers and open their pages"""
+        if self._pages is not None:
+            return
+        self._pages = asyncio.Queue()
+        for _ in range(self.browser_count):
+            browser = await launch(headless=True, args=LAUNCH_ARGS, ignoreHTTPSErrors=True)
+            self.browsers.append(browser)
+            for _ in range(self.pages_per_browser):
+                self._pages.put_nowait((browser, await self._new_page(browser)))
+        logging.info(f"Started browser pool: {self.browser_count} browsers x {self.pages_per_browser} pages")
+
+    async def _new_page(self, browser):
+        page = await browser.newPage()
+        if self.block_resources:
+            await page.setRequestInterception(True)
+            page.on('request', lambda request: asyncio.ensure_future(self._intercept(request)))
+        return page
+
+    async def _intercept(self, request):
+        try:
+            if is_blocked(request.resourceType, request.url):
+                self.requests_blocked += 1
+                await request.abort()
+            else:
+                await request.continue_()
+        except Exception:
+            pass  # The page navigated away or closed mid-request
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).hostname or ""
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    @asynccontextmanager
+    async def page(self, url: str):
+        """Borrow a page for one URL, respecting the per-host cap"""
+        await self.start()
+        async with self._host_limit(url):
+            browser, page = await self._pages.get()
+            healthy = True
+            try:
+                yield page
+            except Exception:
+                healthy = False
+                raise
+            finally:
+                self.pages_served += 1
+                if not healthy:
+                    # Don't hand a page in an unknown state to the next URL
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                    page = await self._new_page(browser)
+                self._pages.put_nowait((browser, page))
+
+    async def fetch_html(self, url: str, wait_until: str = 'networkidle0', timeout: int = 30000) -> str:
+        """Navigate a pooled page to url and return the rendered HTML"""
+        async with self.page(url) as page:
+            await page.goto(url, {'waitUntil': wait_until, 'timeout': timeout})
+            return await page.content()
+
+    async def close(self):
+        for browser in self.browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                logging.error(f"Error closing browser: {e}")
+        logging.info(f"Closed browser pool after {self.pages_served} pages, {self.requests_blocked} requests blocked")
+        self.browsers = []
+        self._pages = None
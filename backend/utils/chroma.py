@@ -1,13 +1,24 @@
 import chromadb
 import os
+import json
 import logging
 import sys
 import os
+from typing import Dict, Iterator, List, Any, Optional
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config import get_chroma_settings
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional; JSONL always works
+    pa = None
+    pq = None
+
+DEFAULT_INCLUDE = ["documents", "metadatas"]
+
 class ChromaDBManager:
     def __init__(self):
         settings = get_chroma_settings()
@@ -39,60 +50,153 @@ class ChromaDBManager:
         except Exception as e:
             logging.error(f"Error listing collections: {str(e)}")
 
-    def view_collection(self, collection_name: str):
-        """View all documents inside a collection."""
+    def iter_collection(self, collection_name: str, page_size: int = 100, include: Optional[List[str]] = None,
+                        offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield documents ({"id", "document", "metadata", "embedding"}) one page
+        at a time, so memory stays bounded by page_size. Embeddings are only
+        fetched when "embeddings" is in include.
+        """
+        collection = self.chroma_client.get_collection(name=collection_name)
+        include = include or DEFAULT_INCLUDE
+        yielded = 0
+
+        while limit is None or yielded < limit:
+            count = page_size if limit is None else min(page_size, limit - yielded)
+            result = collection.get(limit=count, offset=offset, include=include)
+            ids = result.get('ids') or []
+            if not ids:
+                return
+
+            documents = result.get('documents')
+            metadatas = result.get('metadatas')
+            embeddings = result.get('embeddings')
+            for i, doc_id in enumerate(ids):
+                yield {
+                    "id": doc_id,
+                    "document": documents[i] if documents is not None else None,
+                    "metadata": metadatas[i] if metadatas is not None else None,
+                    "embedding": [float(x) for x in embeddings[i]] if embeddings is not None else None
+                }
+
+            yielded += len(ids)
+            offset += len(ids)
+            if len(ids) < count:
+                return
+
+    def view_collection(self, collection_name: str, limit: int = 10, offset: int = 0,
+                        include: Optional[List[str]] = None):
+        """View a page of documents inside a collection."""
         try:
             collection = self.chroma_client.get_collection(name=collection_name)
-            result = collection.get()
+            doc_count = collection.count()
 
-            if not result or not result.get('ids'):
+            if not doc_count:
                 logging.info(f"No documents found in collection '{collection_name}'")
                 return
 
-            doc_count = len(result['ids'])
             logging.info(f"Found {doc_count} documents in '{collection_name}'")
-            
-            if doc_count > 0:
-                # Iterate over all documents in the collection
-                for i in range(doc_count):
-                    print(f"\nDocument {i+1}/{doc_count}:")
-                    print("=" * 50)
-                    print(f"ID: {result['ids'][i]}")
-                    
-                    # Display metadata
-                    if result.get('metadatas'):
-                        metadata = result['metadatas'][i]
-                        print("\nMetadata:")
-                        print("-" * 20)
-                        for key, value in metadata.items():
-                            print(f"{key}: {value}")
-                    
-                    # Display document content
-                    if result.get('documents'):
-                        print("\nDocument Content:")
-                        print("-" * 20)
-                        text = result['documents'][i]
-                        # Preview the first 200 characters, ensuring it cuts cleanly
-                        preview = text[:200]
-                        if len(text) > 200:
-                            preview = preview.rsplit(' ', 1)[0] + '...'
-                        print(preview)
-                    
-                    print("=" * 50)
-                
-                # If there are more documents, indicate how many
-                if doc_count > 1:
-                    print(f"\nAnd {doc_count-1} more documents...")
+
+            shown = 0
+            for i, doc in enumerate(self.iter_collection(collection_name, page_size=limit, include=include,
+                                                         offset=offset, limit=limit), start=offset):
+                shown += 1
+                print(f"\nDocument {i+1}/{doc_count}:")
+                print("=" * 50)
+                print(f"ID: {doc['id']}")
+
+                # Display metadata
+                if doc['metadata']:
+                    print("\nMetadata:")
+                    print("-" * 20)
+                    for key, value in doc['metadata'].items():
+                        print(f"{key}: {value}")
+
+                # Display document content
+                if doc['document']:
+                    print("\nDocument Content:")
+                    print("-" * 20)
+                    text = doc['document']
+                    # Preview the first 200 characters, ensuring it cuts cleanly
+                    preview = text[:200]
+                    if len(text) > 200:
+                        preview = preview.rsplit(' ', 1)[0] + '...'
+                    print(preview)
+
+                if doc['embedding'] is not None:
+                    print(f"\nEmbedding: {len(doc['embedding'])} dimensions")
+
+                print("=" * 50)
+
+            # If there are more documents, indicate how many
+            remaining = doc_count - offset - shown
+            if remaining > 0:
+                print(f"\nAnd {remaining} more documents (use --offset {offset + shown} to continue)...")
 
         except Exception as e:
             logging.error(f"Error viewing collection '{collection_name}': {str(e)}")
 
+    def export_collection(self, collection_name: str, path: str, include: Optional[List[str]] = None,
+                          page_size: int = 500) -> int:
+        """
+        Stream a collection to a .jsonl or .parquet file page by page and
+        return the number of documents written. Parquet needs pyarrow;
+        metadata is stored there as a JSON string since keys vary by document.
+        """
+        rows = self.iter_collection(collection_name, page_size=page_size, include=include)
+        written = 0
+
+        if path.endswith(".parquet"):
+            if pa is None:
+                raise ImportError("pyarrow is required for Parquet export; use a .jsonl path instead")
+            schema = pa.schema([
+                ("id", pa.string()),
+                ("document", pa.string()),
+                ("metadata", pa.string()),
+                ("embedding", pa.list_(pa.float32()))
+            ])
+            with pq.ParquetWriter(path, schema) as writer:
+                page = []
+                for doc in rows:
+                    page.append({**doc, "metadata": json.dumps(doc["metadata"]) if doc["metadata"] is not None else None})
+                    if len(page) >= page_size:
+                        writer.write_table(pa.Table.from_pylist(page, schema=schema))
+                        written += len(page)
+                        page = []
+                if page:
+                    writer.write_table(pa.Table.from_pylist(page, schema=schema))
+                    written += len(page)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                for doc in rows:
+                    f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+                    written += 1
+
+        logging.info(f"Exported {written} documents from '{collection_name}' to {path}")
+        return written
+
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Browse or export local ChromaDB collections")
+    parser.add_argument("--collection", help="Collection to view or export (default: list all)")
+    parser.add_argument("--limit", type=int, default=10, help="Documents to show per collection")
+    parser.add_argument("--offset", type=int, default=0, help="Documents to skip")
+    parser.add_argument("--embeddings", action="store_true", help="Also fetch embeddings")
+    parser.add_argument("--export", help="Write the collection to this .jsonl or .parquet file")
+    args = parser.parse_args()
+
+    include = DEFAULT_INCLUDE + (["embeddings"] if args.embeddings else [])
     try:
         manager = ChromaDBManager()
         logging.info("ChromaDB Manager initialized successfully")
-        manager.list_collections()
+        if args.collection and args.export:
+            manager.export_collection(args.collection, args.export, include=include)
+        elif args.collection:
+            manager.view_collection(args.collection, limit=args.limit, offset=args.offset, include=include)
+        else:
+            manager.list_collections()
         
     except Exception as e:
         logging.error(f"Error in main execution: {str(e)}")
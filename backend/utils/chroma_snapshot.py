@@ -0,0 +1,347 @@
+import os
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_chroma_settings
+
+logging.basicConfig(level=logging.INFO)
+
+# HNSW binaries and SQLite pages are rewritten in place, so fixed-size
+# chunks line up between snapshots and an update only dirties a few of them
+CHUNK_SIZE = 4 * 1024 * 1024
+SQLITE_FILE = "chroma.sqlite3"
+# Not part of the database state, or covered by the SQLite backup
+SKIPPED_SUFFIXES = (".part", ".tmp", "-wal", "-shm", "-journal", ".restore_manifest.json")
+
+
+def chunk_key(digest: str) -> str:
+    return f"chunks/{digest[:2]}/{digest}"
+
+
+def manifest_key(snapshot_id: str) -> str:
+    return f"manifests/{snapshot_id}.json"
+
+
+def iter_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                return
+            yield data
+
+
+class LocalFSBackend:
+    """Snapshot storage in a local directory, e.g. for tests or a mounted volume"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def list(self, prefix: str) -> List[str]:
+        keys = []
+        for dirpath, _, filenames in os.walk(self._path(prefix)):
+            for filename in filenames:
+                if not filename.endswith(".tmp"):
+                    keys.append(os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, "/"))
+        return keys
+
+    def delete(self, key: str):
+        if os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+
+class FirebaseStorageBackend:
+    """Snapshot storage under a prefix of a Firebase Storage (GCS) bucket"""
+
+    def __init__(self, bucket, prefix: str):
+        self.bucket = bucket
+        self.prefix = prefix.rstrip("/")
+
+    def put(self, key: str, data: bytes):
+        self.bucket.blob(f"{self.prefix}/{key}").upload_from_string(data, content_type="application/octet-stream")
+
+    def get(self, key: str) -> bytes:
+        return self.bucket.blob(f"{self.prefix}/{key}").download_as_bytes()
+
+    def list(self, prefix: str) -> List[str]:
+        start = len(self.prefix) + 1
+        return [blob.name[start:] for blob in self.bucket.list_blobs(prefix=f"{self.prefix}/{prefix}")]
+
+    def delete(self, key: str):
+        self.bucket.blob(f"{self.prefix}/{key}").delete()
+
+
+def firebase_backend() -> FirebaseStorageBackend:
+    """Backend for the configured Firebase bucket, under <base_path>/snapshots"""
+    from firebase_admin import storage
+    from firebase_init import initialize_firebase
+
+    backup = get_chroma_settings()["firebase_backup"]
+    initialize_firebase(backup["bucket_name"])
+    return FirebaseStorageBackend(storage.bucket(backup["bucket_name"]), f"{backup['base_path']}/snapshots")
+
+
+class ChromaSnapshotter:
+    """
+    Incremental snapshots of a persistent Chroma directory. Every file is
+    split into fixed-size chunks stored once under their SHA-256, zlib
+    compressed; a snapshot is a manifest listing each file's chunks. A
+    backup uploads only chunks the backend does not have and a restore only
+    fetches chunks that differ from the local files, so both scale with the
+    change since the last snapshot. The SQLite file is copied with the
+    backup API so a snapshot never captures a half-written page; the HNSW
+    binaries should not be written during a backup.
+    """
+
+    def __init__(self, backend, persist_directory: Optional[str] = None, chunk_size: int = CHUNK_SIZE,
+                 max_workers: int = 8, compression_level: int = 6):
+        self.backend = backend
+        self.persist_directory = persist_directory or get_chroma_settings()["persist_directory"]
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.compression_level = compression_level
+
+    def list_snapshots(self) -> List[str]:
+        """Snapshot ids, oldest first (ids are UTC timestamps, so they sort)"""
+        return sorted(key[len("manifests/"):-len(".json")] for key in self.backend.list("manifests/"))
+
+    def load_manifest(self, snapshot_id: Optional[str] = None) -> Dict[str, Any]:
+        """The given snapshot's manifest, or the latest one"""
+        if snapshot_id is None:
+            snapshots = self.list_snapshots()
+            if not snapshots:
+                raise ValueError("No snapshots found")
+            snapshot_id = snapshots[-1]
+        return json.loads(self.backend.get(manifest_key(snapshot_id)))
+
+    def _local_files(self) -> List[str]:
+        files = []
+        for dirpath, _, filenames in os.walk(self.persist_directory):
+            for filename in filenames:
+                if not filename.endswith(SKIPPED_SUFFIXES):
+                    files.append(os.path.relpath(os.path.join(dirpath, filename), self.persist_directory).replace(os.sep, "/"))
+        return sorted(files)
+
+    def _copy_sqlite(self, dest: str):
+        source = sqlite3.connect(os.path.join(self.persist_directory, SQLITE_FILE))
+        target = sqlite3.connect(dest)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    def _upload_chunk(self, digest: str, data: bytes) -> int:
+        compressed = zlib.compress(data, self.compression_level)
+        self.backend.put(chunk_key(digest), compressed)
+        return len(compressed)
+
+    def _fetch_chunk(self, digest: str) -> bytes:
+        data = zlib.decompress(self.backend.get(chunk_key(digest)))
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest} is corrupt")
+        return data
+
+    def _snapshot_file(self, path: str, known: set, executor: ThreadPoolExecutor,
+                       uploads: List[Any]) -> Dict[str, Any]:
+        """Chunk one file, queueing uploads for chunks the backend does not have"""
+        chunks, size = [], 0
+        for data in iter_chunks(path, self.chunk_size):
+            digest = hashlib.sha256(data).hexdigest()
+            chunks.append(digest)
+            size += len(data)
+            if digest not in known:
+                known.add(digest)
+                uploads.append(executor.submit(self._upload_chunk, digest, data))
+        return {"size": size, "chunks": chunks, "mtime_ns": os.stat(path).st_mtime_ns}
+
+    def backup(self) -> Dict[str, Any]:
+        """Write a new snapshot and return its report"""
+        start = time.time()
+        snapshot_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        known = {key.rsplit("/", 1)[-1] for key in self.backend.list("chunks/")}
+        try:
+            previous = self.load_manifest()["files"]
+        except ValueError:
+            previous = {}
+
+        files: Dict[str, Dict[str, Any]] = {}
+        uploads: List[Any] = []
+        reused = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, tempfile.TemporaryDirectory() as tmp:
+            for rel_path in self._local_files():
+                path = os.path.join(self.persist_directory, *rel_path.split("/"))
+                if rel_path == SQLITE_FILE:
+                    copy = os.path.join(tmp, SQLITE_FILE)
+                    self._copy_sqlite(copy)
+                    files[rel_path] = self._snapshot_file(copy, known, executor, uploads)
+                    continue
+
+                # Unchanged size and mtime means the previous chunk list still holds
+                stat = os.stat(path)
+                entry = previous.get(rel_path)
+                if entry and entry["size"] == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+                    files[rel_path] = entry
+                    reused += 1
+                else:
+                    files[rel_path] = self._snapshot_file(path, known, executor, uploads)
+            uploaded_bytes = sum(future.result() for future in uploads)
+
+        # The manifest goes last, so a snapshot never references missing chunks
+        manifest = {
+            "id": snapshot_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "chunk_size": self.chunk_size,
+            "files": files
+        }
+        self.backend.put(manifest_key(snapshot_id), json.dumps(manifest).encode("utf-8"))
+
+        report = {
+            "snapshot": snapshot_id,
+            "files": len(files),
+            "unchanged_files": reused,
+            "chunks": sum(len(entry["chunks"]) for entry in files.values()),
+            "uploaded_chunks": len(uploads),
+            "uploaded_bytes": uploaded_bytes,
+            "total_bytes": sum(entry["size"] for entry in files.values()),
+            "seconds": round(time.time() - start, 2)
+        }
+        logging.info(f"Snapshot report: {report}")
+        return report
+
+    def _restore_file(self, path: str, entry: Dict[str, Any], chunk_size: int,
+                      executor: ThreadPoolExecutor) -> Tuple[int, int]:
+        """Rebuild one file, reusing local chunks that already match; returns (fetched, reused)"""
+        local: List[str] = []
+        if os.path.exists(path):
+            local = [hashlib.sha256(data).hexdigest() for data in iter_chunks(path, chunk_size)]
+        if local == entry["chunks"] and os.path.getsize(path) == entry["size"]:
+            return 0, len(local)
+
+        fetches = {
+            index: executor.submit(self._fetch_chunk, digest)
+            for index, digest in enumerate(entry["chunks"])
+            if index >= len(local) or local[index] != digest
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part_path = path + ".part"
+        with open(part_path, "wb") as out:
+            source = open(path, "rb") if local else None
+            try:
+                for index in range(len(entry["chunks"])):
+                    if index in fetches:
+                        out.write(fetches[index].result())
+                    else:
+                        source.seek(index * chunk_size)
+                        out.write(source.read(chunk_size))
+            finally:
+                if source:
+                    source.close()
+        os.replace(part_path, path)
+        return len(fetches), len(entry["chunks"]) - len(fetches)
+
+    def restore(self, snapshot_id: Optional[str] = None, dest_dir: Optional[str] = None,
+                prune: bool = True) -> Dict[str, Any]:
+        """
+        Bring dest_dir (default: the Chroma directory) to the state of a
+        snapshot, the latest by default. Chroma must not have it open.
+        """
+        start = time.time()
+        manifest = self.load_manifest(snapshot_id)
+        dest_dir = dest_dir or self.persist_directory
+        fetched = reused = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for rel_path, entry in manifest["files"].items():
+                path = os.path.join(dest_dir, *rel_path.split("/"))
+                file_fetched, file_reused = self._restore_file(path, entry, manifest["chunk_size"], executor)
+                fetched += file_fetched
+                reused += file_reused
+
+        removed = 0
+        if prune:
+            # Segments of collections deleted since the snapshot, and a stale WAL
+            # that SQLite would otherwise replay over the restored file
+            for dirpath, _, filenames in os.walk(dest_dir):
+                for filename in filenames:
+                    full_path = os.path.join(dirpath, filename)
+                    rel_path = os.path.relpath(full_path, dest_dir).replace(os.sep, "/")
+                    stale_wal = rel_path in (f"{SQLITE_FILE}-wal", f"{SQLITE_FILE}-shm")
+                    if stale_wal or (rel_path not in manifest["files"] and not filename.endswith(SKIPPED_SUFFIXES)):
+                        os.remove(full_path)
+                        removed += 1
+
+        report = {
+            "snapshot": manifest["id"],
+            "files": len(manifest["files"]),
+            "fetched_chunks": fetched,
+            "reused_chunks": reused,
+            "removed_files": removed,
+            "seconds": round(time.time() - start, 2)
+        }
+        logging.info(f"Restore report: {report}")
+        return report
+
+    def prune(self, keep: int = 7) -> Dict[str, int]:
+        """Drop all but the newest keep snapshots and the chunks only they used"""
+        snapshots = self.list_snapshots()
+        expired, kept = snapshots[:-keep] if keep else snapshots, snapshots[-keep:] if keep else []
+        referenced = set()
+        for snapshot_id in kept:
+            for entry in self.load_manifest(snapshot_id)["files"].values():
+                referenced.update(entry["chunks"])
+
+        for snapshot_id in expired:
+            self.backend.delete(manifest_key(snapshot_id))
+        orphaned = [key for key in self.backend.list("chunks/") if key.rsplit("/", 1)[-1] not in referenced]
+        for key in orphaned:
+            self.backend.delete(key)
+
+        logging.info(f"Pruned {len(expired)} snapshots and {len(orphaned)} chunks")
+        return {"snapshots": len(expired), "chunks": len(orphaned)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental Chroma snapshots")
+    parser.add_argument("command", choices=["backup", "restore", "list", "prune"])
+    parser.add_argument("--snapshot", help="Snapshot id to restore (default: latest)")
+    parser.add_argument("--local", help="Use a local directory instead of Firebase Storage")
+    parser.add_argument("--dest", help="Restore into this directory instead of the Chroma directory")
+    parser.add_argument("--keep", type=int, default=7, help="Snapshots to keep when pruning")
+    args = parser.parse_args()
+
+    snapshotter = ChromaSnapshotter(LocalFSBackend(args.local) if args.local else firebase_backend())
+    if args.command == "backup":
+        print(json.dumps(snapshotter.backup(), indent=2))
+    elif args.command == "restore":
+        print(json.dumps(snapshotter.restore(args.snapshot, args.dest), indent=2))
+    elif args.command == "list":
+        print("\n".join(snapshotter.list_snapshots()))
+    else:
+        print(json.dumps(snapshotter.prune(args.keep), indent=2))
@@ -0,0 +1,108 @@
+import os
+import sys
+import hashlib
+from typing import Dict, List, Any, Callable
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.text_utils import split_sentences, parse_sections
+
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_CHUNK_OVERLAP = 40
+
+
+def word_count(text: str) -> int:
+    return len(text.split())
+
+
+def chunk_id(parent_id: str, section: str, text: str) -> str:
+    """Stable id: the same parent, section and text always give the same id"""
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+    return f"{parent_id}:{section.lower()}:{digest}"
+
+
+def split_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_CHUNK_OVERLAP,
+               length_function: Callable[[str], int] = word_count) -> List[str]:
+    """
+    Pack sentences into chunks of at most chunk_size units, carrying about
+    overlap units of trailing sentences into the next chunk. A single sentence
+    longer than chunk_size becomes its own chunk.
+    """
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    chunks = []
+    current: List[str] = []
+    current_length = 0
+
+    for sentence in split_sentences(text):
+        length = length_function(sentence)
+        if current and current_length + length > chunk_size:
+            chunks.append(" ".join(current))
+
+            # Start the next chunk with the tail of this one
+            carried: List[str] = []
+            carried_length = 0
+            for previous in reversed(current):
+                previous_length = length_function(previous)
+                if carried_length + previous_length > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_length += previous_length
+            current, current_length = carried, carried_length
+
+        current.append(sentence)
+        current_length += length
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def chunk_document(document: Dict[str, Any], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   overlap: int = DEFAULT_CHUNK_OVERLAP,
+                   length_function: Callable[[str], int] = word_count) -> List[Dict[str, Any]]:
+    """
+    Split a document into section-aware chunks. Each chunk keeps the parent
+    metadata plus parent_id, section, chunk_index and chunk_count, and is
+    prefixed with the place name so it still reads well on its own.
+    """
+    metadata = document.get("metadata", {})
+    parent_id = metadata.get("place_id") or hashlib.sha1(document.get("text", "").encode("utf-8")).hexdigest()[:16]
+    name = metadata.get("name", "")
+
+    pieces = []
+    for section, body in parse_sections(document.get("text", "")).items():
+        for text in split_text(body, chunk_size, overlap, length_function):
+            pieces.append((section, text))
+
+    chunks = []
+    seen_ids = set()
+    for index, (section, text) in enumerate(pieces):
+        identifier = chunk_id(parent_id, section, text)
+        if identifier in seen_ids:
+            continue
+        seen_ids.add(identifier)
+
+        chunk_text = f"{name} ({section}): {text}" if name else text
+        chunks.append({
+            "id": identifier,
+            "text": chunk_text,
+            "metadata": {
+                **metadata,
+                "parent_id": parent_id,
+                "section": section,
+                "chunk_index": index,
+                "chunk_count": len(pieces)
+            }
+        })
+    return chunks
+
+
+def chunk_documents(documents: List[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    overlap: int = DEFAULT_CHUNK_OVERLAP,
+                    length_function: Callable[[str], int] = word_count) -> List[Dict[str, Any]]:
+    """Chunk every document, keeping the input order"""
+    chunks = []
+    for document in documents:
+        chunks.extend(chunk_document(document, chunk_size, overlap, length_function))
+    return chunks
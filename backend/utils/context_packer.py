@@ -0,0 +1,158 @@
+import os
+import sys
+import re
+import math
+import logging
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.text_utils import split_sentences
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokens of retrieved context allowed per model, on top of the prompt itself
+MODEL_CONTEXT_BUDGETS = {
+    "gpt-3.5-turbo": 1200,
+    "gpt-4o-mini": 2000
+}
+DEFAULT_CONTEXT_BUDGET = 1200
+
+# Long documents are cut into snippets of about this size before ranking
+MAX_SNIPPET_TOKENS = 150
+
+_encodings = {}
+
+
+def _encoding(model: str):
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("cl100k_base")
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Count tokens with tiktoken when installed, otherwise estimate at ~4 chars per token"""
+    if not text:
+        return 0
+    if tiktoken is None:
+        return math.ceil(len(text) / 4)
+    return len(_encoding(model).encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-3.5-turbo") -> str:
+    """Cut text to at most max_tokens tokens, using the same estimate as count_tokens without tiktoken"""
+    if not text:
+        return text
+    if tiktoken is None:
+        return text[:max_tokens * 4]
+    tokens = _encoding(model).encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _encoding(model).decode(tokens[:max_tokens])
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def _split_snippets(text: str, model: str) -> List[str]:
+    """Split a document into paragraph snippets, breaking long paragraphs on sentences"""
+    snippets = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph, model) <= MAX_SNIPPET_TOKENS:
+            snippets.append(paragraph)
+            continue
+
+        current = ""
+        for sentence in split_sentences(paragraph):
+            candidate = f"{current} {sentence}".strip()
+            if current and count_tokens(candidate, model) > MAX_SNIPPET_TOKENS:
+                snippets.append(current)
+                current = sentence
+            else:
+                current = candidate
+        if current:
+            snippets.append(current)
+    return snippets
+
+
+def pack_context(context: Dict[str, List[Union[str, Dict[str, Any]]]], model: str = "gpt-3.5-turbo",
+                 budget: Optional[int] = None, query: Optional[str] = None) -> Tuple[Dict[str, List[str]], Dict[str, Any]]:
+    """
+    Rank, deduplicate and trim retrieved context to a token budget.
+
+    Context entries are either plain strings, ranked by their retrieval order,
+    or {"text": ..., "score": ...} dicts. Earlier snippets of a document score
+    slightly higher than later ones, and snippets sharing words with the query
+    are boosted. Returns the packed context and a report of the tokens saved.
+    """
+    budget = budget if budget is not None else MODEL_CONTEXT_BUDGETS.get(model, DEFAULT_CONTEXT_BUDGET)
+    query_words = set(_normalize(query).split()) if query else set()
+
+    candidates = []
+    original_tokens = 0
+
+    for category, entries in (context or {}).items():
+        for rank, entry in enumerate(entries or []):
+            if isinstance(entry, dict):
+                text, score = entry.get("text", ""), entry.get("score")
+            else:
+                text, score = entry, None
+            if not text:
+                continue
+            if score is None:
+                score = 1.0 / (rank + 1)
+
+            original_tokens += count_tokens(text, model)
+            for position, snippet in enumerate(_split_snippets(text, model)):
+                snippet_score = score / (1 + 0.1 * position)
+                if query_words:
+                    overlap = len(query_words & set(_normalize(snippet).split())) / len(query_words)
+                    snippet_score *= 1 + overlap
+                candidates.append({
+                    "category": category,
+                    "order": (rank, position),
+                    "text": snippet,
+                    "key": _normalize(snippet),
+                    "score": snippet_score,
+                    "tokens": count_tokens(snippet, model)
+                })
+
+    selected = []
+    used_tokens = 0
+    duplicates = 0
+
+    for candidate in sorted(candidates, key=lambda c: c["score"], reverse=True):
+        # Drop exact repeats and snippets already contained in a selected one
+        if any(candidate["key"] in chosen["key"] for chosen in selected):
+            duplicates += 1
+            continue
+        if used_tokens + candidate["tokens"] > budget:
+            continue
+        selected.append(candidate)
+        used_tokens += candidate["tokens"]
+
+    # Keep the original reading order within each category
+    packed = {category: [] for category in (context or {})}
+    for candidate in sorted(selected, key=lambda c: c["order"]):
+        packed[candidate["category"]].append(candidate["text"])
+
+    report = {
+        "model": model,
+        "budget": budget,
+        "original_tokens": original_tokens,
+        "packed_tokens": used_tokens,
+        "tokens_saved": max(original_tokens - used_tokens, 0),
+        "snippets_kept": len(selected),
+        "snippets_dropped": len(candidates) - len(selected),
+        "duplicates": duplicates
+    }
+    return packed, report
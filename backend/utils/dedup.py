@@ -0,0 +1,134 @@
+import re
+import hashlib
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+
+# Mersenne prime for the universal hash family; inputs are kept to 31 bits
+# so a * x + b stays inside int64
+_PRIME = (1 << 31) - 1
+
+# Metadata fields whose values from collapsed duplicates are kept on the canonical document
+MERGED_FIELDS = ["name", "place_id", "source_url", "wikipedia_url"]
+
+
+def shingles(text: str, k: int = 5) -> set:
+    """Word k-shingles of normalised text; short texts fall back to the whole text"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little") & _PRIME
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures with banded LSH. Each band of the signature is a hash
+    bucket key, so candidates are found without comparing against every
+    stored document; candidates are then confirmed on estimated Jaccard.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, bands: int = 16, shingle_size: int = 5,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.int64)
+        self.buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[str, np.ndarray] = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((_shingle_hash(s) for s in shingles(text, self.shingle_size)), dtype=np.int64)
+        # (num_perm, n_shingles) permuted hashes, minimum per permutation
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def find(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Most similar stored document at or above the threshold, with its estimated Jaccard"""
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best = None
+        for doc_id in candidates:
+            similarity = float(np.mean(self.signatures[doc_id] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (doc_id, similarity)
+        return best
+
+    def add(self, doc_id: str, signature: np.ndarray):
+        self.signatures[doc_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(key, []).append(doc_id)
+
+    @property
+    def size(self) -> int:
+        return len(self.signatures)
+
+
+def _merge_metadata(canonical: Dict[str, Any], duplicate: Dict[str, Any], duplicate_id: str):
+    """Record a collapsed duplicate on the canonical metadata (scalar values only, for Chroma)"""
+    ids = [i for i in canonical.get("duplicate_ids", "").split(",") if i]
+    canonical["duplicate_ids"] = ",".join(ids + [duplicate_id])
+    canonical["duplicate_count"] = len(ids) + 1
+
+    for field in MERGED_FIELDS:
+        value = duplicate.get(field)
+        if not value or value == canonical.get(field):
+            continue
+        key = f"alt_{field}s"
+        values = [v for v in canonical.get(key, "").split("|") if v]
+        if value not in values:
+            canonical[key] = "|".join(values + [str(value)])
+
+
+def collapse_near_duplicates(documents: List[Dict[str, Any]], index: Optional[NearDuplicateIndex] = None,
+                             threshold: float = 0.85) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Keep the first of each group of near-duplicate documents ({"id", "text",
+    "metadata"}) and fold the others' ids, names and sources into its
+    metadata. Pass an index to also collapse against earlier batches.
+    """
+    index = index or NearDuplicateIndex(threshold=threshold)
+    canonical: Dict[str, Dict[str, Any]] = {}
+    groups: Dict[str, List[str]] = {}
+    collapsed = 0
+
+    for doc in documents:
+        signature = index.signature(doc["text"])
+        match = index.find(signature)
+        if match is None or match[0] == doc["id"]:
+            canonical[doc["id"]] = {**doc, "metadata": dict(doc["metadata"])}
+            index.add(doc["id"], signature)
+            continue
+
+        collapsed += 1
+        groups.setdefault(match[0], []).append(doc["id"])
+        # A match from an earlier batch is already stored; the duplicate is just dropped
+        if match[0] in canonical:
+            _merge_metadata(canonical[match[0]]["metadata"], doc["metadata"], doc["id"])
+
+    report = {
+        "input": len(documents),
+        "canonical": len(canonical),
+        "collapsed": collapsed,
+        "groups": groups
+    }
+    if collapsed:
+        logging.info(f"Collapsed {collapsed} near-duplicates into {len(groups)} canonical documents")
+    return list(canonical.values()), report
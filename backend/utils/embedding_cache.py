@@ -0,0 +1,66 @@
+import os
+import sys
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_ingestion_settings
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent (model, text) -> vector cache in a local SQLite file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_ingestion_settings()["cache_dir"], "embeddings.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )"""
+        )
+        self.conn.commit()
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Cached vectors for the given texts, keyed by text"""
+        hashes = {text_hash(text): text for text in texts}
+        found = {}
+        keys = list(hashes)
+        with self._lock:
+            # Stay well under SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch]
+                ).fetchall()
+                for digest, blob in rows:
+                    found[hashes[digest]] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors keyed by text"""
+        rows = [
+            (model, text_hash(text), len(vector), array("f", vector).tobytes())
+            for text, vector in vectors.items()
+        ]
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
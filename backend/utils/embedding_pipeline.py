@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.context_packer import count_tokens, truncate_tokens
+from utils.embedding_cache import EmbeddingCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# OpenAI limits: 8191 tokens per input, 2048 inputs and 300k tokens per request
+MAX_INPUT_TOKENS = 8191
+MAX_BATCH_SIZE = 2048
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+
+
+class EmbeddingPipeline:
+    """
+    Bulk embedding stage. Texts are deduplicated, looked up in the persistent
+    cache, packed into token-bounded batches and embedded with bounded
+    concurrency, retrying rate limits and transient errors with backoff.
+    """
+
+    def __init__(self, model: str = EMBEDDING_MODEL, max_batch_tokens: int = 100000,
+                 max_batch_size: int = 512, max_concurrency: int = 4, max_retries: int = 6,
+                 cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = min(max_batch_size, MAX_BATCH_SIZE)
+        if max_retries < 1:
+            raise ValueError("max_retries counts attempts and must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.cache = cache or EmbeddingCache()
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.stats: Dict[str, Any] = {}
+
+    def _input(self, text: str) -> str:
+        """
+        What is actually sent for a text. The API rejects the whole request if
+        one input is over MAX_INPUT_TOKENS, so longer texts are truncated; the
+        vector is still cached under the full text.
+        """
+        return truncate_tokens(text, MAX_INPUT_TOKENS, self.model)
+
+    def _make_batches(self, texts: List[str], inputs: Dict[str, str]) -> List[List[str]]:
+        """Greedily pack texts into batches under the token and size limits"""
+        batches, current, current_tokens = [], [], 0
+        for text in texts:
+            tokens = count_tokens(inputs[text], self.model)
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _embed_batch(self, semaphore: asyncio.Semaphore, batch: List[str],
+                           inputs: Dict[str, str]) -> Dict[str, List[float]]:
+        async with semaphore:
+            for attempt in range(self.max_retries):
+                try:
+                    response = await self.client.embeddings.create(model=self.model, input=[inputs[text] for text in batch])
+                    break
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.max_retries - 1:
+                        raise
+                    delay = min(60, 2 ** attempt) + random.uniform(0, 1)
+                    logging.warning(f"Embedding batch failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+        vectors = {batch[item.index]: item.embedding for item in response.data}
+        # Persist every batch as it lands so an interrupted run keeps its work
+        self.cache.put_many(self.model, vectors)
+        return vectors
+
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, returning vectors in input order"""
+        start = time.perf_counter()
+        unique = list(dict.fromkeys(texts))
+        vectors = self.cache.get_many(self.model, unique)
+        missing = [text for text in unique if text not in vectors]
+
+        inputs = {text: self._input(text) for text in missing}
+        batches = self._make_batches(missing, inputs)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        for result in await asyncio.gather(*(self._embed_batch(semaphore, batch, inputs) for batch in batches)):
+            vectors.update(result)
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        embedded_tokens = sum(count_tokens(inputs[text], self.model) for text in missing)
+        self.stats = {
+            "documents": len(texts),
+            "unique": len(unique),
+            "cached": len(unique) - len(missing),
+            "embedded": len(missing),
+            "batches": len(batches),
+            "tokens": embedded_tokens,
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(len(texts) / elapsed, 1),
+            "tokens_per_sec": round(embedded_tokens / elapsed, 1)
+        }
+        logging.info(
+            f"Embedded {self.stats['embedded']} texts ({self.stats['cached']} cached) in "
+            f"{self.stats['batches']} batches: {self.stats['docs_per_sec']} docs/sec, "
+            f"{self.stats['tokens_per_sec']} tokens/sec"
+        )
+        return [vectors[text] for text in texts]
+
+    async def embed_documents(self, documents: List[Dict[str, Any]]) -> List[List[float]]:
+        """Embed the "text" of each document"""
+        return await self.embed_texts([doc.get("text", "") for doc in documents])
+
+
+if __name__ == "__main__":
+    from store import WeaviateStore
+
+    if len(sys.argv) != 3:
+        print("Usage: python embedding_pipeline.py <documents.jsonl> <collection>")
+        sys.exit(1)
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        documents = [json.loads(line) for line in f if line.strip()]
+
+    store = WeaviateStore()
+    try:
+        pipeline = EmbeddingPipeline()
+        store.store_documents(sys.argv[2], documents, pipeline=pipeline)
+        print(json.dumps(pipeline.stats, indent=2))
+    finally:
+        store.close()
@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import logging
+from typing import Dict, List, Any, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_local_index_settings
+from utils.text_utils import split_sentences, parse_sections
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Sentences kept from each section of a source document
+SECTION_SENTENCES = {"Summary": 3, "History": 2, "Description": 2}
+MAX_CARD_CHARS = 900
+
+# Wikipedia cards take priority over scraped content for the same place
+SOURCE_PRIORITY = {"wikipedia": 0, "web_scrape": 1}
+
+# Local Chroma collections cards are built from; wikipedia_collection holds
+# chunks, which carry the parent_id/section metadata _merge_chunks needs
+CARD_COLLECTIONS = ["wikipedia_collection", "singapore_attractions"]
+
+
+def build_fact_card(document: Dict[str, Any], max_chars: int = MAX_CARD_CHARS) -> Optional[Dict[str, Any]]:
+    """Condense one stored document into a short fact card"""
+    metadata = document.get("metadata", {})
+    text = document.get("text", "")
+    if not metadata.get("place_id") or not text or text == "No Wikipedia content available":
+        return None
+
+    facts = []
+    for section, body in parse_sections(text).items():
+        facts.extend(split_sentences(body)[:SECTION_SENTENCES.get(section, 1)])
+
+    card_text = ""
+    for fact in facts:
+        if len(card_text) + len(fact) + 1 > max_chars:
+            break
+        card_text = f"{card_text} {fact}".strip()
+
+    if not card_text:
+        return None
+
+    return {
+        "place_id": metadata["place_id"],
+        "name": metadata.get("name", ""),
+        "source": metadata.get("source", ""),
+        "source_url": metadata.get("source_url") or metadata.get("wikipedia_url", ""),
+        "text": f"{metadata.get('name', '')}: {card_text}" if metadata.get("name") else card_text
+    }
+
+
+def _merge_chunks(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Rebuild one "Section:" document per parent from chunked documents, using
+    the first chunk of each section. Unchunked documents pass through as-is.
+    """
+    merged = {}
+    whole = []
+    for document in documents:
+        metadata = document.get("metadata", {})
+        if "section" not in metadata or "parent_id" not in metadata:
+            whole.append(document)
+            continue
+
+        parent = merged.setdefault(metadata["parent_id"], {"metadata": metadata, "sections": {}})
+        section, index = metadata["section"], metadata.get("chunk_index", 0)
+        # Chunks are prefixed with "<name> (<section>): "
+        text = document.get("text", "").split(f"({section}): ", 1)[-1]
+        if section not in parent["sections"] or index < parent["sections"][section][0]:
+            parent["sections"][section] = (index, text)
+
+    for parent in merged.values():
+        ordered = sorted(parent["sections"].items(), key=lambda item: item[1][0])
+        text = "\n\n".join(f"{section}:\n{body}" for section, (_, body) in ordered)
+        whole.append({"text": text, "metadata": parent["metadata"]})
+    return whole
+
+
+def build_fact_cards(documents: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Build one card per place_id, preferring Wikipedia over scraped sources"""
+    cards = {}
+    for document in _merge_chunks(documents):
+        card = build_fact_card(document)
+        if not card:
+            continue
+        existing = cards.get(card["place_id"])
+        if existing and SOURCE_PRIORITY.get(existing["source"], 9) <= SOURCE_PRIORITY.get(card["source"], 9):
+            continue
+        cards[card["place_id"]] = card
+    return cards
+
+
+def save_fact_cards(cards: Dict[str, Dict[str, Any]], path: str) -> None:
+    """Write cards atomically so running workers never read a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(cards, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+class FactCardStore:
+    """O(1) place_id -> fact card lookup loaded from the offline build"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_local_index_settings()["fact_cards"]
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.cards = json.load(f)
+            logging.info(f"Loaded {len(self.cards)} fact cards")
+        except FileNotFoundError:
+            logging.warning(f"No fact cards found at {self.path}")
+            self.cards = {}
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def get(self, place_id: str) -> Optional[Dict[str, Any]]:
+        """Return the card for a Google place_id, if one was built"""
+        return self.cards.get(place_id) if place_id else None
+
+    def lookup_places(self, places: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Return the card of the first places_nearby result that has one"""
+        for place in places:
+            card = self.get(place.get("place_id"))
+            if card:
+                return card
+        return None
+
+
+def documents_from_chroma(manager, collection_names: List[str] = CARD_COLLECTIONS) -> List[Dict[str, Any]]:
+    """Read {"text", "metadata"} documents from local Chroma collections, page by page"""
+    documents = []
+    for collection_name in collection_names:
+        try:
+            for doc in manager.iter_collection(collection_name, page_size=500):
+                metadata = doc["metadata"] or {}
+                # Left behind by syncs from before removed chunks were deleted
+                if not metadata.get("tombstoned"):
+                    documents.append({"text": doc["document"] or "", "metadata": metadata})
+        except Exception as e:
+            logging.warning(f"Could not read {collection_name} from ChromaDB: {str(e)}")
+    return documents
+
+
+if __name__ == "__main__":
+    from chroma import ChromaDBManager
+
+    documents = documents_from_chroma(ChromaDBManager())
+
+    cards = build_fact_cards(documents)
+    path = get_local_index_settings()["fact_cards"]
+    save_fact_cards(cards, path)
+    print(f"Built {len(cards)} fact cards from {len(documents)} documents into {path}")
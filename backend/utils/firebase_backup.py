@@ -1,17 +1,53 @@
 
 import json
-import tempfile
-from typing import Dict, Optional, List
-import firebase_admin
-from firebase_admin import credentials, storage
+import time
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, List, Any
+from firebase_admin import storage
 import chromadb
-import sys
 import os
 from firebase_init import initialize_firebase
 # sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 # from backend.firebase_init import initialize_firebase
 from config import get_chroma_settings
 
+try:
+    import google_crc32c
+except ImportError:  # Optional; MD5 is still checked when the object has one
+    google_crc32c = None
+
+MANIFEST_NAME = ".restore_manifest.json"
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class _HashingWriter:
+    """File wrapper that hashes bytes as they are streamed to disk"""
+
+    def __init__(self, f):
+        self.f = f
+        self.md5 = hashlib.md5()
+        self.crc32c = google_crc32c.Checksum() if google_crc32c else None
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.md5.update(data)
+        if self.crc32c is not None:
+            self.crc32c.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def verify(self, blob) -> Optional[str]:
+        """Return an error message if the download doesn't match the blob's metadata"""
+        if blob.size is not None and self.size != blob.size:
+            return f"size {self.size} != {blob.size}"
+        if blob.md5_hash and base64.b64encode(self.md5.digest()).decode() != blob.md5_hash:
+            return "MD5 mismatch"
+        if blob.crc32c and self.crc32c is not None and base64.b64encode(self.crc32c.digest()).decode() != blob.crc32c:
+            return "CRC32C mismatch"
+        return None
+
 
 class FirebaseBackup:
     def __init__(self, bucket_name: str):
@@ -25,72 +61,135 @@ class FirebaseBackup:
             print(f"Connected to Firebase bucket: {bucket_name}")
         
         settings = get_chroma_settings()
-        self.chroma_client = chromadb.HttpClient(
-            host=settings["chroma_host"],
-            port=settings["chroma_port"],
-            ssl=settings["chroma_ssl"],
-            headers={"X-Api-Key": settings["chroma_api_key"]} if settings["chroma_api_key"] else None
-        )
+        self.persist_directory = settings["persist_directory"]
+        # Prefix holding the raw Chroma directory (not chroma_snapshot's base_path)
+        self.restore_path = settings["firebase_backup"]["restore_path"].rstrip("/")
+        self._chroma_client = None
+
+    @property
+    def chroma_client(self):
+        # Opened lazily so files can be restored before Chroma reads them
+        if self._chroma_client is None:
+            self._chroma_client = chromadb.PersistentClient(path=self.persist_directory)
+        return self._chroma_client
 
     def list_firebase_collections(self) -> List[str]:
         """List all ChromaDB collections in Firebase Storage"""
         try:
-            base_path = "ggdotcom/chroma_db/"
+            base_path = f"{self.restore_path}/"
             blobs = list(self.bucket.list_blobs(prefix=base_path))
             
             # Get unique collection IDs by looking at the directory structure
             collections = set()
             for blob in blobs:
-                # Split path and get the collection ID directory
-                parts = blob.name.split('/')
-                if len(parts) > 3 and parts[2] != "chroma.sqlite3":
-                    collections.add(parts[2])
+                # Split the path below the prefix and get the collection ID directory
+                parts = blob.name[len(base_path):].split('/')
+                if len(parts) > 1:
+                    collections.add(parts[0])
             
             return list(collections)
         except Exception as e:
             print(f"Error listing collections: {str(e)}")
             return []
 
-    def load_collection(self, collection_id: str) -> Optional[Dict]:
-        """Load collection data from Firebase Storage using collection ID"""
-        base_path = f"ggdotcom/chroma_db/{collection_id}"
-        result = {}
+    def _load_manifest(self, dest_dir: str) -> Dict[str, Dict[str, Any]]:
+        path = os.path.join(dest_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
 
-        try:
-            print(f"\nAttempting to load collection ID: {collection_id}")
-            blobs = list(self.bucket.list_blobs(prefix=base_path))
+    def _save_manifest(self, dest_dir: str, manifest: Dict[str, Dict[str, Any]]):
+        path = os.path.join(dest_dir, MANIFEST_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
 
-            if not blobs:
-                print(f"No files found for collection ID: {collection_id}")
-                return None
+    def _download_blob(self, blob, path: str) -> Optional[str]:
+        """Stream one blob to path via a sibling .part file, verifying it; returns an error or None"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part_path = path + ".part"
+        blob.chunk_size = DOWNLOAD_CHUNK_SIZE
+        with open(part_path, "wb") as f:
+            writer = _HashingWriter(f)
+            # We verify ourselves in the same pass, so skip the library's extra hashing
+            blob.download_to_file(writer, checksum=None)
+        error = writer.verify(blob)
+        if error:
+            os.unlink(part_path)
+            return error
+        os.replace(part_path, path)
+        return None
 
-            print("\nFound files in collection:")
-            for blob in blobs:
-                print(f"- {blob.name}")
-
-            # Load binary files
-            binary_files = ['data_level0.bin', 'header.bin', 'length.bin', 'link_lists.bin']
-            for file_name in binary_files:
-                blob = next((b for b in blobs if b.name.endswith(file_name)), None)
-                if blob:
-                    with tempfile.NamedTemporaryFile(mode='r+b', delete=False) as temp_file:
-                        blob.download_to_filename(temp_file.name)
-                        with open(temp_file.name, 'rb') as f:
-                            key = file_name.split('.')[0]
-                            result[key] = f.read()
-                            print(f"Loaded binary file: {file_name}")
-                        os.unlink(temp_file.name)
-
-            if all(k in result for k in ['data_level0', 'header', 'length']):
-                print("Successfully loaded all required binary files")
-                return result
+    def restore_prefix(self, prefix: str, dest_dir: str, max_workers: int = 8,
+                       manifest_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Restore every blob under prefix into dest_dir, keeping relative paths.
+        Downloads run concurrently and stream to disk; blobs whose generation
+        matches the local manifest (and whose file is intact) are skipped.
+        """
+        start = time.time()
+        prefix = prefix.rstrip("/") + "/"
+        manifest_dir = manifest_dir or dest_dir
+        os.makedirs(dest_dir, exist_ok=True)
+        manifest = self._load_manifest(manifest_dir)
+        blobs = [blob for blob in self.bucket.list_blobs(prefix=prefix) if not blob.name.endswith("/")]
+
+        to_download, skipped = [], 0
+        for blob in blobs:
+            path = os.path.join(dest_dir, blob.name[len(prefix):])
+            known = manifest.get(blob.name)
+            if (known and known.get("generation") == blob.generation and os.path.exists(path)
+                    and os.path.getsize(path) == blob.size):
+                skipped += 1
             else:
-                print("Missing some required files")
-                return None
+                to_download.append((blob, path))
 
-        except Exception as e:
-            print(f"Error loading collection: {str(e)}")
-            return None
+        failed = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._download_blob, blob, path): blob for blob, path in to_download}
+            for future in as_completed(futures):
+                blob = futures[future]
+                try:
+                    error = future.result()
+                except Exception as e:
+                    error = str(e)
+                if error:
+                    failed[blob.name] = error
+                    print(f"Failed to restore {blob.name}: {error}")
+                    continue
+                manifest[blob.name] = {
+                    "generation": blob.generation,
+                    "size": blob.size,
+                    "md5": blob.md5_hash,
+                    "crc32c": blob.crc32c
+                }
+
+        self._save_manifest(manifest_dir, manifest)
+        report = {
+            "files": len(blobs),
+            "downloaded": len(to_download) - len(failed),
+            "skipped": skipped,
+            "failed": failed,
+            "bytes": sum(blob.size or 0 for blob, _ in to_download if blob.name not in failed),
+            "seconds": round(time.time() - start, 2)
+        }
+        print(f"Restored {prefix} into {dest_dir}: {report}")
+        return report
+
+    def restore_collection(self, collection_id: str, max_workers: int = 8) -> Dict[str, Any]:
+        """Restore one collection's HNSW segment directory into the local Chroma path"""
+        return self.restore_prefix(
+            f"{self.restore_path}/{collection_id}",
+            os.path.join(self.persist_directory, collection_id),
+            max_workers,
+            # One manifest for the whole directory, shared with restore_all
+            manifest_dir=self.persist_directory
+        )
+
+    def restore_all(self, max_workers: int = 8) -> Dict[str, Any]:
+        """Restore the whole Chroma directory (SQLite file and every segment), e.g. at boot"""
+        return self.restore_prefix(self.restore_path, self.persist_directory, max_workers)
 
     def get_collection_details(self, collection_id: str) -> Dict:
         """Get details about a collection from ChromaDB"""
@@ -0,0 +1,85 @@
+import math
+import logging
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+
+# Bucket size in degrees, roughly 550 m at Singapore's latitude
+DEFAULT_CELL_DEG = 0.005
+
+
+def haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class GeoIndex:
+    """Grid-bucketed spatial index over documents that carry lat/lng"""
+
+    def __init__(self, cell_deg: float = DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.buckets: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        self.size = 0
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def add(self, lat: float, lng: float, document: Dict[str, Any]) -> None:
+        """Add a document at the given coordinates"""
+        entry = dict(document, lat=lat, lng=lng)
+        self.buckets.setdefault(self._cell(lat, lng), []).append(entry)
+        self.size += 1
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Add documents with "lat"/"lng" keys, skipping ones without coordinates"""
+        added = 0
+        for doc in documents:
+            lat, lng = _to_float(doc.get("lat")), _to_float(doc.get("lng"))
+            if lat is None or lng is None:
+                continue
+            self.add(lat, lng, doc)
+            added += 1
+        return added
+
+    def query(self, lat: float, lng: float, radius: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return documents within radius metres, nearest first, with a "distance" key"""
+        # Only visit the buckets overlapping the bounding box of the search circle
+        d_lat = math.degrees(radius / EARTH_RADIUS_M)
+        d_lng = d_lat / max(math.cos(math.radians(lat)), 1e-6)
+        min_row, min_col = self._cell(lat - d_lat, lng - d_lng)
+        max_row, max_col = self._cell(lat + d_lat, lng + d_lng)
+
+        hits = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for entry in self.buckets.get((row, col), ()):
+                    distance = haversine(lat, lng, entry["lat"], entry["lng"])
+                    if distance <= radius:
+                        hits.append(dict(entry, distance=distance))
+
+        hits.sort(key=lambda hit: hit["distance"])
+        return hits[:limit] if limit else hits
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]], cell_deg: float = DEFAULT_CELL_DEG) -> "GeoIndex":
+        """Build an index from a columnar metadata sidecar"""
+        index = cls(cell_deg)
+        if "lat" not in columns or "lng" not in columns:
+            logging.warning("Metadata has no lat/lng columns, geo index is empty")
+            return index
+
+        names = list(columns.keys())
+        rows = (dict(zip(names, values)) for values in zip(*columns.values()))
+        index.add_documents(rows)
+        return index
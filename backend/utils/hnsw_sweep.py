@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+from datetime import datetime, timezone
+from itertools import product
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # Ships with chromadb as chroma-hnswlib; only the sweep itself needs it
+    hnswlib = None
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_hnsw_settings
+
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_M = [8, 16, 32, 48]
+DEFAULT_EF_CONSTRUCTION = [100, 200, 400]
+DEFAULT_EF_SEARCH = [10, 20, 40, 80, 160]
+
+
+def load_hnsw_metadata() -> Dict[str, Any]:
+    """
+    hnsw:* collection metadata from the recommended config, or {} to keep
+    Chroma's defaults. Chroma only applies these when a collection is
+    created, so existing collections need a rebuild to pick them up.
+    """
+    path = get_hnsw_settings()["config_path"]
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("collection_metadata", {})
+
+
+def vectors_from_chroma(chroma_client, collection_name: str, page_size: int = 1000) -> np.ndarray:
+    """Embeddings of a local Chroma collection, read a page at a time"""
+    collection = chroma_client.get_collection(collection_name)
+    pages = []
+    offset = 0
+    while True:
+        result = collection.get(limit=page_size, offset=offset, include=["embeddings"])
+        if not result["ids"]:
+            break
+        pages.append(np.asarray(result["embeddings"], dtype=np.float32))
+        offset += len(result["ids"])
+    if not pages:
+        raise ValueError(f"Collection {collection_name} has no embeddings")
+    return np.vstack(pages)
+
+
+def sample_queries(vectors: np.ndarray, count: int, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    """Perturbed corpus vectors, so queries sit near real documents without being them"""
+    rng = np.random.RandomState(seed)
+    rows = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    scale = noise * float(np.mean(np.linalg.norm(vectors[rows], axis=1))) / np.sqrt(vectors.shape[1])
+    return vectors[rows] + rng.normal(0, scale, (len(rows), vectors.shape[1])).astype(np.float32)
+
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, k: int, space: str = "l2") -> np.ndarray:
+    """Brute-force top-k row indices, the ground truth for recall"""
+    if space == "l2":
+        scores = -(np.sum(queries ** 2, axis=1)[:, None] - 2 * queries @ vectors.T + np.sum(vectors ** 2, axis=1)[None, :])
+    elif space == "cosine":
+        normalized = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        scores = queries @ normalized.T
+    else:
+        scores = queries @ vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+class HNSWSweep:
+    """
+    Rebuilds an hnswlib index (the library behind Chroma's local HNSW
+    segments) for every M x ef_construction pair, then queries it at each
+    ef_search, recording build time, index size, per-query latency and
+    recall@k against brute force.
+    """
+
+    def __init__(self, vectors: np.ndarray, queries: np.ndarray, k: int = 5, space: str = "l2",
+                 num_threads: int = -1):
+        if hnswlib is None:
+            raise ImportError("hnswlib is required for the HNSW sweep")
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.queries = np.ascontiguousarray(queries, dtype=np.float32)
+        self.k = k
+        self.space = space
+        self.num_threads = num_threads
+        self.truth = exact_neighbours(self.vectors, self.queries, k, space)
+        self.results: List[Dict[str, Any]] = []
+
+    def _build(self, m: int, ef_construction: int):
+        index = hnswlib.Index(space=self.space, dim=self.vectors.shape[1])
+        index.init_index(max_elements=len(self.vectors), M=m, ef_construction=ef_construction, random_seed=100)
+        start = time.perf_counter()
+        index.add_items(self.vectors, np.arange(len(self.vectors)), num_threads=self.num_threads)
+        return index, time.perf_counter() - start
+
+    @staticmethod
+    def _index_bytes(index) -> int:
+        # The serialized index is the graph plus vectors, i.e. its in-memory footprint
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.bin")
+            index.save_index(path)
+            return os.path.getsize(path)
+
+    def _measure(self, index, ef_search: int) -> Dict[str, Any]:
+        index.set_ef(max(ef_search, self.k))
+        latencies, found = [], []
+        for query in self.queries:
+            start = time.perf_counter()
+            labels, _ = index.knn_query(query[None, :], k=self.k, num_threads=1)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(labels[0])
+
+        recall = np.mean([len(set(labels) & set(expected)) / self.k for labels, expected in zip(found, self.truth)])
+        p50, p95 = np.percentile(latencies, [50, 95])
+        return {"recall": round(float(recall), 4), "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3)}
+
+    def run(self, m_values: List[int] = DEFAULT_M, ef_construction_values: List[int] = DEFAULT_EF_CONSTRUCTION,
+            ef_search_values: List[int] = DEFAULT_EF_SEARCH) -> List[Dict[str, Any]]:
+        self.results = []
+        for m, ef_construction in product(m_values, ef_construction_values):
+            index, build_seconds = self._build(m, ef_construction)
+            index_bytes = self._index_bytes(index)
+            for ef_search in ef_search_values:
+                result = {
+                    "M": m,
+                    "ef_construction": ef_construction,
+                    "ef_search": ef_search,
+                    "build_seconds": round(build_seconds, 3),
+                    "index_mb": round(index_bytes / 1024 / 1024, 2),
+                    **self._measure(index, ef_search)
+                }
+                self.results.append(result)
+                logging.info(f"HNSW sweep: {result}")
+        return self.results
+
+
+def recommend(results: List[Dict[str, Any]], target_recall: float) -> Dict[str, Any]:
+    """
+    Fastest configuration (p95, then index size, then build time) that meets
+    target_recall; if none does, the one with the best recall
+    """
+    passing = [r for r in results if r["recall"] >= target_recall]
+    if passing:
+        return min(passing, key=lambda r: (r["p95_ms"], r["index_mb"], r["build_seconds"]))
+    logging.warning(f"No configuration reached recall {target_recall}; recommending the most accurate")
+    return max(results, key=lambda r: (r["recall"], -r["p95_ms"]))
+
+
+def write_config(best: Dict[str, Any], space: str, corpus_size: int, target_recall: float,
+                 path: Optional[str] = None) -> Dict[str, Any]:
+    """Save the recommendation where load_hnsw_metadata picks it up at ingestion"""
+    path = path or get_hnsw_settings()["config_path"]
+    config = {
+        "collection_metadata": {
+            "hnsw:space": space,
+            "hnsw:M": best["M"],
+            "hnsw:construction_ef": best["ef_construction"],
+            "hnsw:search_ef": best["ef_search"]
+        },
+        "measured": best,
+        "target_recall": target_recall,
+        "corpus_size": corpus_size,
+        "generated_at": datetime.now(timezone.utc).isoformat()
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    os.replace(path + ".tmp", path)
+    logging.info(f"Wrote HNSW config to {path}")
+    return config
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sweep HNSW parameters for the local Chroma index")
+    parser.add_argument("--collection", default="wikipedia_collection", help="Chroma collection to read vectors from")
+    parser.add_argument("--export", help="Read vectors from this local index export instead (collection name)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled query vectors")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--space", default="l2", choices=["l2", "cosine", "ip"], help="Chroma's default is l2")
+    parser.add_argument("--m", type=int, nargs="+", default=DEFAULT_M)
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=DEFAULT_EF_CONSTRUCTION)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=DEFAULT_EF_SEARCH)
+    parser.add_argument("--target-recall", type=float, default=get_hnsw_settings()["target_recall"])
+    parser.add_argument("--write", action="store_true", help="Save the recommendation for ingestion to use")
+    args = parser.parse_args()
+
+    if args.export:
+        from local_index import LocalVectorIndex
+        corpus = np.asarray(LocalVectorIndex(args.export).vectors, dtype=np.float32)
+    else:
+        from chroma import ChromaDBManager
+        corpus = vectors_from_chroma(ChromaDBManager().chroma_client, args.collection)
+
+    sweep = HNSWSweep(corpus, sample_queries(corpus, args.queries), k=args.k, space=args.space)
+    results = sweep.run(args.m, args.ef_construction, args.ef_search)
+
+    print("\n=== HNSW sweep ===")
+    for result in sorted(results, key=lambda r: (-r["recall"], r["p95_ms"])):
+        print(json.dumps(result))
+    best = recommend(results, args.target_recall)
+    print(f"\nRecommended: {json.dumps(best)}")
+    if args.write:
+        print(json.dumps(write_config(best, args.space, len(corpus), args.target_recall), indent=2))
@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import importlib.util
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
+
+import httpx
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_ingestion_settings
+
+logging.basicConfig(level=logging.INFO)
+
+# lxml is several times faster than the stdlib parser when it is installed
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Below this much extracted text a page is assumed to need JavaScript
+MIN_TEXT_LENGTH = 200
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; SingaporeTourGuideBot/1.0)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en"
+}
+
+
+class HttpFetcher:
+    """
+    Plain HTTP first tier for the scrapers. Pages are fetched with httpx and
+    cached on disk with their ETag/Last-Modified, so refetches are
+    conditional and unchanged pages come back as a 304. The headless browser
+    is only used when the extracted text is too short.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, timeout: float = 15.0,
+                 max_connections: int = 10, min_text_length: int = MIN_TEXT_LENGTH):
+        self.cache_dir = os.path.join(cache_dir or get_ingestion_settings()["cache_dir"], "http")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.min_text_length = min_text_length
+        self.client: Optional[httpx.AsyncClient] = None
+        self.stats = {"http": 0, "not_modified": 0, "browser": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _load_cached(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._cache_path(url)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_cached(self, url: str, response: httpx.Response):
+        entry = {
+            "url": url,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "html": response.text
+        }
+        path = self._cache_path(url)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """HTML for url, revalidating any cached copy; None if not fetchable as HTML"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections)
+            )
+
+        cached = self._load_cached(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = await self.client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            logging.warning(f"HTTP fetch failed for {url}: {e}")
+            return cached["html"] if cached else None
+
+        if response.status_code == 304 and cached:
+            self.stats["not_modified"] += 1
+            return cached["html"]
+        if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+            return None
+
+        self._save_cached(url, response)
+        return response.text
+
+    async def fetch_content(self, url: str, extract: Callable[[str], Awaitable[str]],
+                            browser_fetch: Callable[[str], Awaitable[str]]) -> Tuple[str, str]:
+        """
+        Extracted text for url and the tier that produced it ("http" or
+        "browser"). `extract` turns HTML into text; `browser_fetch` returns
+        rendered HTML and is only called when plain HTTP is not enough.
+        """
+        html = await self.fetch(url)
+        if html:
+            text = await extract(html)
+            if len(text) >= self.min_text_length:
+                self.stats["http"] += 1
+                return text, "http"
+
+        logging.info(f"Falling back to headless browser for {url}")
+        self.stats["browser"] += 1
+        return await extract(await browser_fetch(url)), "browser"
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        logging.info(
+            f"HTTP fetcher: {self.stats['http']} pages over plain HTTP "
+            f"({self.stats['not_modified']} not modified), {self.stats['browser']} browser fallbacks"
+        )
@@ -0,0 +1,115 @@
+import json
+import hashlib
+import logging
+from typing import Dict, List, Any, Optional
+
+# Metadata that changes on every run without the content changing
+VOLATILE_METADATA = {"last_verified", "content_hash", "tombstoned", "tombstoned_at"}
+
+PAGE_SIZE = 500
+
+
+def content_hash(text: str, metadata: Dict[str, Any]) -> str:
+    """Hash of a document's text and stable metadata"""
+    stable = {k: v for k, v in (metadata or {}).items() if k not in VOLATILE_METADATA}
+    payload = json.dumps([text, stable], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def existing_hashes(collection, where: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """id -> {"hash", "tombstoned"} for every stored item, read page by page"""
+    existing = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], where=where, limit=PAGE_SIZE, offset=offset)
+        ids = page.get("ids") or []
+        for item_id, metadata in zip(ids, page.get("metadatas") or []):
+            metadata = metadata or {}
+            existing[item_id] = {
+                "hash": metadata.get("content_hash"),
+                "tombstoned": bool(metadata.get("tombstoned"))
+            }
+        if len(ids) < PAGE_SIZE:
+            return existing
+        offset += PAGE_SIZE
+
+
+def plan_sync(collection, documents: List[Dict[str, Any]], where: Optional[Dict[str, Any]] = None) -> Dict[str, List]:
+    """
+    Diff documents ({"id", "text", "metadata"}) against the collection.
+    Only stored items matching `where` are considered for removal, so a
+    partial run does not delete everything it did not touch.
+    """
+    existing = existing_hashes(collection, where)
+    plan = {"added": [], "changed": [], "unchanged": [], "removed": []}
+    seen = set()
+
+    for doc in documents:
+        doc_hash = content_hash(doc["text"], doc["metadata"])
+        # Clears the flag on rows an earlier version tombstoned, since Chroma merges metadata
+        doc = {**doc, "metadata": {**doc["metadata"], "content_hash": doc_hash, "tombstoned": False}}
+        seen.add(doc["id"])
+
+        stored = existing.get(doc["id"])
+        if stored is None:
+            plan["added"].append(doc)
+        elif stored["hash"] != doc_hash or stored["tombstoned"]:
+            plan["changed"].append(doc)
+        else:
+            plan["unchanged"].append(doc["id"])
+
+    # Rows tombstoned by earlier versions are removed along with the rest
+    plan["removed"] = [item_id for item_id in existing if item_id not in seen]
+    return plan
+
+
+def apply_sync(collection, plan: Dict[str, List], dry_run: bool = False, embedder=None) -> Dict[str, int]:
+    """
+    Upsert new and changed documents and delete removed ones. With an
+    embedder (e.g. LocalEmbeddingEngine), vectors are computed in bulk first.
+    """
+    report = {key: len(values) for key, values in plan.items()}
+    if dry_run:
+        return report
+
+    to_write = plan["added"] + plan["changed"]
+    if to_write:
+        if embedder is not None:
+            embedder.embed_documents(to_write)
+        # Precomputed vectors are passed through, otherwise the collection embeds
+        kwargs = {}
+        if all("embedding" in doc for doc in to_write):
+            kwargs["embeddings"] = [doc["embedding"] for doc in to_write]
+        collection.upsert(
+            ids=[doc["id"] for doc in to_write],
+            documents=[doc["text"] for doc in to_write],
+            metadatas=[doc["metadata"] for doc in to_write],
+            **kwargs
+        )
+
+    if plan["removed"]:
+        # Chunk ids hash the chunk text, so an edited page leaves its old chunks
+        # behind; readers don't filter on metadata, so they have to go
+        collection.delete(ids=plan["removed"])
+
+    logging.info(
+        f"Synced {collection.name}: {report['added']} added, {report['changed']} changed, "
+        f"{report['unchanged']} unchanged, {report['removed']} removed"
+    )
+    return report
+
+
+def print_plan(collection_name: str, plan: Dict[str, List]) -> None:
+    """Print a dry-run diff report"""
+    print(f"\n=== Sync plan for {collection_name} ===")
+    print(f"Added: {len(plan['added'])}")
+    for doc in plan["added"]:
+        print(f"  + {doc['id']} ({doc['metadata'].get('name', '')})")
+    print(f"Changed: {len(plan['changed'])}")
+    for doc in plan["changed"]:
+        print(f"  ~ {doc['id']} ({doc['metadata'].get('name', '')})")
+    print(f"Unchanged: {len(plan['unchanged'])}")
+    print(f"Removed: {len(plan['removed'])}")
+    for item_id in plan["removed"]:
+        print(f"  - {item_id}")
+    print("========================")
@@ -0,0 +1,182 @@
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Any, Optional
+
+logging.basicConfig(level=logging.INFO)
+
+# Marks the end of the stream on a stage's input queue
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step. A plain stage maps one item to one item (None drops
+    it); a batch stage (batch_size set) receives lists of up to batch_size
+    items, flushed early after batch_timeout seconds, and returns a list.
+    on_error(item, error) is called for every input item the stage failed
+    on, so callers can record per-item failures.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Awaitable[Any]], workers: int = 1,
+                 queue_size: int = 100, batch_size: Optional[int] = None, batch_timeout: float = 2.0,
+                 on_error: Optional[Callable[[Any, Exception], None]] = None):
+        self.name = name
+        self.func = func
+        self.on_error = on_error
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.metrics = {
+            "processed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "busy_seconds": 0.0,
+            "max_queue_depth": 0,
+            "queue_depth_total": 0,
+            "queue_samples": 0
+        }
+
+    def _sample_queue(self, queue: asyncio.Queue):
+        depth = queue.qsize()
+        self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], depth)
+        self.metrics["queue_depth_total"] += depth
+        self.metrics["queue_samples"] += 1
+
+    async def _call(self, payload: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self.func(payload)
+        finally:
+            self.metrics["busy_seconds"] += time.perf_counter() - start
+
+    def _failed(self, items: List[Any], error: Exception):
+        self.metrics["failed"] += len(items)
+        if self.on_error is None:
+            return
+        for item in items:
+            try:
+                self.on_error(item, error)
+            except Exception as e:
+                logging.error(f"Stage {self.name} error handler failed: {e}")
+
+    async def _emit(self, output: Optional[asyncio.Queue], results: List[Any], item: Any):
+        if item is None:
+            self.metrics["dropped"] += 1
+        elif output is not None:
+            # Blocks when the next stage is behind, which is the backpressure
+            await output.put(item)
+        else:
+            results.append(item)
+
+    async def _worker(self, queue: asyncio.Queue, output: Optional[asyncio.Queue], results: List[Any]):
+        while True:
+            self._sample_queue(queue)
+            item = await queue.get()
+            if item is _DONE:
+                return
+            try:
+                result = await self._call(item)
+                self.metrics["processed"] += 1
+            except Exception as e:
+                logging.error(f"Stage {self.name} failed: {e}")
+                self._failed([item], e)
+                continue
+            await self._emit(output, results, result)
+
+    async def _batch_worker(self, queue: asyncio.Queue, output: Optional[asyncio.Queue], results: List[Any]):
+        done = False
+        while not done:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                self._sample_queue(queue)
+                timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.perf_counter() + self.batch_timeout
+            if not batch:
+                continue
+            try:
+                batch_results = await self._call(batch)
+                self.metrics["processed"] += len(batch)
+            except Exception as e:
+                logging.error(f"Stage {self.name} failed on a batch of {len(batch)}: {e}")
+                self._failed(batch, e)
+                continue
+            for result in batch_results or []:
+                await self._emit(output, results, result)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        busy = self.metrics["busy_seconds"]
+        samples = self.metrics["queue_samples"] or 1
+        return {
+            "workers": self.workers,
+            "processed": self.metrics["processed"],
+            "failed": self.metrics["failed"],
+            "dropped": self.metrics["dropped"],
+            "items_per_sec": round(self.metrics["processed"] / elapsed, 2) if elapsed else 0.0,
+            # Fraction of the run the stage's workers spent working; the highest is the bottleneck
+            "utilization": round(busy / (elapsed * self.workers), 2) if elapsed else 0.0,
+            "avg_queue_depth": round(self.metrics["queue_depth_total"] / samples, 1),
+            "max_queue_depth": self.metrics["max_queue_depth"]
+        }
+
+
+class IngestPipeline:
+    """
+    Streaming asyncio pipeline. Each stage has its own workers and a bounded
+    input queue, so stages overlap and a slow stage backs up only its
+    upstream instead of serializing the whole run.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    async def run(self, items: List[Any]) -> List[Any]:
+        """Push items through every stage and return the final stage's outputs"""
+        start = time.perf_counter()
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        results: List[Any] = []
+
+        async def feed():
+            for item in items:
+                await queues[0].put(item)
+
+        async def run_stage(index: int, upstream: Awaitable):
+            stage = self.stages[index]
+            output = queues[index + 1] if index + 1 < len(self.stages) else None
+            worker = stage._batch_worker if stage.batch_size else stage._worker
+            workers = [asyncio.create_task(worker(queues[index], output, results)) for _ in range(stage.workers)]
+
+            # Once everything upstream is finished, tell this stage's workers to stop
+            await upstream
+            for _ in workers:
+                await queues[index].put(_DONE)
+            await asyncio.gather(*workers)
+
+        upstream = asyncio.create_task(feed())
+        for index in range(len(self.stages)):
+            upstream = asyncio.create_task(run_stage(index, upstream))
+        await upstream
+
+        elapsed = time.perf_counter() - start
+        self.metrics = {stage.name: stage.report(elapsed) for stage in self.stages}
+        self.metrics["total"] = {"seconds": round(elapsed, 2), "items": len(items), "outputs": len(results)}
+        return results
+
+    def print_metrics(self):
+        print("\n=== Ingest pipeline ===")
+        for name, report in self.metrics.items():
+            print(f"{name}: {report}")
+        print("========================")
+
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_ingestion_settings
+
+logging.basicConfig(level=logging.INFO)
+
+PENDING = "pending"
+CLAIMED = "claimed"
+DONE = "done"
+FAILED = "failed"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobLedger:
+    """
+    Durable per-item progress for an ingestion job, in a local SQLite file.
+    Items are claimed with a lease so several workers can share a job; an
+    interrupted run resumes with whatever is not done, and failed items are
+    only retried when asked to.
+    """
+
+    def __init__(self, job: str, path: Optional[str] = None, lease_seconds: float = 900,
+                 worker_id: Optional[str] = None):
+        self.job = job
+        self.path = path or os.path.join(get_ingestion_settings()["cache_dir"], "jobs.sqlite3")
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or default_worker_id()
+        # ":memory:" gives a throwaway ledger, e.g. for dry runs
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit mode, so claims can use an explicit BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                payload TEXT,
+                status TEXT NOT NULL,
+                stage TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                claimed_at REAL,
+                updated_at REAL,
+                PRIMARY KEY (job, item_id)
+            )"""
+        )
+
+    def open_run(self, items: Dict[str, Any], final_stage: str) -> Dict[str, int]:
+        """
+        Register this run's items. A job with nothing left to do (no pending
+        or claimed items, and every done item at final_stage) is finished,
+        so it starts over with done and failed items queued again;
+        otherwise existing rows are kept and the run resumes.
+        """
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Failed items don't hold a run open; they wait for a new run or retry_failed
+                unfinished = self.conn.execute(
+                    """SELECT COUNT(*) FROM jobs WHERE job = ?
+                       AND (status IN (?, ?) OR (status = ? AND (stage IS NULL OR stage != ?)))""",
+                    (self.job, PENDING, CLAIMED, DONE, final_stage)
+                ).fetchone()[0]
+                if not unfinished:
+                    self.conn.execute("DELETE FROM jobs WHERE job = ?", (self.job,))
+                now = time.time()
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (job, item_id, payload, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    [(self.job, item_id, json.dumps(payload, default=str), PENDING, now) for item_id, payload in items.items()]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        summary = self.summary()
+        logging.info(f"Job {self.job}: {summary}")
+        return summary
+
+    def claim(self, limit: int = 1) -> List[Tuple[str, Any]]:
+        """Claim up to limit pending items, or items whose lease has expired"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                rows = self.conn.execute(
+                    """SELECT item_id, payload FROM jobs
+                       WHERE job = ? AND (status = ? OR (status = ? AND claimed_at < ?))
+                       ORDER BY rowid LIMIT ?""",
+                    (self.job, PENDING, CLAIMED, now - self.lease_seconds, limit)
+                ).fetchall()
+                self.conn.executemany(
+                    """UPDATE jobs SET status = ?, worker = ?, claimed_at = ?, updated_at = ?, attempts = attempts + 1
+                       WHERE job = ? AND item_id = ?""",
+                    [(CLAIMED, self.worker_id, now, now, self.job, item_id) for item_id, _ in rows]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return [(item_id, json.loads(payload) if payload else None) for item_id, payload in rows]
+
+    def _update(self, item_id: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self.conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE job = ? AND item_id = ?",
+                [*fields.values(), self.job, item_id]
+            )
+
+    def mark_stage(self, item_id: str, stage: str):
+        """Record progress on a claimed item and renew its lease"""
+        self._update(item_id, stage=stage, claimed_at=time.time())
+
+    def complete(self, item_id: str, stage: str, result: Any = None):
+        self._update(item_id, status=DONE, stage=stage, error=None,
+                     result=json.dumps(result, default=str) if result is not None else None)
+
+    def fail(self, item_id: str, error: str):
+        self._update(item_id, status=FAILED, error=error)
+
+    def set_stage(self, stage: str, status: str = DONE):
+        """Move every item with the given status to a stage, e.g. after a bulk store"""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET stage = ?, updated_at = ? WHERE job = ? AND status = ?",
+                (stage, time.time(), self.job, status)
+            )
+
+    def retry_failed(self, item_ids: Optional[List[str]] = None) -> int:
+        """Return failed items (all, or just item_ids) to pending"""
+        query = "UPDATE jobs SET status = ?, error = NULL, updated_at = ? WHERE job = ? AND status = ?"
+        params: List[Any] = [PENDING, time.time(), self.job, FAILED]
+        if item_ids:
+            query += f" AND item_id IN ({','.join('?' * len(item_ids))})"
+            params.extend(item_ids)
+        with self._lock:
+            return self.conn.execute(query, params).rowcount
+
+    def results(self) -> Dict[str, Any]:
+        """item_id -> stored result for every done item"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT item_id, result FROM jobs WHERE job = ? AND status = ? ORDER BY rowid",
+                (self.job, DONE)
+            ).fetchall()
+        return {item_id: json.loads(result) if result else None for item_id, result in rows}
+
+    def failures(self) -> Dict[str, str]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT item_id, error FROM jobs WHERE job = ? AND status = ?", (self.job, FAILED)
+            ).fetchall()
+        return dict(rows)
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE job = ? GROUP BY status", (self.job,)
+            ).fetchall()
+        return {status: 0 for status in (PENDING, CLAIMED, DONE, FAILED)} | dict(rows)
+
+    def reset(self):
+        """Forget the job, e.g. for a full rebuild"""
+        with self._lock:
+            self.conn.execute("DELETE FROM jobs WHERE job = ?", (self.job,))
+
+    def close(self):
+        self.conn.close()
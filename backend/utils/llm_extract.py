@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional
+
+from openai import AsyncOpenAI
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.chunker import split_text
+from utils.context_packer import count_tokens
+from utils.name_index import clean_name
+from utils.text_utils import split_sentences
+
+logging.basicConfig(level=logging.INFO)
+
+EXTRACTION_MODEL = "gpt-3.5-turbo"
+
+# Leaves room in the 16k context for the prompt and a full JSON answer
+CHUNK_TOKENS = 2500
+CHUNK_OVERLAP_TOKENS = 150
+
+METADATA_FIELDS = ["name", "location", "attraction_type"]
+
+MAP_PROMPT = """
+Analyze the following excerpt about tourist attractions in Singapore. For each attraction described in it, extract:
+1. Title or name of the attraction
+2. Main description, historical background and key features mentioned in this excerpt
+3. Location details
+4. Type of attraction (e.g., temple, museum, park, mural, etc.)
+
+Only include attractions the excerpt actually describes. Remove advertisements, navigation elements and irrelevant content.
+
+Excerpt: {text}
+
+Respond with a JSON object of exactly this structure:
+{{
+    "attractions": [
+        {{
+            "text": "<cleaned description from this excerpt>",
+            "metadata": {{
+                "name": "<attraction name>",
+                "location": "<specific location in Singapore, or empty>",
+                "attraction_type": "<type of attraction, or empty>"
+            }}
+        }}
+    ]
+}}
+"""
+
+
+def validate_extraction(result: Any) -> List[Dict[str, Any]]:
+    """Attractions from a map response; raises ValueError if it breaks the schema"""
+    if not isinstance(result, dict) or not isinstance(result.get("attractions"), list):
+        raise ValueError("Response is not an object with an attractions list")
+
+    attractions = []
+    for item in result["attractions"]:
+        if not isinstance(item, dict) or not isinstance(item.get("text"), str) or not isinstance(item.get("metadata"), dict):
+            raise ValueError(f"Malformed attraction: {item!r}")
+        metadata = item["metadata"]
+        if not isinstance(metadata.get("name"), str) or not metadata["name"].strip():
+            raise ValueError(f"Attraction without a name: {item!r}")
+        attractions.append({
+            "text": item["text"].strip(),
+            "metadata": {field: str(metadata.get(field) or "").strip() for field in METADATA_FIELDS}
+        })
+    return attractions
+
+
+def merge_attractions(attractions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce step: group chunk results by cleaned name, keep page order, and
+    merge each group's text sentence by sentence so overlapping chunks do
+    not repeat themselves.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for attraction in attractions:
+        key = clean_name(attraction["metadata"]["name"])
+        if key not in merged:
+            merged[key] = {"sentences": [], "seen": set(), "metadata": dict(attraction["metadata"])}
+        group = merged[key]
+
+        for sentence in split_sentences(attraction["text"]):
+            normalized = " ".join(sentence.lower().split())
+            if normalized not in group["seen"]:
+                group["seen"].add(normalized)
+                group["sentences"].append(sentence)
+        for field in METADATA_FIELDS:
+            if not group["metadata"].get(field):
+                group["metadata"][field] = attraction["metadata"].get(field, "")
+
+    return [
+        {"text": " ".join(group["sentences"]), "metadata": group["metadata"]}
+        for group in merged.values()
+    ]
+
+
+class LLMExtractor:
+    """
+    Map-reduce attraction extraction for scraped pages. The page is split
+    into token-bounded chunks, each chunk is extracted concurrently with a
+    JSON-mode call, responses are schema-checked, only failed chunks are
+    retried, and the results are merged by attraction name.
+    """
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None, model: str = EXTRACTION_MODEL,
+                 chunk_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                 max_concurrency: int = 4, max_retries: int = 2):
+        self.client = client or AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY2'))
+        self.model = model
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
+    def split(self, text: str) -> List[str]:
+        return split_text(text, self.chunk_tokens, self.overlap_tokens,
+                          length_function=lambda s: count_tokens(s, self.model))
+
+    async def _extract_chunk(self, chunk: str) -> List[Dict[str, Any]]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": MAP_PROMPT.format(text=chunk)}],
+            response_format={"type": "json_object"},
+            max_tokens=1500,
+            temperature=0
+        )
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            raise ValueError("Response was truncated")
+        return validate_extraction(json.loads(choice.message.content))
+
+    async def extract(self, text: str, url: str = "") -> List[Dict[str, Any]]:
+        """Merged attractions ({"text", "metadata"}) found in the page text"""
+        chunks = self.split(text)
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(index: int):
+            async with semaphore:
+                try:
+                    results[index] = await self._extract_chunk(chunks[index])
+                except Exception as e:
+                    logging.warning(f"Extraction failed for chunk {index} of {url}: {e}")
+
+        pending = list(range(len(chunks)))
+        for attempt in range(self.max_retries + 1):
+            await asyncio.gather(*(run(index) for index in pending))
+            pending = [index for index in pending if index not in results]
+            if not pending:
+                break
+            if attempt < self.max_retries:
+                logging.info(f"Retrying {len(pending)} failed chunks of {url}")
+
+        if pending:
+            logging.error(f"{len(pending)} of {len(chunks)} chunks of {url} could not be extracted")
+
+        attractions = merge_attractions([item for index in sorted(results) for item in results[index]])
+        logging.info(f"Extracted {len(attractions)} attractions from {len(chunks)} chunks of {url}")
+        return attractions
+
+    def to_documents(self, attractions: List[Dict[str, Any]], url: str) -> List[Dict[str, Any]]:
+        """Attractions in the stored document format used by WebScraper.py"""
+        return [
+            {
+                "text": attraction["text"],
+                "metadata": {
+                    "place_id": "",
+                    "name": attraction["metadata"]["name"],
+                    "category": "tourist_attraction",
+                    "source": "web_scrape",
+                    "fact_type": "historical",
+                    "last_verified": time.strftime("%Y-%m-%d"),
+                    "source_url": url,
+                    "has_scrape_content": True,
+                    "location": attraction["metadata"]["location"],
+                    "attraction_type": attraction["metadata"]["attraction_type"]
+                }
+            }
+            for attraction in attractions
+        ]
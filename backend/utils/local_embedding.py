@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+import logging
+import threading
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_embedding_settings
+from utils.embedding_cache import EmbeddingCache
+
+logging.basicConfig(level=logging.INFO)
+
+# Cache key for vectors from Chroma's default embedding model
+LOCAL_MODEL_NAME = "onnx-all-MiniLM-L6-v2"
+
+
+class ThreadedONNXMiniLM(ONNXMiniLM_L6_V2):
+    """Chroma's default MiniLM model with a configurable intra-op thread count"""
+
+    def __init__(self, intra_op_threads: int = 1):
+        super().__init__(preferred_providers=["CPUExecutionProvider"])
+        self.intra_op_threads = intra_op_threads
+
+    @cached_property
+    def model(self):
+        so = self.ort.SessionOptions()
+        so.log_severity_level = 3
+        so.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        so.intra_op_num_threads = self.intra_op_threads
+        so.inter_op_num_threads = 1
+        return self.ort.InferenceSession(
+            os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "model.onnx"),
+            providers=self._preferred_providers,
+            sess_options=so
+        )
+
+
+_worker_model: Optional[ThreadedONNXMiniLM] = None
+
+
+_query_model: Optional[ThreadedONNXMiniLM] = None
+_query_model_lock = threading.Lock()
+
+
+def get_query_model() -> ThreadedONNXMiniLM:
+    """
+    Process-wide model for embedding search queries. Stores are opened and
+    closed per request, so the ONNX session has to live outside them.
+    """
+    global _query_model
+    with _query_model_lock:
+        if _query_model is None:
+            model = ThreadedONNXMiniLM(intra_op_threads=1)
+            # Create the session now, under the lock, rather than on first use
+            model.model
+            _query_model = model
+    return _query_model
+
+
+def _init_worker(intra_op_threads: int):
+    global _worker_model
+    _worker_model = ThreadedONNXMiniLM(intra_op_threads)
+
+
+def _embed_in_worker(texts: List[str]) -> List[List[float]]:
+    return np.asarray(_worker_model(texts), dtype=np.float32).tolist()
+
+
+class LocalEmbeddingEngine:
+    """
+    Runs the local MiniLM model over large batches across a process pool so
+    corpus rebuilds use every core. Small inputs are embedded in-process,
+    where starting workers would cost more than it saves.
+    """
+
+    def __init__(self, workers: Optional[int] = None, intra_op_threads: Optional[int] = None,
+                 batch_size: Optional[int] = None, cache: Optional[EmbeddingCache] = None):
+        settings = get_embedding_settings()
+        self.intra_op_threads = intra_op_threads or settings["local_threads"]
+        self.workers = workers or max(1, settings["local_workers"] // self.intra_op_threads)
+        self.batch_size = batch_size or settings["local_batch_size"]
+        self.cache = cache or EmbeddingCache()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._model: Optional[ThreadedONNXMiniLM] = None
+
+    def _local_model(self) -> ThreadedONNXMiniLM:
+        if self._model is None:
+            self._model = ThreadedONNXMiniLM(self.workers * self.intra_op_threads)
+        return self._model
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Download once up front so workers do not race to fetch the model
+            self._local_model()._download_model_if_not_exists()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.intra_op_threads,)
+            )
+        return self._executor
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, returning vectors in input order"""
+        start = time.perf_counter()
+        unique = list(dict.fromkeys(texts))
+        vectors = self.cache.get_many(LOCAL_MODEL_NAME, unique)
+        missing = [text for text in unique if text not in vectors]
+
+        if missing:
+            if len(missing) <= self.batch_size or self.workers == 1:
+                embedded = np.asarray(self._local_model()(missing), dtype=np.float32).tolist()
+            else:
+                batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+                embedded = [vector for batch in self._pool().map(_embed_in_worker, batches) for vector in batch]
+            new_vectors = dict(zip(missing, embedded))
+            self.cache.put_many(LOCAL_MODEL_NAME, new_vectors)
+            vectors.update(new_vectors)
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        logging.info(
+            f"Embedded {len(missing)} texts locally ({len(unique) - len(missing)} cached) "
+            f"with {self.workers} workers x {self.intra_op_threads} threads: {len(texts) / elapsed:.1f} docs/sec"
+        )
+        return [vectors[text] for text in texts]
+
+    def embed_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach an "embedding" to each document that does not have one"""
+        pending = [doc for doc in documents if "embedding" not in doc]
+        for doc, vector in zip(pending, self.embed([doc["text"] for doc in pending])):
+            doc["embedding"] = vector
+        return documents
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def reindex_local_collections(store, collection_names: List[str], engine: Optional[LocalEmbeddingEngine] = None) -> Dict[str, int]:
+    """
+    Copy each Weaviate collection into its *Local twin with MiniLM vectors,
+    so EMBEDDING_BACKEND=local can embed queries in-process.
+    """
+    engine = engine or LocalEmbeddingEngine()
+    local_names = {name: f"{name}{store.local_suffix}" for name in collection_names}
+    store._ensure_collections(list(local_names.values()))
+
+    counts = {}
+    for name, local_name in local_names.items():
+        documents = store.get_documents(name)
+        embeddings = engine.embed([doc["text"] for doc in documents])
+        store.store_documents(local_name, documents, embeddings)
+        counts[local_name] = len(documents)
+        logging.info(f"Re-indexed {len(documents)} documents from {name} into {local_name}")
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+    from store import WeaviateStore, COLLECTION_NAMES
+
+    parser = argparse.ArgumentParser(description="Re-index Weaviate collections with the local MiniLM model")
+    parser.add_argument("--collections", nargs="+", default=COLLECTION_NAMES, help="Source collections to re-index")
+    args = parser.parse_args()
+
+    store = WeaviateStore()
+    engine = LocalEmbeddingEngine()
+    try:
+        print(reindex_local_collections(store, args.collections, engine))
+    finally:
+        engine.close()
+        store.close()
@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import logging
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_local_index_settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Columns written to the metadata sidecar, in the same order as the
+# WeaviateStore collection schema
+METADATA_COLUMNS = [
+    "uuid", "text", "place_id", "name", "category", "source", "fact_type",
+    "last_verified", "source_url", "has_scrape_content", "location", "attraction_type",
+    "lat", "lng"
+]
+
+# Rows upcast to float32 per step when scoring a float16 index (~6 MB at 1536 dims)
+SCORE_BLOCK_ROWS = 1024
+
+# Columns that have no sensible empty-string default. lat/lng stay empty
+# unless documents were stored in Weaviate with coordinates; RAGManager
+# reads location data from the local Chroma collection instead
+NUMERIC_COLUMNS = {"lat", "lng"}
+
+
+def index_paths(index_dir: str, collection_name: str) -> Dict[str, str]:
+    """Return the vector and metadata file paths for a collection"""
+    return {
+        "vectors": os.path.join(index_dir, f"{collection_name}.npy"),
+        "metadata": os.path.join(index_dir, f"{collection_name}.meta.json")
+    }
+
+
+def load_metadata(index_dir: str, collection_name: str) -> Dict[str, Any]:
+    """Load the columnar metadata sidecar without touching the vectors"""
+    with open(index_paths(index_dir, collection_name)["metadata"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _object_vector(obj) -> Optional[List[float]]:
+    """Get the default vector from a Weaviate object (plain list or named vectors)"""
+    vector = getattr(obj, "vector", None)
+    if isinstance(vector, dict):
+        vector = vector.get("default") or next(iter(vector.values()), None)
+    return vector
+
+
+def export_collection(store, collection_name: str, index_dir: str, dtype: str = "float32") -> int:
+    """
+    Export every vector of a Weaviate collection into a contiguous .npy matrix
+    with a columnar JSON metadata sidecar. Vectors are L2-normalised so cosine
+    similarity becomes a plain dot product at query time.
+    """
+    collection = store.client.collections.get(collection_name)
+
+    vectors = []
+    columns = {name: [] for name in METADATA_COLUMNS}
+
+    for obj in collection.iterator(include_vector=True):
+        vector = _object_vector(obj)
+        if not vector:
+            logging.warning(f"Skipping {obj.uuid} in {collection_name}: no vector")
+            continue
+
+        props = obj.properties or {}
+        vectors.append(vector)
+        columns["uuid"].append(str(obj.uuid))
+        for name in METADATA_COLUMNS[1:]:
+            value = props.get(name, None if name in NUMERIC_COLUMNS else "")
+            # Dates come back as datetime objects
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            columns[name].append(value)
+
+    if not vectors:
+        logging.warning(f"No vectors found in {collection_name}, nothing exported")
+        return 0
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = np.ascontiguousarray(matrix / norms, dtype=dtype)
+
+    os.makedirs(index_dir, exist_ok=True)
+    paths = index_paths(index_dir, collection_name)
+
+    # Write to temp files first so running workers never map a half-written index
+    np.save(paths["vectors"] + ".tmp.npy", matrix)
+    os.replace(paths["vectors"] + ".tmp.npy", paths["vectors"])
+
+    sidecar = {
+        "collection": collection_name,
+        "count": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]),
+        "dtype": dtype,
+        "normalized": True,
+        "columns": columns
+    }
+    with open(paths["metadata"] + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False)
+    os.replace(paths["metadata"] + ".tmp", paths["metadata"])
+
+    logging.info(f"Exported {matrix.shape[0]} vectors ({matrix.shape[1]} dims, {dtype}) from {collection_name}")
+    return int(matrix.shape[0])
+
+
+class LocalVectorIndex:
+    """Exact cosine search over a memory-mapped, read-only vector matrix"""
+
+    def __init__(self, collection_name: str, index_dir: Optional[str] = None):
+        index_dir = index_dir or get_local_index_settings()["index_dir"]
+        paths = index_paths(index_dir, collection_name)
+
+        self.collection_name = collection_name
+        # mmap_mode='r' lets every uvicorn worker share the same page cache
+        self.vectors = np.load(paths["vectors"], mmap_mode="r")
+
+        sidecar = load_metadata(index_dir, collection_name)
+        self.columns = sidecar["columns"]
+        self.normalized = sidecar.get("normalized", False)
+
+        if len(self.columns["uuid"]) != self.vectors.shape[0]:
+            raise ValueError(f"Metadata rows do not match vector count for {collection_name}")
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Return the metadata of one stored document"""
+        return {name: values[index] for name, values in self.columns.items()}
+
+    def _prepare_queries(self, query_vectors) -> np.ndarray:
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Query has {queries.shape[1]} dims, index has {self.dim}")
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return queries / norms
+
+    def _top_k(self, scores: np.ndarray, limit: int) -> List[List[Dict[str, Any]]]:
+        """Select the top-k rows per query with argpartition, then sort only those"""
+        limit = min(limit, scores.shape[1])
+        if limit <= 0:
+            return [[] for _ in range(scores.shape[0])]
+
+        if limit < scores.shape[1]:
+            candidates = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        top = np.take_along_axis(candidates, order, axis=1)
+
+        results = []
+        for query_idx, indices in enumerate(top):
+            hits = []
+            for index in indices:
+                hit = self.row(int(index))
+                hit["score"] = float(scores[query_idx, index])
+                hits.append(hit)
+            results.append(hits)
+        return results
+
+    def scores(self, query_vectors) -> np.ndarray:
+        """
+        Cosine similarity of each query against every stored vector. A
+        float32 matrix is multiplied straight from the mmap; other dtypes
+        are upcast SCORE_BLOCK_ROWS rows at a time, so a query never copies
+        the whole matrix.
+        """
+        queries = self._prepare_queries(query_vectors)
+        matrix = self.vectors
+        if matrix.dtype == np.float32 and self.normalized:
+            return queries @ matrix.T
+
+        scores = np.empty((queries.shape[0], matrix.shape[0]), dtype=np.float32)
+        for start in range(0, matrix.shape[0], SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            block_scores = queries @ block.T
+            if not self.normalized:
+                norms = np.linalg.norm(block, axis=1)
+                norms[norms == 0] = 1.0
+                block_scores /= norms
+            scores[:, start:start + block.shape[0]] = block_scores
+        return scores
+
+    def search(self, query_vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+        """Exact top-k search for a single query vector"""
+        return self._top_k(self.scores(query_vector), limit)[0]
+
+    def search_batch(self, query_vectors: List[List[float]], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """Exact top-k search for several query vectors in one matrix product"""
+        return self._top_k(self.scores(query_vectors), limit)
+
+
+if __name__ == "__main__":
+    from store import WeaviateStore
+
+    settings = get_local_index_settings()
+    dtype = sys.argv[1] if len(sys.argv) > 1 else settings["dtype"]
+
+    store = WeaviateStore()
+    try:
+        for name in ["WikipediaCollection", "SingaporeAttraction"]:
+            count = export_collection(store, name, settings["index_dir"], dtype=dtype)
+            print(f"{name}: exported {count} vectors to {settings['index_dir']}")
+    finally:
+        store.close()
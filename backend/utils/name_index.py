@@ -0,0 +1,92 @@
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, List, Any, Optional, Tuple
+
+CATEGORIES = ["One", "Two", "Three"]
+
+
+def clean_name(name: str) -> str:
+    """Clean name by removing special characters and standardizing format"""
+    name = name.split('|')[0].strip()
+    name = re.sub(r'[^\w\s-]', '', name)
+    name = ' '.join(name.split())
+    return name.lower()
+
+
+def ngrams(text: str, n: int = 3) -> set:
+    """Character n-grams of a cleaned name, padded so short names still have some"""
+    padded = f"{' ' * (n - 1)}{text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class AttractionNameIndex:
+    """
+    Prebuilt fuzzy name index over the curated attractions array. Names are
+    cleaned once, a character n-gram inverted index narrows each lookup to the
+    few entries that share enough n-grams, and only those are scored.
+    """
+
+    def __init__(self, attractions_array: Dict[str, List[Dict[str, str]]], n: int = 3,
+                 min_shared: float = 0.3):
+        self.n = n
+        self.min_shared = min_shared
+        self.entries: List[Dict[str, Any]] = []
+        self.postings: Dict[str, List[int]] = {}
+
+        for category in CATEGORIES:
+            for item in attractions_array.get(category, []):
+                cleaned = clean_name(item["name"])
+                grams = ngrams(cleaned, n)
+                entry_id = len(self.entries)
+                self.entries.append({
+                    "category": category,
+                    "name": item["name"],
+                    "url": item["url"],
+                    "cleaned": cleaned,
+                    "gram_count": len(grams)
+                })
+                for gram in grams:
+                    self.postings.setdefault(gram, []).append(entry_id)
+
+    def candidates(self, cleaned: str) -> List[int]:
+        """Entry ids sharing at least min_shared of the smaller n-gram set, in array order"""
+        grams = ngrams(cleaned, self.n)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        selected = []
+        for entry_id, count in shared.items():
+            smaller = min(len(grams), self.entries[entry_id]["gram_count"])
+            if count >= self.min_shared * smaller:
+                selected.append(entry_id)
+        return sorted(selected)
+
+    def match(self, attraction_name: str, threshold: float = 0.8,
+              contained_threshold: float = 0.5) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Best matching entry and its similarity, following the original linear
+        scan rules: a ratio above the running best wins, and a name contained in
+        the other wins whenever its ratio is above contained_threshold.
+        """
+        cleaned = clean_name(attraction_name)
+        best, highest_ratio = None, threshold
+
+        for entry_id in self.candidates(cleaned):
+            entry = self.entries[entry_id]
+            matcher = SequenceMatcher(None, cleaned, entry["cleaned"])
+            contained = cleaned in entry["cleaned"] or entry["cleaned"] in cleaned
+            floor = min(highest_ratio, contained_threshold) if contained else highest_ratio
+
+            # Cheap upper bounds first; skip the full ratio when they cannot win
+            if matcher.real_quick_ratio() <= floor or matcher.quick_ratio() <= floor:
+                continue
+            similarity = matcher.ratio()
+
+            if similarity > highest_ratio:
+                best, highest_ratio = entry, similarity
+            if contained and similarity > contained_threshold:
+                best, highest_ratio = entry, similarity
+
+        return best, highest_ratio
@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import math
+import asyncio
+import hashlib
+import logging
+from functools import partial
+from typing import Dict, List, Any, Optional, Tuple
+
+import googlemaps
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_ingestion_settings
+from utils.rate_limit import AsyncRateLimiter
+
+logging.basicConfig(level=logging.INFO)
+
+METERS_PER_DEGREE = 111320.0
+
+# Roughly the whole of Singapore: (south, west, north, east)
+SINGAPORE_BBOX = (1.16, 103.60, 1.48, 104.09)
+
+# Google returns at most 3 pages of 20 results per search
+MAX_RESULTS_PER_SEARCH = 60
+
+
+def point_in_polygon(lat: float, lng: float, polygon: List[Tuple[float, float]]) -> bool:
+    """Ray casting test for a (lat, lng) polygon"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lng_i = polygon[i]
+        lat_j, lng_j = polygon[j]
+        if (lng_i > lng) != (lng_j > lng):
+            crossing = lat_i + (lng - lng_i) * (lat_j - lat_i) / (lng_j - lng_i)
+            if lat < crossing:
+                inside = not inside
+        j = i
+    return inside
+
+
+def tile_area(bbox: Tuple[float, float, float, float], cell_radius: float = 500, overlap: float = 0.15,
+              polygon: Optional[List[Tuple[float, float]]] = None) -> List[Dict[str, Any]]:
+    """
+    Cover a bounding box with overlapping search circles. Circles are spaced
+    so neighbouring ones overlap by `overlap` of the inscribed square, which
+    leaves no gaps. With a polygon, only cells touching it are kept.
+    """
+    south, west, north, east = bbox
+    step_m = cell_radius * math.sqrt(2) * (1 - overlap)
+    step_lat = step_m / METERS_PER_DEGREE
+    step_lng = step_m / (METERS_PER_DEGREE * math.cos(math.radians((south + north) / 2)))
+
+    cells = []
+    row = 0
+    lat = south + step_lat / 2
+    while lat - step_lat / 2 < north:
+        col = 0
+        lng = west + step_lng / 2
+        while lng - step_lng / 2 < east:
+            corners = [
+                (lat + d_lat, lng + d_lng)
+                for d_lat in (-step_lat / 2, step_lat / 2)
+                for d_lng in (-step_lng / 2, step_lng / 2)
+            ]
+            if polygon is None or any(point_in_polygon(p_lat, p_lng, polygon) for p_lat, p_lng in [(lat, lng)] + corners):
+                cells.append({"id": f"{row}:{col}", "lat": round(lat, 6), "lng": round(lng, 6), "radius": cell_radius})
+            lng += step_lng
+            col += 1
+        lat += step_lat
+        row += 1
+    return cells
+
+
+def split_cell(cell: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Four half-radius cells covering a saturated cell"""
+    offset_m = cell["radius"] / 2
+    d_lat = offset_m / METERS_PER_DEGREE
+    d_lng = offset_m / (METERS_PER_DEGREE * math.cos(math.radians(cell["lat"])))
+    return [
+        {
+            "id": f"{cell['id']}/{i}",
+            "lat": round(cell["lat"] + s_lat * d_lat, 6),
+            "lng": round(cell["lng"] + s_lng * d_lng, 6),
+            "radius": cell["radius"] / 2 * 1.5
+        }
+        for i, (s_lat, s_lng) in enumerate([(-1, -1), (-1, 1), (1, -1), (1, 1)])
+    ]
+
+
+class PlacesCrawler:
+    """
+    Concurrent Places Nearby crawler over grid cells. Each cell runs as its
+    own task, so waiting for a next_page_token to become valid never blocks
+    other cells. Results are deduplicated by place_id and progress is
+    checkpointed after every finished cell. A checkpoint only resumes a crawl
+    of the same cells and place type, and is deleted once a crawl finishes
+    with no failed cells.
+    """
+
+    def __init__(self, gmaps_client: googlemaps.Client, place_type: str = 'tourist_attraction',
+                 max_concurrency: int = 4, requests_per_second: float = 5.0,
+                 checkpoint_path: Optional[str] = None, min_radius: float = 100):
+        self.gmaps = gmaps_client
+        self.place_type = place_type
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.min_radius = min_radius
+        self.checkpoint_path = checkpoint_path or os.path.join(
+            get_ingestion_settings()["cache_dir"], "places_crawl_checkpoint.json"
+        )
+
+        self.completed_cells = set()
+        self.places: Dict[str, Dict[str, Any]] = {}
+        self.requests_made = 0
+        self.crawl_key = None
+
+    def _crawl_key(self, cells: List[Dict[str, Any]]) -> str:
+        """
+        Identify a crawl by its place type and cell layout. Cell ids are grid
+        positions relative to the bbox, so the coordinates and radius have to
+        be part of the key too.
+        """
+        layout = [(cell["id"], cell["lat"], cell["lng"], cell["radius"]) for cell in cells]
+        payload = json.dumps([self.place_type, layout])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load_checkpoint(self):
+        self.completed_cells = set()
+        self.places = {}
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("crawl_key") != self.crawl_key:
+            logging.info("Ignoring checkpoint from a crawl of a different area or place type")
+            return
+        self.completed_cells = set(checkpoint.get("completed_cells", []))
+        self.places = checkpoint.get("places", {})
+        logging.info(f"Resuming crawl: {len(self.completed_cells)} cells done, {len(self.places)} places")
+
+    def _save_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        with open(self.checkpoint_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "crawl_key": self.crawl_key,
+                "completed_cells": sorted(self.completed_cells),
+                "places": self.places
+            }, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    async def _request(self, **kwargs) -> Dict[str, Any]:
+        """Run one blocking places_nearby call under the quota limits"""
+        async with self._semaphore:
+            await self._limiter.wait()
+            self.requests_made += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, partial(self.gmaps.places_nearby, **kwargs))
+
+    async def _crawl_cell(self, cell: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch every page of one cell, returning any sub-cells to crawl"""
+        response = await self._request(
+            location=(cell["lat"], cell["lng"]),
+            radius=cell["radius"],
+            type=self.place_type,
+            language='en'
+        )
+        results = list(response.get("results", []))
+
+        while response.get("next_page_token"):
+            token = response["next_page_token"]
+            # Tokens take a moment to become valid; sleeping here only pauses this cell
+            for attempt in range(3):
+                await asyncio.sleep(2)
+                try:
+                    response = await self._request(page_token=token)
+                    break
+                except googlemaps.exceptions.ApiError as e:
+                    if e.status != "INVALID_REQUEST" or attempt == 2:
+                        raise
+            results.extend(response.get("results", []))
+
+        for place in results:
+            if place.get("place_id"):
+                self.places.setdefault(place["place_id"], place)
+
+        self.completed_cells.add(cell["id"])
+        self._save_checkpoint()
+
+        # A full result set means the cell was probably truncated, so look closer
+        if len(results) >= MAX_RESULTS_PER_SEARCH and cell["radius"] / 2 >= self.min_radius:
+            return [sub for sub in split_cell(cell) if sub["id"] not in self.completed_cells]
+        return []
+
+    async def crawl(self, cells: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Crawl all cells concurrently and return the deduplicated places"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._limiter = AsyncRateLimiter(self.requests_per_second)
+        self.crawl_key = self._crawl_key(cells)
+        self._load_checkpoint()
+
+        pending = {asyncio.create_task(self._crawl_cell(cell)): cell for cell in cells if cell["id"] not in self.completed_cells}
+        failed = 0
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                cell = pending.pop(task)
+                try:
+                    for sub_cell in task.result():
+                        pending[asyncio.create_task(self._crawl_cell(sub_cell))] = sub_cell
+                except Exception as e:
+                    failed += 1
+                    logging.error(f"Error crawling cell {cell['id']}: {str(e)}")
+
+        logging.info(
+            f"Crawled {len(self.completed_cells)} cells with {self.requests_made} requests, "
+            f"{len(self.places)} unique places, {failed} failed cells"
+        )
+        # Keep the checkpoint only while there are failed cells left to retry
+        if not failed:
+            self._clear_checkpoint()
+        return list(self.places.values())
+
+    def crawl_sync(self, cells: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Blocking wrapper for scripts that are not async"""
+        return asyncio.run(self.crawl(cells))
@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Spaces calls out to at most `rate` per second, shared by all tasks"""
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        """Block until the caller's slot comes up"""
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aenter__(self):
+        await self.wait()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.local_index import LocalVectorIndex
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Fixed query set: landmark names as typed into search, and questions users ask the guide
+BENCHMARK_QUERIES = [
+    "Sri Mariamman Temple",
+    "Buddha Tooth Relic Temple",
+    "Thian Hock Keng Temple",
+    "Jamae Mosque",
+    "Chinatown Heritage Centre",
+    "Chinatown Complex Food Centre",
+    "Maxwell Food Centre",
+    "Ann Siang Hill",
+    "Club Street",
+    "Pagoda Street",
+    "Temple Street",
+    "Smith Street",
+    "Bruce Lee mural",
+    "Yip Yew Chong murals",
+    "Singapore City Gallery",
+    "Telok Ayer Street",
+    "Which temple in Chinatown is the oldest Hindu temple in Singapore?",
+    "What is inside the Buddha Tooth Relic Temple?",
+    "Where can I find street art in Chinatown?",
+    "What did Chinatown look like in the early days of Singapore?",
+    "Where should I go for hawker food near Chinatown?",
+    "Why is it called Temple Street?",
+    "What is the history of Thian Hock Keng?",
+    "Are there any museums about Chinatown's history?",
+    "What are the shophouses on Pagoda Street used for?",
+    "Where is the mural of the old Chinatown market?"
+]
+
+
+class LocalExactBackend:
+    """Brute-force cosine search over a local index export; the ground truth for recall"""
+
+    def __init__(self, index: LocalVectorIndex):
+        self.name = "local-exact"
+        self.index = index
+
+    def search(self, vector: List[float], k: int) -> List[str]:
+        return [hit["uuid"] for hit in self.index.search(vector, k)]
+
+    def search_batch(self, vectors: List[List[float]], k: int) -> List[List[str]]:
+        return [[hit["uuid"] for hit in hits] for hits in self.index.search_batch(vectors, k)]
+
+
+class WeaviateBackend:
+    """near_vector search against a collection reachable from a WeaviateStore"""
+
+    def __init__(self, store, collection_name: str):
+        self.name = f"weaviate:{collection_name}"
+        self.collection = store.client.collections.get(collection_name)
+
+    def search(self, vector: List[float], k: int) -> List[str]:
+        result = self.collection.query.near_vector(near_vector=vector, limit=k)
+        return [str(obj.uuid) for obj in result.objects]
+
+
+class ChromaBackend:
+    """Chroma collection queried with precomputed vectors"""
+
+    def __init__(self, chroma_client, collection_name: str):
+        self.name = f"chroma:{collection_name}"
+        self.chroma_client = chroma_client
+        self.collection_name = collection_name
+        self.collection = None
+
+    def load(self, index: LocalVectorIndex, batch_size: int = 1000, metadata: Optional[Dict[str, Any]] = None):
+        """Rebuild the collection from the local export, keeping its uuids as ids"""
+        try:
+            self.chroma_client.delete_collection(self.collection_name)
+        except Exception:
+            pass
+        self.collection = self.chroma_client.create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine", **(metadata or {})}
+        )
+        for start in range(0, len(index), batch_size):
+            end = min(start + batch_size, len(index))
+            self.collection.add(
+                ids=index.columns["uuid"][start:end],
+                embeddings=np.asarray(index.vectors[start:end], dtype=np.float32).tolist(),
+                documents=[text or "" for text in index.columns["text"][start:end]]
+            )
+        logging.info(f"Loaded {len(index)} vectors into Chroma collection {self.collection_name}")
+
+    def search(self, vector: List[float], k: int) -> List[str]:
+        if self.collection is None:
+            self.collection = self.chroma_client.get_collection(self.collection_name)
+        result = self.collection.query(query_embeddings=[vector], n_results=k, include=[])
+        return result["ids"][0]
+
+
+class FakeLatencyBackend:
+    """
+    Wraps another backend and adds a simulated network round trip, so the
+    harness can be exercised without a running Weaviate or Chroma server
+    """
+
+    def __init__(self, inner, latency_ms: float = 20.0, jitter_ms: float = 5.0, seed: int = 0):
+        self.name = f"fake({inner.name}, {latency_ms:.0f}ms)"
+        self.inner = inner
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+
+    def search(self, vector: List[float], k: int) -> List[str]:
+        time.sleep(max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) / 1000)
+        return self.inner.search(vector, k)
+
+
+def sample_query_vectors(index: LocalVectorIndex, count: int, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    """
+    Offline stand-in for embedded queries: stored vectors with a little
+    noise, so the nearest neighbour is known but not trivially the query
+    """
+    rng = np.random.RandomState(seed)
+    rows = rng.choice(len(index), size=min(count, len(index)), replace=False)
+    vectors = np.asarray(index.vectors[np.sort(rows)], dtype=np.float32)
+    vectors = vectors + rng.normal(0, noise / np.sqrt(index.dim), vectors.shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def embed_queries(queries: List[str], embed: Callable[[str], List[float]]) -> np.ndarray:
+    return np.asarray([embed(query) for query in queries], dtype=np.float32)
+
+
+def recall_at_k(results: List[List[str]], truth: List[List[str]], k: int) -> float:
+    """Mean fraction of the exact top-k found in each result list"""
+    scores = [len(set(found[:k]) & set(expected[:k])) / len(expected[:k])
+              for found, expected in zip(results, truth) if expected]
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def benchmark_backend(backend, query_vectors: np.ndarray, truth: List[List[str]], k: int = 5,
+                      concurrency: int = 8, rounds: int = 3, warmup: int = 3) -> Dict[str, Any]:
+    """
+    Latency percentiles from a sequential pass, QPS from replaying the
+    queries rounds times across concurrency threads, and recall@k
+    against the exact results
+    """
+    vectors = [vector.tolist() for vector in query_vectors]
+    for vector in vectors[:warmup]:
+        backend.search(vector, k)
+
+    latencies, results = [], []
+    for vector in vectors:
+        start = time.perf_counter()
+        results.append(backend.search(vector, k))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    replay = vectors * rounds
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda vector: backend.search(vector, k), replay))
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "backend": backend.name,
+        "queries": len(vectors),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "qps": round(len(replay) / elapsed, 1),
+        "concurrency": concurrency,
+        f"recall@{k}": round(recall_at_k(results, truth, k), 4)
+    }
+
+
+def run_benchmark(index: LocalVectorIndex, backends: List[Any], query_vectors: np.ndarray, k: int = 5,
+                  concurrency: int = 8, rounds: int = 3) -> List[Dict[str, Any]]:
+    """Benchmark every backend on the same queries, with exact search as ground truth"""
+    exact = LocalExactBackend(index)
+    truth = exact.search_batch([vector.tolist() for vector in query_vectors], k)
+
+    reports = []
+    for backend in [exact] + backends:
+        try:
+            reports.append(benchmark_backend(backend, query_vectors, truth, k, concurrency, rounds))
+        except Exception as e:
+            logging.error(f"Benchmark failed for {backend.name}: {e}")
+            reports.append({"backend": backend.name, "error": str(e)})
+    return reports
+
+
+def print_reports(reports: List[Dict[str, Any]]):
+    print("\n=== Retrieval benchmark ===")
+    for report in reports:
+        print(json.dumps(report))
+    print("===========================")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare retrieval latency and recall across backends")
+    parser.add_argument("--collection", default="WikipediaCollection", help="Exported collection used as the corpus")
+    parser.add_argument("--index-dir", help="Directory holding the local index export")
+    parser.add_argument("--backends", nargs="+", default=["fake"], choices=["weaviate", "chroma", "fake"],
+                        help="Backends to compare against local exact search")
+    parser.add_argument("--sample-queries", type=int, default=0,
+                        help="Use N perturbed corpus vectors instead of embedding the fixed query set")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3, help="Times the query set is replayed for QPS")
+    parser.add_argument("--load", action="store_true", help="Seed the Weaviate and Chroma copies from the export first")
+    parser.add_argument("--fake-latency", type=float, default=20.0, help="Simulated round trip in ms")
+    args = parser.parse_args()
+
+    index = LocalVectorIndex(args.collection, args.index_dir)
+    bench_collection = f"{args.collection}Bench"
+    store = None
+    backends = []
+
+    if "weaviate" in args.backends or not args.sample_queries:
+        from store import WeaviateStore
+        store = WeaviateStore()
+
+    try:
+        if args.sample_queries:
+            query_vectors = sample_query_vectors(index, args.sample_queries)
+        else:
+            query_vectors = embed_queries(BENCHMARK_QUERIES, store.embed_query)
+
+        if "weaviate" in args.backends:
+            if args.load:
+                from weaviate_loader import load_export
+                load_export(store, args.collection, args.index_dir, bench_collection)
+            backends.append(WeaviateBackend(store, bench_collection if args.load else args.collection))
+        if "chroma" in args.backends:
+            from chroma import ChromaDBManager
+            chroma_backend = ChromaBackend(ChromaDBManager().chroma_client, bench_collection)
+            if args.load:
+                chroma_backend.load(index)
+            backends.append(chroma_backend)
+        if "fake" in args.backends:
+            backends.append(FakeLatencyBackend(LocalExactBackend(index), args.fake_latency))
+
+        print_reports(run_benchmark(index, backends, query_vectors, args.k, args.concurrency, args.rounds))
+    finally:
+        if store:
+            store.close()
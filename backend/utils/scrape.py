@@ -7,6 +7,7 @@ import json
 from typing import Dict, Any
 import time
 import logging
+from http_fetch import HttpFetcher, HTML_PARSER
 
 logging.basicConfig(level=logging.INFO)
 
@@ -14,34 +15,46 @@ class WebScraper:
     def __init__(self):
         self.browser = None
         self.llm = None
+        # Most pages are server-rendered, so plain HTTP is tried before a browser
+        self.http = HttpFetcher()
         
     async def initialize(self):
-        """Initialize browser and LLM instances"""
-        self.browser = await launch(
-            headless=True,
-            args=['--no-sandbox', '--disable-setuid-sandbox'],
-            ignoreHTTPSErrors=True
-        )
-        
+        """Initialize the LLM; the browser is only launched if a page needs it"""
         # Initialize Ollama with strict parameters
         self.llm = Ollama(
             model="llama3.1:latest",
             temperature=0
         )
-        print("Initialized LLM and browser")
+        print("Initialized LLM")
+
+    async def browser_html(self, url: str) -> str:
+        """Rendered HTML from headless Chromium"""
+        if not self.browser:
+            self.browser = await launch(
+                headless=True,
+                args=['--no-sandbox', '--disable-setuid-sandbox'],
+                ignoreHTTPSErrors=True
+            )
+            print("Initialized browser")
+
+        page = await self.browser.newPage()
+        try:
+            await page.goto(url, {'waitUntil': 'networkidle0', 'timeout': 30000})
+            return await page.content()
+        finally:
+            await page.close()
 
     async def cleanup(self):
         """Clean up resources"""
+        await self.http.close()
         if self.browser:
             await self.browser.close()
         print("Cleanup done")
 
-    async def extract_main_content(self, page) -> str:
+    async def extract_main_content(self, content: str) -> str:
         """Extract only the most relevant content"""
         try:
-            # Get page content
-            content = await page.content()
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = BeautifulSoup(content, HTML_PARSER)
             
             # Remove unwanted elements
             for element in soup.find_all(['nav', 'footer', 'header', 'aside', 'script', 'style']):
@@ -145,16 +158,12 @@ Text to process:
     async def scrape_url(self, url: str) -> Dict[str, Any]:
         """Main scraping function"""
         try:
-            if not self.browser:
+            if not self.llm:
                 await self.initialize()
                 
-            page = await self.browser.newPage()
-            
-            print(f"Navigating to {url}")
-            await page.goto(url, {'waitUntil': 'networkidle0', 'timeout': 30000})
-            
-            print("Extracting content...")
-            content = await self.extract_main_content(page)
+            print(f"Fetching {url}")
+            content, tier = await self.http.fetch_content(url, self.extract_main_content, self.browser_html)
+            print(f"Extracted content via {tier}")
             cleaned_content = self.clean_text(content)
             
             if not cleaned_content:
@@ -162,8 +171,6 @@ Text to process:
             
             print("Processing with LLM...")
             result = await self.process_with_llm(cleaned_content)
-            
-            await page.close()
             return result
             
         except Exception as e:
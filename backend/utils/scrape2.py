@@ -1,44 +1,45 @@
 
 import asyncio
-from pyppeteer import launch
 from bs4 import BeautifulSoup
-from openai import OpenAI
+from openai import AsyncOpenAI
 import json
 from typing import Dict, Any
 import time
 import logging
 import os
 from dotenv import load_dotenv
+from browser_pool import BrowserPool
+from http_fetch import HttpFetcher, HTML_PARSER
+from llm_extract import LLMExtractor
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
 
 class WebScraper:
-    def __init__(self):
-        self.browser = None
+    def __init__(self, pool: BrowserPool = None):
+        # Pages come from a shared pool so several URLs can be scraped at once
+        self.pool = pool or BrowserPool()
+        # Most pages are server-rendered, so plain HTTP is tried before a browser
+        self.http = HttpFetcher()
         self.api_key = os.getenv('OPENAI_API_KEY2')
-        self.client = OpenAI(api_key=self.api_key)  # Initialize OpenAI client
+        # Long pages are extracted in concurrent chunks and merged by attraction name
+        self.extractor = LLMExtractor(AsyncOpenAI(api_key=self.api_key))
         
     async def initialize(self):
-        """Initialize browser instance"""
-        self.browser = await launch(
-            headless=True,
-            args=['--no-sandbox', '--disable-setuid-sandbox'],
-            ignoreHTTPSErrors=True
-        )
-        logging.info("Initialized browser")
+        """Initialize the browser pool"""
+        await self.pool.start()
+        logging.info("Initialized browser pool")
 
     async def cleanup(self):
         """Clean up resources"""
-        if self.browser:
-            await self.browser.close()
+        await self.http.close()
+        await self.pool.close()
         logging.info("Cleanup complete")
 
-    async def extract_main_content(self, page) -> str:
+    async def extract_main_content(self, content: str) -> str:
         """Extract the entire body content, remove CSS and tags, and clean the text."""
         try:
-            content = await page.content()  # Get the full HTML content of the page
-            soup = BeautifulSoup(content, 'html.parser')  # Parse the HTML with BeautifulSoup
+            soup = BeautifulSoup(content, HTML_PARSER)  # Parse the HTML with BeautifulSoup
             
             # Remove unwanted tags like style, script, and other non-content elements
             for element in soup.find_all(['style', 'script', 'header', 'footer', 'nav', 'aside']):
@@ -61,48 +62,28 @@ class WebScraper:
             return ""
 
     async def process_with_llm(self, text: str, url: str) -> Dict[str, Any]:
-        """Process text with GPT-3.5 to extract locations and format content"""
-        prompt = f"""
-        Analyze the following text about a tourist attraction in Singapore. Extract and format the following details:
-        1. Main attractions or landmarks mentioned
-        2. Location details (specific area, neighborhood, street)
-        3. Any historical or cultural significance
-        4. Type of attraction (e.g., mural, statue, temple, etc.)
-
-        Text: {text}
-
-        Format the response as a JSON object with these exact fields:
-        {{
-            "text": "<cleaned, well-formatted description>",
-            "metadata": {{
-                "source_url": "{url}",
-                "name": "<main attraction name>",
-                "locations": "<specific location in Singapore>",
-                "attraction_type": "<type of attraction>",
-                "content_type": "tourist_attraction",
-                "last_verified": "<current date>"
-            }}
-        }}
-
-        Make sure to preserve all specific details about the attraction while removing any navigation text or irrelevant content.
-        """
+        """Extract attractions chunk by chunk and fold them into one document for the URL"""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1500,
-                temperature=0,
-                top_p=1.0
-            )
+            attractions = await self.extractor.extract(text, url)
 
-            result = response.choices[0].message.content.strip()
-            
-            try:
-                result_json = json.loads(result)
-                if "text" in result_json and "metadata" in result_json:
-                    return result_json
-            except json.JSONDecodeError:
-                logging.warning("Failed to parse LLM response as JSON")
+            if attractions:
+                primary = attractions[0]["metadata"]
+                locations = list(dict.fromkeys(a["metadata"]["location"] for a in attractions if a["metadata"]["location"]))
+                if len(attractions) == 1:
+                    combined_text = attractions[0]["text"]
+                else:
+                    combined_text = "\n\n".join(f"{a['metadata']['name']}: {a['text']}" for a in attractions)
+                return {
+                    "text": combined_text,
+                    "metadata": {
+                        "source_url": url,
+                        "name": primary["name"],
+                        "locations": ", ".join(locations),
+                        "attraction_type": primary["attraction_type"],
+                        "content_type": "tourist_attraction",
+                        "last_verified": time.strftime("%Y-%m-%d")
+                    }
+                }
 
             return {
                 "text": text,
@@ -123,17 +104,10 @@ class WebScraper:
     async def scrape_url(self, url: str) -> Dict[str, Any]:
         """Main scraping function"""
         try:
-            if not self.browser:
-                await self.initialize()
-                
-            page = await self.browser.newPage()
-            
             start_time = time.time()
-            logging.info(f"Navigating to {url}")
-            await page.goto(url, {'waitUntil': 'networkidle0', 'timeout': 30000})
-            
-            logging.info("Extracting content...")
-            content = await self.extract_main_content(page)
+            logging.info(f"Fetching {url}")
+            content, tier = await self.http.fetch_content(url, self.extract_main_content, self.pool.fetch_html)
+            logging.info(f"Extracted content via {tier}")
             
             if not content:
                 return {"error": "No content extracted"}
@@ -141,8 +115,6 @@ class WebScraper:
             logging.info("Processing with LLM...")
             result = await self.process_with_llm(content, url)
             
-            await page.close()
-            
             total_time = time.time() - start_time
             logging.info(f"Total scraping time: {total_time:.2f} seconds")
             
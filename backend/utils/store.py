@@ -1,9 +1,11 @@
 import weaviate
 from weaviate.classes.init import Auth
 from weaviate.classes.config import Configure
-from typing import Dict, List, Any
+from weaviate.util import generate_uuid5
+from typing import Dict, List, Any, Optional
 import logging
 import os
+import asyncio
 from datetime import datetime
 import requests
 import json
@@ -12,6 +14,33 @@ from contextlib import asynccontextmanager
 
 load_dotenv()
 import openai
+from config import get_embedding_settings
+
+# Collections holding the canonical (OpenAI-embedded) corpus
+COLLECTION_NAMES = ["WikipediaCollection", "SingaporeAttraction"]
+
+
+def document_properties(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Weaviate properties for a {"text", "metadata"} document, with schema defaults"""
+    metadata = doc.get("metadata") or {}
+    properties = {
+        "text": doc.get("text", ""),
+        "place_id": metadata.get("place_id", ""),
+        "name": metadata.get("name", ""),
+        "category": metadata.get("category", "tourist_attraction"),
+        "source": metadata.get("source", "wikipedia"),
+        "fact_type": metadata.get("fact_type", "historical"),
+        "last_verified": metadata.get("last_verified", datetime.now().isoformat()),
+        "source_url": metadata.get("source_url", ""),
+        "has_scrape_content": metadata.get("has_scrape_content", True),
+        "location": metadata.get("location", ""),
+        "attraction_type": metadata.get("attraction_type", "")
+    }
+    # Coordinates are optional; only documents tied to a place have them
+    for key in ("lat", "lng"):
+        if metadata.get(key) is not None:
+            properties[key] = metadata[key]
+    return properties
 
 class WeaviateStore:
 
@@ -23,6 +52,9 @@ class WeaviateStore:
             auth_credentials=Auth.api_key(self.weaviate_api_key),
             headers={"X-OpenAI-Api-Key": os.getenv("OPENAI_API_KEY")}
         )
+        settings = get_embedding_settings()
+        self.embedding_backend = settings["backend"]
+        self.local_suffix = settings["local_collection_suffix"]
 
 
     ## ASYNC CODE
@@ -66,7 +98,7 @@ class WeaviateStore:
     #         finally:
     #             self.client = None
 
-    def _ensure_collections(self):
+    def _ensure_collections(self, collection_names: Optional[List[str]] = None):
         """Create collections if they don't exist"""
         collection_schema = {
             "properties": [
@@ -80,7 +112,9 @@ class WeaviateStore:
                 {"name": "source_url", "dataType": ["text"]},
                 {"name": "has_scrape_content", "dataType": ["boolean"]},
                 {"name": "location", "dataType": ["text"]},
-                {"name": "attraction_type", "dataType": ["text"]}
+                {"name": "attraction_type", "dataType": ["text"]},
+                {"name": "lat", "dataType": ["number"]},
+                {"name": "lng", "dataType": ["number"]}
             ],
             "vectorIndexConfig": {
                 "distance": "cosine"
@@ -88,14 +122,13 @@ class WeaviateStore:
             "vectorizer": "none"
         }
 
-        for collection_name in ["WikipediaCollection", "SingaporeAttraction"]:
-            try:
-                schema = collection_schema.copy()
-                schema["class"] = collection_name
-                collection = self.client.collections.get(collection_name)
+        for collection_name in collection_names or [self.collection_name_for(name) for name in COLLECTION_NAMES]:
+            schema = collection_schema.copy()
+            schema["class"] = collection_name
+            if self.client.collections.exists(collection_name):
                 logging.info(f"Collection '{collection_name}' already exists.")
-            except weaviate.exceptions.WeaviateCollectionNotFoundException:
-                self.client.collections.create(schema)
+            else:
+                self.client.collections.create_from_dict(schema)
                 logging.info(f"Collection '{collection_name}' created successfully.")
 
     async def connect(self):
@@ -103,17 +136,30 @@ class WeaviateStore:
         await self.client.connect()
         await self._ensure_collections()
 
+    def collection_name_for(self, collection_name: str) -> str:
+        """Collection to query for the active embedding backend"""
+        if self.embedding_backend == "local" and not collection_name.endswith(self.local_suffix):
+            return f"{collection_name}{self.local_suffix}"
+        return collection_name
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the active backend"""
+        if self.embedding_backend == "local":
+            from utils.local_embedding import get_query_model
+            return [float(x) for x in get_query_model()([query])[0]]
+
+        response = openai.embeddings.create(
+            model="text-embedding-ada-002",
+            input=query
+        )
+        return response.data[0].embedding
+
     def search_hybrid(self, collection_name: str, query: str, alpha: float = 0.5, limit: int = 5):
         """Simple hybrid search"""
         try:
-            # Generate embedding
-            response = openai.embeddings.create(
-                model="text-embedding-ada-002",
-                input=query
-            )
-            query_vector = response.data[0].embedding
-            
-            collection = self.client.collections.get(collection_name)
+            query_vector = self.embed_query(query)
+
+            collection = self.client.collections.get(self.collection_name_for(collection_name))
             return collection.query.hybrid(
                 query=query,
                 vector=query_vector,
@@ -192,41 +238,76 @@ class WeaviateStore:
             if self.client:
                 await self.close()
 
-    def store_documents(self, collection_name: str, documents: List[Dict[str, Any]], embeddings_list: List[List[float]]) -> List[str]:
-        """Store documents with their embeddings"""
+    def store_documents(self, collection_name: str, documents: List[Dict[str, Any]], embeddings_list: Optional[List[List[float]]] = None,
+                        pipeline=None) -> List[str]:
+        """Store documents with their embeddings, embedding them in bulk when none are given"""
+        if embeddings_list is None:
+            if collection_name.endswith(self.local_suffix):
+                from utils.local_embedding import LocalEmbeddingEngine
+                pipeline = pipeline or LocalEmbeddingEngine()
+                embeddings_list = pipeline.embed([doc.get("text", "") for doc in documents])
+            else:
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    from utils.embedding_pipeline import EmbeddingPipeline
+                    pipeline = pipeline or EmbeddingPipeline()
+                    embeddings_list = asyncio.run(pipeline.embed_documents(documents))
+                else:
+                    raise RuntimeError("store_documents can't embed inside a running event loop; "
+                                       "await store_documents_async instead")
+
+        return self._write_documents(collection_name, documents, embeddings_list)
+
+    async def store_documents_async(self, collection_name: str, documents: List[Dict[str, Any]],
+                                    embeddings_list: Optional[List[List[float]]] = None, pipeline=None) -> List[str]:
+        """store_documents for callers already in an event loop (FastAPI, IngestPipeline)"""
+        if embeddings_list is None:
+            if collection_name.endswith(self.local_suffix):
+                from utils.local_embedding import LocalEmbeddingEngine
+                pipeline = pipeline or LocalEmbeddingEngine()
+                embeddings_list = await asyncio.to_thread(pipeline.embed, [doc.get("text", "") for doc in documents])
+            else:
+                from utils.embedding_pipeline import EmbeddingPipeline
+                pipeline = pipeline or EmbeddingPipeline()
+                embeddings_list = await pipeline.embed_documents(documents)
+
+        # The Weaviate batch client is synchronous, so keep it off the event loop
+        return await asyncio.to_thread(self._write_documents, collection_name, documents, embeddings_list)
+
+    def _write_documents(self, collection_name: str, documents: List[Dict[str, Any]],
+                         embeddings_list: List[List[float]]) -> List[str]:
         try:
             document_ids = []
 
             with self.client.batch.dynamic() as batch:
                 for doc, embedding in zip(documents, embeddings_list):
-                    # Keep the original metadata structure
-                    properties = {
-                        "text": doc.get("text", ""),
-                        "place_id": doc.get("metadata", {}).get("place_id", ""),
-                        "name": doc.get("metadata", {}).get("name", ""),
-                        "category": doc.get("metadata", {}).get("category", "tourist_attraction"),
-                        "source": doc.get("metadata", {}).get("source", "wikipedia"),
-                        "fact_type": doc.get("metadata", {}).get("fact_type", "historical"),
-                        "last_verified": doc.get("metadata", {}).get("last_verified", datetime.now().isoformat()),
-                        "source_url": doc.get("metadata", {}).get("source_url", ""),
-                        "has_scrape_content": doc.get("metadata", {}).get("has_scrape_content", True),
-                        "location": doc.get("metadata", {}).get("location", ""),
-                        "attraction_type": doc.get("metadata", {}).get("attraction_type", "")
-                    }
-
-                    result = batch.add_object(
+                    properties = document_properties(doc)
+                    # Deterministic ids make re-running a load idempotent
+                    object_id = generate_uuid5({"text": properties["text"], "source_url": properties["source_url"],
+                                                "place_id": properties["place_id"]})
+                    batch.add_object(
                         properties=properties,
                         collection=collection_name,
-                        vector=embedding
+                        vector=embedding,
+                        uuid=object_id
                     )
-                    document_ids.append(result)
+                    document_ids.append(object_id)
 
-            logging.info(f"Successfully stored {len(documents)} documents in {collection_name}")
+            failed = self.client.batch.failed_objects
+            if failed:
+                failed_ids = {str(obj.object_.uuid) for obj in failed}
+                for obj in failed[:10]:
+                    logging.error(f"Failed to store {obj.object_.uuid} in {collection_name}: {obj.message}")
+                document_ids = [object_id for object_id in document_ids if str(object_id) not in failed_ids]
+
+            logging.info(f"Stored {len(document_ids)} of {len(documents)} documents in {collection_name}")
             return document_ids
 
         except Exception as e:
             logging.error(f"Error storing documents in batch: {e}")
             raise
+
     def search_similar(self, collection_name: str, query: str, limit: int = 5) -> dict:
         """Search for similar documents using vector similarity"""
         try:
@@ -313,7 +394,9 @@ class WeaviateStore:
                         "source_url": obj.properties.get("source_url", ""),
                         "has_scrape_content": obj.properties.get("has_scrape_content", True),
                         "location": obj.properties.get("location", ""),
-                        "attraction_type": obj.properties.get("attraction_type", "")
+                        "attraction_type": obj.properties.get("attraction_type", ""),
+                        "lat": obj.properties.get("lat"),
+                        "lng": obj.properties.get("lng")
                     }
                 }
                 documents.append(doc)
@@ -0,0 +1,34 @@
+import re
+from typing import Dict, List
+
+# Section headings written by WikipediaDataCollector.create_document_structure
+DOCUMENT_SECTIONS = ["Summary", "History", "Description"]
+
+_SECTION_HEADING = re.compile(r"^(%s):\s*$" % "|".join(DOCUMENT_SECTIONS), re.MULTILINE)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。])\s+(?=[\"'(\[A-Z0-9一-鿿])")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation"""
+    text = " ".join(text.split())
+    if not text:
+        return []
+    return [s for s in _SENTENCE_BOUNDARY.split(text) if s]
+
+
+def parse_sections(text: str) -> Dict[str, str]:
+    """
+    Split a "Summary:/History:/Description:" document back into its sections.
+    Text without those headings is returned as a single Summary section.
+    """
+    matches = list(_SECTION_HEADING.finditer(text))
+    if not matches:
+        return {"Summary": text.strip()} if text.strip() else {}
+
+    sections = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if body:
+            sections[match.group(1)] = body
+    return sections
@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+import numpy as np
+from weaviate.classes.data import DataObject
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_local_index_settings
+from utils.local_index import METADATA_COLUMNS, NUMERIC_COLUMNS, index_paths, load_metadata
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _date_value(value: str) -> Optional[datetime]:
+    """Exported dates are ISO strings, sometimes without a timezone; Weaviate needs RFC 3339"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def iter_export(index_dir: str, collection_name: str) -> Iterator[Tuple[str, Dict[str, Any], List[float]]]:
+    """(uuid, properties, vector) for every row of a local index export"""
+    sidecar = load_metadata(index_dir, collection_name)
+    vectors = np.load(index_paths(index_dir, collection_name)["vectors"], mmap_mode="r")
+    columns = sidecar["columns"]
+
+    for row in range(sidecar["count"]):
+        properties = {}
+        for name in METADATA_COLUMNS[1:]:
+            value = columns[name][row]
+            if value is None or (value == "" and name in NUMERIC_COLUMNS):
+                continue
+            if name == "last_verified":
+                value = _date_value(value) if value else None
+                if value is None:
+                    continue
+            properties[name] = value
+        yield columns["uuid"][row], properties, vectors[row].astype(np.float32).tolist()
+
+
+class BulkLoader:
+    """
+    Loads a local index export into a Weaviate collection. Batches grow or
+    shrink to keep each insert near target_latency, per-object errors are
+    collected instead of disappearing inside a dynamic batch, and loaded
+    uuids are checkpointed so an interrupted load resumes where it stopped.
+    Objects keep their exported uuids, so a repeated load overwrites
+    rather than duplicates.
+    """
+
+    def __init__(self, store, collection_name: str, target_latency: float = 1.0, initial_batch: int = 100,
+                 min_batch: int = 10, max_batch: int = 2000, max_retries: int = 3,
+                 checkpoint_path: Optional[str] = None):
+        self.store = store
+        self.collection_name = collection_name
+        self.collection = store.client.collections.get(collection_name)
+        self.target_latency = target_latency
+        self.batch_size = initial_batch
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.checkpoint_path = checkpoint_path or os.path.join(
+            get_local_index_settings()["index_dir"], f"{collection_name}.load_checkpoint"
+        )
+        self.loaded = self._read_checkpoint()
+        self.errors: List[Dict[str, str]] = []
+
+    def _read_checkpoint(self) -> set:
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _checkpoint(self, uuids: List[str]):
+        # Append-only, so a crash loses at most the batch in flight
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{uuid}\n" for uuid in uuids))
+
+    def reset_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        self.loaded = set()
+
+    def _adapt(self, latency: float):
+        if latency > self.target_latency:
+            self.batch_size = max(self.min_batch, int(self.batch_size / 2))
+        elif latency < self.target_latency / 2:
+            self.batch_size = min(self.max_batch, int(self.batch_size * 1.5))
+
+    def _insert(self, batch: List[Tuple[str, Dict[str, Any], List[float]]]) -> int:
+        """Insert one batch, halving it on transport errors; returns objects written"""
+        for attempt in range(self.max_retries):
+            start = time.perf_counter()
+            try:
+                result = self.collection.data.insert_many([
+                    DataObject(properties=properties, uuid=uuid, vector=vector)
+                    for uuid, properties, vector in batch
+                ])
+            except Exception as e:
+                logging.warning(f"Batch of {len(batch)} failed ({e}), attempt {attempt + 1}/{self.max_retries}")
+                self.batch_size = max(self.min_batch, int(self.batch_size / 2))
+                time.sleep(2 ** attempt)
+                continue
+
+            self._adapt(time.perf_counter() - start)
+            failed = set()
+            for index, error in (result.errors or {}).items():
+                failed.add(index)
+                self.errors.append({"uuid": batch[index][0], "message": error.message})
+            written = [uuid for index, (uuid, _, _) in enumerate(batch) if index not in failed]
+            self._checkpoint(written)
+            self.loaded.update(written)
+            return len(written)
+
+        for uuid, _, _ in batch:
+            self.errors.append({"uuid": uuid, "message": "batch failed after retries"})
+        return 0
+
+    def load(self, rows: Iterator[Tuple[str, Dict[str, Any], List[float]]]) -> Dict[str, Any]:
+        """Upload rows not in the checkpoint and return a load report"""
+        start = time.perf_counter()
+        written = skipped = batches = 0
+        pending: List[Tuple[str, Dict[str, Any], List[float]]] = []
+
+        for row in rows:
+            if row[0] in self.loaded:
+                skipped += 1
+                continue
+            pending.append(row)
+            if len(pending) >= self.batch_size:
+                written += self._insert(pending)
+                batches += 1
+                pending = []
+                elapsed = time.perf_counter() - start
+                logging.info(f"{written} objects loaded, {written / elapsed:.0f} objects/sec, batch size {self.batch_size}")
+        if pending:
+            written += self._insert(pending)
+            batches += 1
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        report = {
+            "collection": self.collection_name,
+            "written": written,
+            "skipped": skipped,
+            "failed": len(self.errors),
+            "batches": batches,
+            "final_batch_size": self.batch_size,
+            "seconds": round(elapsed, 2),
+            "objects_per_sec": round(written / elapsed, 1)
+        }
+        for error in self.errors[:10]:
+            logging.error(f"Failed to load {error['uuid']}: {error['message']}")
+        logging.info(f"Load report: {report}")
+        return report
+
+    def verify(self, expected: int) -> bool:
+        """Compare the collection's object count with the export"""
+        count = self.collection.aggregate.over_all(total_count=True).total_count
+        if count != expected:
+            logging.warning(f"{self.collection_name} has {count} objects, expected {expected}")
+            return False
+        logging.info(f"Verified {self.collection_name}: {count} objects")
+        return True
+
+
+def load_export(store, collection_name: str, index_dir: Optional[str] = None,
+                target_collection: Optional[str] = None, restart: bool = False, **loader_args) -> Dict[str, Any]:
+    """Seed target_collection (default: same name) from the local index export of collection_name"""
+    index_dir = index_dir or get_local_index_settings()["index_dir"]
+    target_collection = target_collection or collection_name
+    store._ensure_collections([target_collection])
+
+    loader = BulkLoader(store, target_collection, **loader_args)
+    if restart:
+        loader.reset_checkpoint()
+    report = loader.load(iter_export(index_dir, collection_name))
+
+    if loader.errors:
+        errors_path = os.path.join(index_dir, f"{target_collection}.load_errors.jsonl")
+        with open(errors_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(error) + "\n" for error in loader.errors))
+        logging.info(f"Wrote {len(loader.errors)} errors to {errors_path}")
+
+    report["verified"] = loader.verify(load_metadata(index_dir, collection_name)["count"])
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from store import WeaviateStore, COLLECTION_NAMES
+
+    parser = argparse.ArgumentParser(description="Bulk load local index exports into Weaviate")
+    parser.add_argument("--collections", nargs="+", default=COLLECTION_NAMES, help="Exported collections to load")
+    parser.add_argument("--index-dir", help="Directory holding the exports")
+    parser.add_argument("--target-suffix", default="", help="Load into <collection><suffix> instead")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and load everything")
+    parser.add_argument("--target-latency", type=float, default=1.0, help="Seconds per batch to aim for")
+    args = parser.parse_args()
+
+    store = WeaviateStore()
+    try:
+        for name in args.collections:
+            print(json.dumps(load_export(
+                store, name, args.index_dir, f"{name}{args.target_suffix}",
+                restart=args.restart, target_latency=args.target_latency
+            ), indent=2))
+    finally:
+        store.close()
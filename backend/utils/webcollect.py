@@ -1,71 +1,171 @@
 import os
-import time
-from typing import List, Dict
+import hashlib
+from functools import partial
+from typing import Callable, List, Dict, Optional
 import chromadb
 from chromadb.utils import embedding_functions
 import logging
 from datetime import datetime
 import asyncio
 from scrape2 import WebScraper
+from browser_pool import BrowserPool
+from ingest_pipeline import IngestPipeline, Stage
+from incremental_sync import plan_sync, apply_sync, print_plan
+from local_embedding import LocalEmbeddingEngine
+from dedup import NearDuplicateIndex, collapse_near_duplicates
+from job_ledger import JobLedger
+from hnsw_sweep import load_hnsw_metadata
 import json  # To handle conversion of lists into a string
 
 logging.basicConfig(level=logging.INFO)
 
+def document_id(url: str) -> str:
+    """Stable id for the document scraped from a URL"""
+    return f"doc_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}"
+
+
 class WebContentCollector:
-    def __init__(self):
+    def __init__(self, full_rebuild: bool = False, dry_run: bool = False, retry_failed: bool = False):
         """Initialize the collector with ChromaDB setup"""
         self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
         self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
-
-        # Delete the existing collection if it exists
-        try:
-            self.chroma_client.delete_collection("singapore_attractions")
-            logging.info("Deleted existing collection 'singapore_attractions'")
-        except:
-            logging.info("No existing collection 'singapore_attractions' to delete.")
-
-        # Create new collection
-        self.collection = self.chroma_client.create_collection(
+        self.embedder = LocalEmbeddingEngine()
+        # Shared across batches so overlapping scrapes collapse for the whole run
+        self.dedup_index = NearDuplicateIndex()
+        self.dry_run = dry_run
+
+        # Per-URL progress survives crashes; a rerun resumes where it stopped
+        self.ledger = JobLedger("web_urls", path=":memory:" if dry_run else None)
+        if full_rebuild and not dry_run:
+            self.ledger.reset()
+        if retry_failed:
+            self.ledger.retry_failed()
+
+        # Only drop the collection on an explicit full rebuild; normal runs sync incrementally
+        if full_rebuild and not dry_run:
+            try:
+                self.chroma_client.delete_collection("singapore_attractions")
+                logging.info("Deleted existing collection 'singapore_attractions'")
+            except:
+                logging.info("No existing collection 'singapore_attractions' to delete.")
+
+        self.collection = self.chroma_client.get_or_create_collection(
             name="singapore_attractions",
-            metadata={"description": "Tourist attractions content from web scraping"},
+            metadata={"description": "Tourist attractions content from web scraping", **load_hnsw_metadata()},
             embedding_function=self.embedding_function
         )
-        logging.info("Created new collection 'singapore_attractions'")
-
-    async def process_urls(self, urls: List[str]):
-        """Process a list of URLs and store their content"""
-        scraper = WebScraper()
+        logging.info("Opened collection 'singapore_attractions'")
+
+    def _fail_urls(self, stage: str, urls: Callable[[Dict], List[str]]) -> Callable[[Dict, Exception], None]:
+        """Stage error handler that fails the item's URLs in the ledger instead of leaving them claimed"""
+        def on_error(item: Dict, error: Exception):
+            for url in urls(item):
+                self.ledger.fail(url, f"{stage}: {error}")
+        return on_error
+
+    async def _fetch(self, scraper: WebScraper, item: Dict) -> Dict:
+        """Fetch stage: plain HTTP only, so it never waits on Chromium"""
+        item["html"] = await scraper.http.fetch(item["url"])
+        self.ledger.mark_stage(item["url"], "fetched")
+        return item
+
+    async def _clean(self, scraper: WebScraper, item: Dict) -> Optional[Dict]:
+        """Clean stage: extract the page text, rendering JS-only pages in the browser pool"""
+        url = item["url"]
+        text = await scraper.extract_main_content(item.pop("html")) if item.get("html") else ""
+        if not text:
+            try:
+                text = await scraper.extract_main_content(await scraper.pool.fetch_html(url))
+            except Exception as e:
+                logging.error(f"Error processing {url}: {e}")
+                self.ledger.fail(url, str(e))
+                return None
+        if not text:
+            logging.error(f"Error processing {url}: No content extracted")
+            self.ledger.fail(url, "No content extracted")
+            return None
+        self.ledger.mark_stage(url, "cleaned")
+        item["text"] = text
+        return item
+
+    async def _extract(self, scraper: WebScraper, item: Dict) -> Optional[Dict]:
+        """LLM stage: structure the page into a document"""
+        url = item["url"]
+        result = await scraper.process_with_llm(item["text"], url)
+        if "error" in result:
+            logging.error(f"Error processing {url}: {result['error']}")
+            self.ledger.fail(url, result["error"])
+            return None
+        self.ledger.mark_stage(url, "extracted")
+
+        # Convert metadata list to a comma-separated string or a JSON string
+        metadata = result["metadata"]
+        if isinstance(metadata.get("locations"), list):  # Check if 'locations' is a list
+            metadata["locations"] = ', '.join(metadata["locations"])  # Convert to string
+        return {"id": document_id(url), "text": result["text"], "metadata": metadata}
+
+    async def _embed(self, documents: List[Dict]) -> List[Dict]:
+        """Embed stage: diff a batch against the collection and embed only new or changed documents"""
+        urls = [doc["metadata"]["source_url"] for doc in documents]
+        where = {"source_url": {"$in": urls}}
+        # Stored copies of collapsed duplicates fall under `where`, so they get deleted
+        documents, _ = collapse_near_duplicates(documents, self.dedup_index)
+        plan = await asyncio.to_thread(plan_sync, self.collection, documents, where)
+        if not self.dry_run:
+            await asyncio.to_thread(self.embedder.embed_documents, plan["added"] + plan["changed"])
+        return [{"plan": plan, "urls": urls}]
+
+    async def _store(self, batch: Dict) -> Dict:
+        """Store stage: one bulk upsert per batch"""
+        plan = batch["plan"]
+        if self.dry_run:
+            print_plan("singapore_attractions", plan)
+        else:
+            await asyncio.to_thread(apply_sync, self.collection, plan)
+        for url in batch["urls"]:
+            self.ledger.complete(url, "stored")
+        return plan
+
+    async def process_urls(self, urls: List[str], browsers: int = 2, pages_per_browser: int = 4,
+                           per_host: int = 2, llm_workers: int = 4, batch_size: int = 32, claim_size: int = 200):
+        """
+        Process a list of URLs through the staged pipeline and store their
+        content. URLs are claimed from the job ledger, so an interrupted run
+        resumes with the URLs it had not stored yet.
+        """
+        pool = BrowserPool(browsers=browsers, pages_per_browser=pages_per_browser, per_host=per_host)
+        scraper = WebScraper(pool)
+        self.ledger.open_run({url: {"url": url} for url in urls}, final_stage="stored")
 
         try:
-            for url in urls:
-                try:
-                    logging.info(f"Processing {url}")
-                    result = await scraper.scrape_url(url)
-
-                    if "error" in result:
-                        logging.error(f"Error processing {url}: {result['error']}")
-                        continue
-
-                    # Convert metadata list to a comma-separated string or a JSON string
-                    metadata = result["metadata"]
-                    if isinstance(metadata.get("locations"), list):  # Check if 'locations' is a list
-                        metadata["locations"] = ', '.join(metadata["locations"])  # Convert to string
-
-                    # Store in ChromaDB
-                    self.collection.add(
-                        documents=[result["text"]],
-                        metadatas=[metadata],
-                        ids=[f"doc_{int(time.time())}_{hash(url) % 10000}"]
-                    )
-
-                    logging.info(f"Successfully stored content from {url}")
-
-                except Exception as e:
-                    logging.error(f"Error processing {url}: {e}")
-                    continue
-
+            while True:
+                claimed = self.ledger.claim(claim_size)
+                if not claimed:
+                    break
+                item_url = lambda item: [item["url"]]
+                pipeline = IngestPipeline([
+                    Stage("fetch", partial(self._fetch, scraper), workers=8, queue_size=len(claimed),
+                          on_error=self._fail_urls("fetch", item_url)),
+                    Stage("clean", partial(self._clean, scraper), workers=pool.capacity, queue_size=16,
+                          on_error=self._fail_urls("clean", item_url)),
+                    Stage("llm_extract", partial(self._extract, scraper), workers=llm_workers, queue_size=16,
+                          on_error=self._fail_urls("llm_extract", item_url)),
+                    Stage("embed", self._embed, workers=1, queue_size=batch_size * 2, batch_size=batch_size,
+                          on_error=self._fail_urls("embed", lambda doc: [doc["metadata"]["source_url"]])),
+                    Stage("store", self._store, workers=1, queue_size=4,
+                          on_error=self._fail_urls("store", lambda batch: batch["urls"]))
+                ])
+                plans = await pipeline.run([item for _, item in claimed])
+                stored = sum(len(plan["added"]) + len(plan["changed"]) for plan in plans)
+                logging.info(f"Stored {stored} new or changed documents from {len(claimed)} URLs")
+                pipeline.print_metrics()
+
+            failures = self.ledger.failures()
+            if failures:
+                logging.warning(f"{len(failures)} URLs failed; rerun with --retry-failed to retry them")
         finally:
             await scraper.cleanup()
+            self.embedder.close()
 
 
 async def main():
@@ -76,8 +176,21 @@ async def main():
         # Add more URLs here
     ]
 
-    collector = WebContentCollector()
-    await collector.process_urls(urls)
+    import argparse
+    parser = argparse.ArgumentParser(description="Scrape attraction pages into ChromaDB")
+    parser.add_argument("--dry-run", action="store_true", help="Print the sync diff without writing")
+    parser.add_argument("--full-rebuild", action="store_true", help="Drop the collection and re-embed everything")
+    parser.add_argument("--browsers", type=int, default=2, help="Headless browsers in the pool")
+    parser.add_argument("--pages", type=int, default=4, help="Concurrent pages per browser")
+    parser.add_argument("--per-host", type=int, default=2, help="Maximum concurrent pages per site")
+    parser.add_argument("--llm-workers", type=int, default=4, help="Concurrent LLM extractions")
+    parser.add_argument("--batch-size", type=int, default=32, help="Documents per embed/store batch")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry URLs that failed in earlier runs")
+    args = parser.parse_args()
+
+    collector = WebContentCollector(full_rebuild=args.full_rebuild, dry_run=args.dry_run,
+                                    retry_failed=args.retry_failed)
+    await collector.process_urls(urls, args.browsers, args.pages, args.per_host, args.llm_workers, args.batch_size)
 
 if __name__ == "__main__":
     asyncio.run(main())
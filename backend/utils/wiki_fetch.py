@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import asyncio
+import hashlib
+import logging
+import urllib.parse
+from typing import Dict, List, Any, Optional
+
+import httpx
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import get_ingestion_settings
+from utils.rate_limit import AsyncRateLimiter
+
+logging.basicConfig(level=logging.INFO)
+
+# MediaWiki only returns intro extracts for up to 20 pages per request
+MAX_TITLES_PER_REQUEST = 20
+
+
+def title_from_url(url: str) -> str:
+    """Turn a Wikipedia article URL into its page title"""
+    return urllib.parse.unquote(url.split("/")[-1].replace("_", " "))
+
+
+def build_wiki_content(summary: str, text: str, url: str) -> Dict[str, str]:
+    """Pick the history and description sections out of a page's full text"""
+    content = {
+        "summary": summary,
+        "history": "",
+        "description": "",
+        "url": url
+    }
+
+    # Parse full text to find relevant sections
+    for section in text.split('\n\n'):
+        lower_section = section.lower()
+        if any(keyword in lower_section for keyword in ["history", "background", "established"]):
+            content["history"] += section + "\n"
+        elif any(keyword in lower_section for keyword in ["description", "architecture", "features"]):
+            content["description"] += section + "\n"
+
+    return content
+
+
+class WikiFetcher:
+    """
+    Batched, concurrent MediaWiki client. Titles are resolved (with redirects
+    and intro extracts) many per request, full page texts are fetched
+    concurrently, and every response is cached on disk.
+    """
+
+    def __init__(self, api_url: Optional[str] = None, cache_dir: Optional[str] = None,
+                 max_concurrency: int = 4, requests_per_second: float = 5.0,
+                 user_agent: str = 'SingaporeTourGuideBot/1.0', max_retries: int = 3,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        settings = get_ingestion_settings()
+        self.api_url = api_url or settings["wiki_api_url"]
+        self.cache_dir = os.path.join(cache_dir or settings["cache_dir"], "wikipedia")
+        self.user_agent = user_agent
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        # Lets tests point the fetcher at a fake wiki (httpx.MockTransport)
+        self.transport = transport
+        self.cache_hits = 0
+        self.requests_made = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_path(self, params: Dict[str, Any]) -> str:
+        key = json.dumps([self.api_url, sorted(params.items())], ensure_ascii=False)
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    async def _get(self, client: httpx.AsyncClient, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET the API with caching, rate limiting and retry on 429/5xx"""
+        params = {**params, "format": "json", "formatversion": 2}
+        cache_path = self._cache_path(params)
+        if os.path.exists(cache_path):
+            self.cache_hits += 1
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        for attempt in range(self.max_retries):
+            async with self._semaphore:
+                await self._limiter.wait()
+                try:
+                    self.requests_made += 1
+                    response = await client.get(self.api_url, params=params)
+                    if response.status_code == 429 or response.status_code >= 500:
+                        raise httpx.HTTPStatusError("Retryable status", request=response.request, response=response)
+                    response.raise_for_status()
+                    data = response.json()
+                    break
+                except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                    if attempt == self.max_retries - 1:
+                        raise
+                    logging.warning(f"Wikipedia request failed ({e}), retrying")
+            await asyncio.sleep(2 ** attempt)
+
+        with open(cache_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(cache_path + ".tmp", cache_path)
+        return data
+
+    async def _resolve_batch(self, client: httpx.AsyncClient, titles: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Resolve up to MAX_TITLES_PER_REQUEST titles with one request"""
+        data = await self._get(client, {
+            "action": "query",
+            "titles": "|".join(titles),
+            "prop": "extracts|info",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": "max",
+            "inprop": "url",
+            "redirects": 1
+        })
+        query = data.get("query", {})
+
+        # Follow normalisation and redirects back to the requested titles
+        mapping = {title: title for title in titles}
+        for step in query.get("normalized", []) + query.get("redirects", []):
+            for original, current in mapping.items():
+                if current == step["from"]:
+                    mapping[original] = step["to"]
+
+        pages = {page["title"]: page for page in query.get("pages", [])}
+        resolved = {}
+        for original, final in mapping.items():
+            page = pages.get(final)
+            if page and not page.get("missing") and not page.get("invalid"):
+                resolved[original] = {
+                    "title": page["title"],
+                    "summary": page.get("extract", ""),
+                    "url": page.get("fullurl", "")
+                }
+        return resolved
+
+    async def _search(self, client: httpx.AsyncClient, title: str) -> Optional[str]:
+        """Fallback search for a title that does not exist, like wikipediaapi's search"""
+        data = await self._get(client, {"action": "query", "list": "search", "srsearch": title, "srlimit": 1})
+        results = data.get("query", {}).get("search", [])
+        return results[0]["title"] if results else None
+
+    async def _full_text(self, client: httpx.AsyncClient, title: str) -> str:
+        # Full-page extracts are limited to one page per request
+        data = await self._get(client, {"action": "query", "titles": title, "prop": "extracts", "explaintext": 1})
+        pages = data.get("query", {}).get("pages", [])
+        return pages[0].get("extract", "") if pages else ""
+
+    async def fetch_pages(self, urls: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """Fetch Wikipedia content for many article URLs, keyed by URL"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._limiter = AsyncRateLimiter(self.requests_per_second)
+
+        valid_urls = [url for url in dict.fromkeys(urls) if url and url != "N/A"]
+        titles = {url: title_from_url(url) for url in valid_urls}
+        unique_titles = list(dict.fromkeys(titles.values()))
+
+        async with httpx.AsyncClient(headers={"User-Agent": self.user_agent}, timeout=30,
+                                     transport=self.transport) as client:
+            batches = [
+                unique_titles[i:i + MAX_TITLES_PER_REQUEST]
+                for i in range(0, len(unique_titles), MAX_TITLES_PER_REQUEST)
+            ]
+            resolved = {}
+            for batch_result in await asyncio.gather(*(self._resolve_batch(client, b) for b in batches)):
+                resolved.update(batch_result)
+
+            # Search for titles that do not exist, then resolve what the search found
+            missing = [title for title in unique_titles if title not in resolved]
+            found = await asyncio.gather(*(self._search(client, title) for title in missing))
+            alternatives = {title: alt for title, alt in zip(missing, found) if alt}
+            if alternatives:
+                alt_titles = list(dict.fromkeys(alternatives.values()))
+                alt_resolved = {}
+                for i in range(0, len(alt_titles), MAX_TITLES_PER_REQUEST):
+                    alt_resolved.update(await self._resolve_batch(client, alt_titles[i:i + MAX_TITLES_PER_REQUEST]))
+                for title, alt in alternatives.items():
+                    if alt in alt_resolved:
+                        resolved[title] = alt_resolved[alt]
+
+            page_titles = list(dict.fromkeys(page["title"] for page in resolved.values()))
+            texts = dict(zip(page_titles, await asyncio.gather(*(self._full_text(client, t) for t in page_titles))))
+
+        results = {}
+        for url in urls:
+            page = resolved.get(titles.get(url))
+            results[url] = build_wiki_content(page["summary"], texts.get(page["title"], ""), url) if page else None
+
+        logging.info(
+            f"Fetched {sum(1 for r in results.values() if r)}/{len(results)} Wikipedia pages "
+            f"with {self.requests_made} requests ({self.cache_hits} cache hits)"
+        )
+        return results
+
+    def fetch_pages_sync(self, urls: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """Blocking wrapper for scripts that are not async"""
+        return asyncio.run(self.fetch_pages(urls))
@@ -7,33 +7,44 @@ from dotenv import load_dotenv
 import chromadb
 from chromadb.utils import embedding_functions
 from datetime import datetime
-import urllib.parse
 import logging
 from difflib import SequenceMatcher
 
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from backend.config import get_chroma_settings
-import re
+from backend.utils.chunker import chunk_documents, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
+from backend.utils.wiki_fetch import WikiFetcher, build_wiki_content, title_from_url
+from backend.utils.name_index import AttractionNameIndex, clean_name
+from backend.utils.incremental_sync import plan_sync, apply_sync, print_plan
+from backend.utils.places_crawler import PlacesCrawler, tile_area
+from backend.utils.local_embedding import LocalEmbeddingEngine
+from backend.utils.dedup import collapse_near_duplicates
+from backend.utils.job_ledger import JobLedger
+from backend.utils.hnsw_sweep import load_hnsw_metadata
 
 logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
-def clean_name(name: str) -> str:
-    """Clean name by removing special characters and standardizing format"""
-    name = name.split('|')[0].strip()
-    name = re.sub(r'[^\w\s-]', '', name)
-    name = ' '.join(name.split())
-    return name.lower()
-
 def similar(a: str, b: str) -> float:
     """Calculate similarity ratio between two strings"""
     return SequenceMatcher(None, clean_name(a), clean_name(b)).ratio()
 
 
 class WikipediaDataCollector:
-    def __init__(self, attractions_array: dict):
+    def __init__(self, attractions_array: dict, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 chunk_overlap: int = DEFAULT_CHUNK_OVERLAP, full_rebuild: bool = False,
+                 dry_run: bool = False, retry_failed: bool = False, claim_size: int = 20):
         settings = get_chroma_settings()
+        self.dry_run = dry_run
+        self.claim_size = claim_size
+
+        # Per-attraction progress survives crashes; a rerun resumes where it stopped
+        self.ledger = JobLedger("wikipedia_attractions", path=":memory:" if dry_run else None)
+        if full_rebuild and not dry_run:
+            self.ledger.reset()
+        if retry_failed:
+            self.ledger.retry_failed()
         
         # Initialize the local ChromaDB client
         self.chroma_client = chromadb.PersistentClient(
@@ -42,28 +53,32 @@ class WikipediaDataCollector:
         
         # Initialize the embedding function
         self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        # Same model, run over a process pool for bulk ingestion
+        self.embedder = LocalEmbeddingEngine()
 
-        # Delete existing collections if they exist
-        for collection_name in ["wikipedia_collection", "singapore_attractions"]:
-            try:
-                self.chroma_client.delete_collection(collection_name)
-            except Exception:
-                pass  # Collections might not exist, that's okay
+        # By default collections are kept and synced incrementally;
+        # a full rebuild drops them and re-embeds everything
+        if full_rebuild and not dry_run:
+            for collection_name in ["wikipedia_collection", "singapore_attractions"]:
+                try:
+                    self.chroma_client.delete_collection(collection_name)
+                except Exception:
+                    pass  # Collections might not exist, that's okay
 
         # Create collections
         try:
-            self.wiki_collection = self.chroma_client.create_collection(
+            self.wiki_collection = self.chroma_client.get_or_create_collection(
                 name="wikipedia_collection",
-                metadata={"description": "Wikipedia documents for tourist attractions"},
+                metadata={"description": "Wikipedia documents for tourist attractions", **load_hnsw_metadata()},
                 embedding_function=self.embedding_function
             )
             
-            self.attractions_collection = self.chroma_client.create_collection(
+            self.attractions_collection = self.chroma_client.get_or_create_collection(
                 name="singapore_attractions",
-                metadata={"description": "Tourist attractions in Singapore"},
+                metadata={"description": "Tourist attractions in Singapore", **load_hnsw_metadata()},
                 embedding_function=self.embedding_function
             )
-            logging.info("Successfully created ChromaDB collections")
+            logging.info("Successfully opened ChromaDB collections")
         except Exception as e:
             logging.error(f"Error creating collections: {str(e)}")
             raise
@@ -76,9 +91,15 @@ class WikipediaDataCollector:
         )
         
         self.gmaps = googlemaps.Client(key=os.getenv("GOOGLE_API_KEY"))
+
+        # Batched, cached MediaWiki client used when processing many attractions
+        self.wiki_fetcher = WikiFetcher()
         
         # Initialize tracking variables
         self.attractions_array = attractions_array
+        self.name_index = AttractionNameIndex(attractions_array)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         self.success_count = 0
         self.failure_count = 0
         self.successful_documents = []
@@ -109,38 +130,26 @@ class WikipediaDataCollector:
                     
         return all_places
 
+    def get_places_in_area(self, bbox: tuple, cell_radius: int = 500, polygon: Optional[List[tuple]] = None) -> List[Dict]:
+        """
+        Get tourist attractions across a bounding box (south, west, north, east),
+        optionally clipped to a polygon, by crawling overlapping grid cells
+        """
+        cells = tile_area(bbox, cell_radius=cell_radius, polygon=polygon)
+        logging.info(f"Crawling {len(cells)} cells of radius {cell_radius} m")
+        return PlacesCrawler(self.gmaps).crawl_sync(cells)
+
     def find_attraction_in_array(self, attraction_name: str) -> tuple:
         """
         Find attraction in the predefined array using fuzzy matching
+        over the prebuilt name index
         """
-        best_match = None
-        best_category = None
-        best_url = None
-        highest_ratio = 0.8  # Minimum similarity threshold
-
-        cleaned_attraction = clean_name(attraction_name)
-        
-        for category in ["One", "Two", "Three"]:
-            for item in self.attractions_array[category]:
-                similarity = similar(cleaned_attraction, item["name"])
-                if similarity > highest_ratio:
-                    highest_ratio = similarity
-                    best_match = item["name"]
-                    best_category = category
-                    best_url = item["url"]
-                
-                # Also check if the attraction name is contained within the item name or vice versa
-                if (cleaned_attraction in clean_name(item["name"]) or 
-                    clean_name(item["name"]) in cleaned_attraction):
-                    if similarity > 0.5:  # Lower threshold for contained matches
-                        best_match = item["name"]
-                        best_category = category
-                        best_url = item["url"]
-                        highest_ratio = similarity
+        entry, highest_ratio = self.name_index.match(attraction_name)
+        best_match = entry["name"] if entry else None
 
         if best_match:
             print(f"Matched '{attraction_name}' to '{best_match}' with similarity {highest_ratio:.2f}")
-            return best_category, best_url
+            return entry["category"], entry["url"]
         return None, None
 
     def get_wikipedia_content(self, url: str) -> Optional[Dict]:
@@ -151,7 +160,7 @@ class WikipediaDataCollector:
             return None
             
         try:
-            page_title = urllib.parse.unquote(url.split("/")[-1].replace("_", " "))
+            page_title = title_from_url(url)
             page = self.wiki.page(page_title)
             
             if not page.exists():
@@ -163,32 +172,17 @@ class WikipediaDataCollector:
             
             if page.exists():
                 # Extract most relevant sections
-                content = {
-                    "summary": page.summary,
-                    "history": "",
-                    "description": "",
-                    "url": url
-                }
-                
-                # Parse full text to find relevant sections
-                sections = page.text.split('\n\n')
-                for section in sections:
-                    lower_section = section.lower()
-                    if any(keyword in lower_section for keyword in ["history", "background", "established"]):
-                        content["history"] += section + "\n"
-                    elif any(keyword in lower_section for keyword in ["description", "architecture", "features"]):
-                        content["description"] += section + "\n"
-                
-                return content
+                return build_wiki_content(page.summary, page.text, url)
                 
         except Exception as e:
             logging.error(f"Error fetching Wikipedia content for {url}: {str(e)}")
         
         return None
 
-    def store_in_chromadb(self, documents: List[Dict]) -> None:
+    def store_in_chromadb(self, documents: List[Dict]) -> bool:
         """
-        Store only successfully processed Wikipedia documents in ChromaDB
+        Store only successfully processed Wikipedia documents in ChromaDB.
+        Returns False if storing failed.
         """
         # Filter for successful Wikipedia documents only
         wiki_docs = [doc for doc in documents if doc["metadata"].get("wikipedia_url") 
@@ -196,23 +190,32 @@ class WikipediaDataCollector:
         
         if not wiki_docs:
             logging.info("No successful Wikipedia documents to store")
-            return
+            return True
             
         try:
-            # Prepare data for ChromaDB
-            texts = [doc["text"] for doc in wiki_docs]
-            metadatas = [doc["metadata"] for doc in wiki_docs]
-            ids = [doc["metadata"]["place_id"] for doc in wiki_docs]
+            # Split pages into section-aware chunks so retrieval returns only the relevant part
+            chunks = chunk_documents(wiki_docs, self.chunk_size, self.chunk_overlap)
+
+            # Only chunks of this run's attractions may be removed, so a --bbox
+            # or otherwise partial run leaves the rest of the collection alone
+            parent_ids = {doc["metadata"].get("place_id") for doc in documents if doc["metadata"].get("place_id")}
+            parent_ids.update(chunk["metadata"]["parent_id"] for chunk in chunks)
+
+            # Attractions sharing a Wikipedia page produce near-identical chunks; keep one of each
+            chunks, dedup_report = collapse_near_duplicates(chunks)
+
+            # Only new or changed chunks are re-embedded; chunks that disappeared are deleted
+            plan = plan_sync(self.wiki_collection, chunks, where={"parent_id": {"$in": sorted(parent_ids)}})
+            if self.dry_run:
+                print_plan("wikipedia_collection", plan)
+                return True
+            apply_sync(self.wiki_collection, plan, embedder=self.embedder)
             
-            # Store in Wikipedia collection
-            self.wiki_collection.add(
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
+            logging.info(
+                f"Successfully stored {len(chunks)} chunks from {len(wiki_docs)} documents in wikipedia_collection "
+                f"({dedup_report['collapsed']} near-duplicates collapsed)"
             )
             
-            logging.info(f"Successfully stored {len(wiki_docs)} documents in wikipedia_collection")
-            
             # Verify storage by querying
             results = self.wiki_collection.query(
                 query_texts=["test query"],
@@ -222,9 +225,11 @@ class WikipediaDataCollector:
                 logging.info("Storage verification successful")
             else:
                 logging.warning("Storage verification failed - no results returned")
+            return True
                 
         except Exception as e:
             logging.error(f"Error storing documents in ChromaDB: {str(e)}")
+            return False
 
     def create_document_structure(self, attraction: Dict, wiki_content: Optional[Dict]) -> Dict:
         """
@@ -240,57 +245,58 @@ class WikipediaDataCollector:
         else:
             relevant_text = "No Wikipedia content available"
 
+        metadata = {
+            "place_id": attraction.get("place_id", ""),
+            "name": attraction["name"],
+            "category": "tourist_attraction",
+            "source": "wikipedia" if wiki_content else "google",
+            "fact_type": "historical" if wiki_content else "basic",
+            "last_verified": datetime.now().strftime("%Y-%m-%d"),
+            "wikipedia_url": wiki_content["url"] if wiki_content else "",
+            "has_wiki_content": bool(wiki_content)
+        }
+
+        # Keep the coordinates so documents can be found by location;
+        # Chroma rejects None metadata values, so only add them when known
+        location = attraction.get("geometry", {}).get("location", {})
+        if location.get("lat") is not None and location.get("lng") is not None:
+            metadata["lat"] = location["lat"]
+            metadata["lng"] = location["lng"]
+
         return {
             "text": relevant_text,
-            "metadata": {
-                "place_id": attraction.get("place_id", ""),
-                "name": attraction["name"],
-                "category": "tourist_attraction",
-                "source": "wikipedia" if wiki_content else "google",
-                "fact_type": "historical" if wiki_content else "basic",
-                "last_verified": datetime.now().strftime("%Y-%m-%d"),
-                "wikipedia_url": wiki_content["url"] if wiki_content else "",
-                "has_wiki_content": bool(wiki_content)
-            }
+            "metadata": metadata
         }
 
-    def process_attractions(self, latitude: float, longitude: float) -> List[Dict]:
+    def process_attractions(self, latitude: float, longitude: float, attractions: Optional[List[Dict]] = None) -> List[Dict]:
         """
-        Process attractions with improved error handling and logging
+        Process attractions with improved error handling and logging.
+        Pass already crawled attractions to skip the single nearby search.
+        Attractions are claimed from the job ledger in batches, so an
+        interrupted run resumes and several workers can share one job.
         """
         try:
-            attractions = self.get_places(latitude, longitude)
+            if attractions is None:
+                attractions = self.get_places(latitude, longitude)
             logging.info(f"Found {len(attractions)} attractions")
-            
-            documents = []
-            for attraction in attractions:
-                try:
-                    logging.info(f"Processing: {attraction['name']}")
-                    category, url = self.find_attraction_in_array(attraction["name"])
-                    
-                    if category and (category in ["One", "Two"]):
-                        wiki_content = self.get_wikipedia_content(url)
-                        if wiki_content:
-                            self.success_count += 1
-                            self.successful_documents.append({"name": attraction["name"], "url": url})
-                            logging.info(f"Successfully retrieved Wikipedia content from {url}")
-                        else:
-                            self.failure_count += 1
-                            self.unsuccessful_documents.append(attraction["name"])
-                            logging.warning(f"Failed to retrieve Wikipedia content from {url}")
-                    else:
-                        self.failure_count += 1
-                        self.unsuccessful_documents.append(attraction["name"])
-                        wiki_content = None
-                        
-                    document = self.create_document_structure(attraction, wiki_content)
-                    documents.append(document)
-                    
-                except Exception as e:
-                    logging.error(f"Error processing attraction {attraction['name']}: {str(e)}")
-                    continue
-            
-            self.store_in_chromadb(documents)
+
+            self.ledger.open_run({attraction["place_id"]: attraction for attraction in attractions}, final_stage="stored")
+
+            while True:
+                claimed = self.ledger.claim(self.claim_size)
+                if not claimed:
+                    break
+                self.process_batch([attraction for _, attraction in claimed])
+
+            # Documents fetched by earlier, interrupted runs are stored too
+            documents = list(self.ledger.results().values())
+            if self.store_in_chromadb(documents) and not self.dry_run:
+                self.ledger.set_stage("stored")
+
+            failures = self.ledger.failures()
+            if failures:
+                logging.warning(f"{len(failures)} attractions failed; rerun with --retry-failed to retry them")
+
             self.print_results()
             return documents
             
@@ -298,6 +304,46 @@ class WikipediaDataCollector:
             logging.error(f"Error in process_attractions: {str(e)}")
             return []
 
+    def process_batch(self, attractions: List[Dict]) -> None:
+        """Match, fetch and build documents for one claimed batch, recording each in the ledger"""
+        # Match every attraction first so all pages can be fetched in one batched pass
+        matches = {}
+        for attraction in attractions:
+            try:
+                matches[attraction["place_id"]] = self.find_attraction_in_array(attraction["name"])
+            except Exception as e:
+                logging.error(f"Error matching attraction {attraction.get('name')}: {str(e)}")
+
+        urls = [url for category, url in matches.values() if category in ["One", "Two"]]
+        pages = self.wiki_fetcher.fetch_pages_sync(urls)
+
+        for attraction in attractions:
+            try:
+                logging.info(f"Processing: {attraction['name']}")
+                category, url = matches.get(attraction.get("place_id"), (None, None))
+                
+                if category and (category in ["One", "Two"]):
+                    wiki_content = pages.get(url)
+                    if wiki_content:
+                        self.success_count += 1
+                        self.successful_documents.append({"name": attraction["name"], "url": url})
+                        logging.info(f"Successfully retrieved Wikipedia content from {url}")
+                    else:
+                        self.failure_count += 1
+                        self.unsuccessful_documents.append(attraction["name"])
+                        logging.warning(f"Failed to retrieve Wikipedia content from {url}")
+                else:
+                    self.failure_count += 1
+                    self.unsuccessful_documents.append(attraction["name"])
+                    wiki_content = None
+                    
+                document = self.create_document_structure(attraction, wiki_content)
+                self.ledger.complete(attraction["place_id"], "fetched", document)
+                
+            except Exception as e:
+                logging.error(f"Error processing attraction {attraction['name']}: {str(e)}")
+                self.ledger.fail(attraction["place_id"], str(e))
+
     def print_results(self):
         """
         Print processing results
@@ -425,7 +471,22 @@ if __name__ == "__main__":
     }
 
     
-    collector = WikipediaDataCollector(attractions_array)
+    import argparse
+    parser = argparse.ArgumentParser(description="Collect Wikipedia documents for attractions")
+    parser.add_argument("--dry-run", action="store_true", help="Print the sync diff without writing")
+    parser.add_argument("--full-rebuild", action="store_true", help="Drop collections and re-embed everything")
+    parser.add_argument("--bbox", help="Crawl an area instead of Chinatown: south,west,north,east")
+    parser.add_argument("--cell-radius", type=int, default=500, help="Search radius of each crawl cell in meters")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry attractions that failed in earlier runs")
+    args = parser.parse_args()
+
+    collector = WikipediaDataCollector(attractions_array, full_rebuild=args.full_rebuild, dry_run=args.dry_run,
+                                       retry_failed=args.retry_failed)
     CHINATOWN_LAT = 1.2836
     CHINATOWN_LNG = 103.8440
-    documents = collector.process_attractions(CHINATOWN_LAT, CHINATOWN_LNG)
\ No newline at end of file
+    if args.bbox:
+        bbox = tuple(float(value) for value in args.bbox.split(","))
+        places = collector.get_places_in_area(bbox, cell_radius=args.cell_radius)
+        documents = collector.process_attractions(CHINATOWN_LAT, CHINATOWN_LNG, attractions=places)
+    else:
+        documents = collector.process_attractions(CHINATOWN_LAT, CHINATOWN_LNG)
\ No newline at end of file